@@ -2,23 +2,37 @@ from __future__ import annotations
 
 """FastAPI surface for running the marketing pipeline via HTTP."""
 
+import asyncio
 import hashlib
 import hmac
 import json
 import os
 import time
 import urllib.parse
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, TypeVar
+from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 from approvals import ApprovalStore
+from cancellation import CANCELLATION_STATS, JOBS, CancelToken, RunCancelled
 from generate import CONTENT_SPECS
-from pipeline import DEFAULT_TYPES, create_client, run_assets, run_summary
-from slack_helpers import SlackNotifier
+from hedging import policy_from_env
+from ledger import configure_ledger, default_ledger_path
+from tracing import start_run, tracing_from_env
+from profiling import activate as activate_profiling
+from metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, REGISTRY, Gauge, render as render_metrics
+from pipeline import DEFAULT_TYPES, create_client, record_skipped_assets, run_assets, run_summary
+from rate_limit import RetriesExhausted
+from slack_helpers import FEEDBACK_CALLBACK_ID, SlackNotifier
+from slack_queue import SlackQueue
 
 load_dotenv()
 
@@ -32,10 +46,19 @@ OUTPUTS_DIR = BASE_DIR / "outputs"
 OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 DEFAULT_APPROVALS_DB = str((OUTPUTS_DIR / "approvals.db").resolve())
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    # Let queued Slack message updates go out before the worker stops.
+    slack_queue.close()
+
+
 app = FastAPI(
     title="Feature Marketing API",
     description=APP_DESCRIPTION,
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 env_approvals_db = os.getenv("APPROVALS_DB")
@@ -44,7 +67,49 @@ if not env_approvals_db:
 APPROVALS_DB = Path(env_approvals_db)
 SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
+# Slack message updates run on one background worker, off the request path.
+slack_queue = SlackQueue(min_interval=0)
+_notifier: Optional[SlackNotifier] = None
 approval_store = ApprovalStore(APPROVALS_DB)
+call_ledger = configure_ledger(default_ledger_path(OUTPUTS_DIR))
+span_exporter = tracing_from_env(OUTPUTS_DIR)
+HEDGE_POLICY = policy_from_env()
+if HEDGE_POLICY is not None and call_ledger is not None:
+    HEDGE_POLICY.seed(call_ledger.recent_latencies(stage="asset"))
+REGISTRY.register(
+    Gauge(
+        "approval_queue_depth",
+        "Approval items by status in the approvals DB.",
+        ("status",),
+        callback=lambda: {(status,): count for status, count in approval_store.count_by_status().items()},
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "cancellation_savings",
+        "Work avoided by cancelled jobs (runs, calls, tokens, seconds).",
+        ("kind",),
+        callback=lambda: {
+            (kind,): value for kind, value in CANCELLATION_STATS.snapshot().items() if kind != "avg_call_seconds"
+        },
+    )
+)
+if HEDGE_POLICY is not None:
+    REGISTRY.register(
+        Gauge(
+            "hedge_requests",
+            "Hedged request counters and current hedge delay.",
+            ("kind",),
+            callback=lambda: {(kind,): value for kind, value in HEDGE_POLICY.snapshot().items()},
+        )
+    )
+# cProfile slows every call it observes, so profiled runs must be allowed per deployment.
+PROFILING_ENABLED = os.getenv("ENABLE_PROFILING", "").lower() in {"1", "true", "yes"}
+DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.5"))
+# Non-standard status popularised by nginx for "client closed request".
+CLIENT_CLOSED_STATUS = 499
+
+T = TypeVar("T")
 
 
 class SummaryOptions(BaseModel):
@@ -86,7 +151,18 @@ class AssetOptions(BaseModel):
     )
 
 
-class AssetRequest(AssetOptions):
+class JobOptions(BaseModel):
+    job_id: Optional[str] = Field(
+        default=None,
+        description="Caller-chosen id so the run can be cancelled via DELETE /jobs/{job_id}",
+    )
+    profile: bool = Field(
+        default=False,
+        description="Save per-stage cProfile dumps under outputs/profiles/<job_id> (needs ENABLE_PROFILING=1)",
+    )
+
+
+class AssetRequest(AssetOptions, JobOptions):
     launch_brief: str = Field(..., description="Launch brief markdown feeding the assets")
     api_key: Optional[str] = Field(
         default=None,
@@ -98,7 +174,7 @@ class AssetResponse(BaseModel):
     assets: Dict[str, str]
 
 
-class PipelineRequest(SummaryOptions, AssetOptions):
+class PipelineRequest(SummaryOptions, AssetOptions, JobOptions):
     launch_brief: Optional[str] = Field(
         default=None,
         description="Provide to skip summary generation and only create assets",
@@ -114,11 +190,37 @@ class PipelineResponse(BaseModel):
     assets: Dict[str, str]
 
 
+@app.middleware("http")
+async def track_request_metrics(request: Request, call_next):
+    HTTP_IN_FLIGHT.inc(method=request.method)
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec(method=request.method)
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", None) or "unmatched"
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            endpoint=endpoint,
+            status=status,
+        )
+
+
 @app.get("/health")
 def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 def _validate_types(types: Optional[List[str]]) -> List[str]:
     if not types:
         return list(DEFAULT_TYPES)
@@ -131,6 +233,26 @@ def _validate_types(types: Optional[List[str]]) -> List[str]:
     return normalized
 
 
+def _upstream_unavailable(exc: RetriesExhausted) -> HTTPException:
+    """Report exhausted OpenAI retries as 503 so callers (Zapier/n8n) retry later."""
+    headers = {"Retry-After": str(int(exc.retry_after) + 1)} if exc.retry_after is not None else None
+    return HTTPException(status_code=503, detail=str(exc), headers=headers)
+
+
+def _slack_notifier() -> SlackNotifier:
+    """One pooled Slack client for the server instead of one per callback."""
+    global _notifier
+    if _notifier is None:
+        _notifier = SlackNotifier(SLACK_BOT_TOKEN)
+    return _notifier
+
+
+def _warn_on_slack_failure(future: Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        print(f"Warning: failed to update Slack message: {exc}")
+
+
 def _verify_slack_signature(*, body: bytes, timestamp: str, signature: str) -> bool:
     if not SLACK_SIGNING_SECRET:
         return False
@@ -150,65 +272,163 @@ def _verify_slack_signature(*, body: bytes, timestamp: str, signature: str) -> b
 def api_summary(payload: SummaryRequest) -> SummaryResponse:
     try:
         client = create_client(payload.api_key)
-        launch_brief = run_summary(
-            client,
-            model=payload.summary_model,
-            temperature=payload.summary_temperature,
-            max_tokens=payload.summary_max_tokens,
-        )
+        run_id = str(uuid4())
+        with start_run(run_id):
+            launch_brief = run_summary(
+                client,
+                model=payload.summary_model,
+                temperature=payload.summary_temperature,
+                max_tokens=payload.summary_max_tokens,
+                run_id=run_id,
+            )
+    except RetriesExhausted as exc:
+        raise _upstream_unavailable(exc) from exc
     except Exception as exc:  # pragma: no cover - runtime errors surfaced via HTTP
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return SummaryResponse(launch_brief=launch_brief)
 
 
+def _register_job(options: JobOptions, response: Response) -> CancelToken:
+    if options.profile and not PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled; set ENABLE_PROFILING=1 on the server")
+    try:
+        token = JOBS.register(options.job_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    response.headers["X-Job-Id"] = token.job_id
+    if options.profile:
+        response.headers["X-Profile-Dir"] = str(OUTPUTS_DIR / "profiles" / token.job_id)
+    return token
+
+
+async def _run_cancellable(
+    request: Request,
+    token: CancelToken,
+    work: Callable[[], T],
+    *,
+    profile: bool = False,
+) -> T:
+    """Run blocking pipeline work in the threadpool, cancelling it if the caller goes away."""
+    def traced() -> T:
+        with start_run(token.job_id):
+            if not profile:
+                return work()
+            with activate_profiling(OUTPUTS_DIR / "profiles" / token.job_id):
+                return work()
+
+    task = asyncio.ensure_future(run_in_threadpool(traced))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                break
+            if not token.cancelled and await request.is_disconnected():
+                token.cancel("client disconnected")
+        return task.result()
+    except asyncio.CancelledError:
+        # The server is tearing the request down (e.g. a proxy timeout); stop the worker too.
+        token.cancel("request cancelled")
+        raise
+    except RunCancelled as exc:
+        CANCELLATION_STATS.record_cancelled_run()
+        raise HTTPException(status_code=CLIENT_CLOSED_STATUS, detail=str(exc)) from exc
+    finally:
+        JOBS.release(token.job_id)
+
+
 @app.post("/assets", response_model=AssetResponse)
-def api_assets(payload: AssetRequest) -> AssetResponse:
+async def api_assets(payload: AssetRequest, request: Request, response: Response) -> AssetResponse:
     types = _validate_types(payload.types)
     if not payload.launch_brief.strip():
         raise HTTPException(status_code=400, detail="launch_brief cannot be empty")
-    try:
-        client = create_client(payload.api_key)
-        assets = run_assets(
-            client,
-            content_types=types,
-            launch_brief=payload.launch_brief,
-            model=payload.asset_model,
-            temperature=payload.asset_temperature,
-            max_tokens=payload.asset_max_tokens,
-        )
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    token = _register_job(payload, response)
+
+    def work() -> Dict[str, str]:
+        try:
+            client = create_client(payload.api_key)
+            token.on_cancel(client.close)
+            return run_assets(
+                client,
+                content_types=types,
+                launch_brief=payload.launch_brief,
+                model=payload.asset_model,
+                temperature=payload.asset_temperature,
+                max_tokens=payload.asset_max_tokens,
+                cancel=token,
+                hedge=HEDGE_POLICY,
+                run_id=token.job_id,
+            )
+        except RunCancelled:
+            raise
+        except RetriesExhausted as exc:
+            raise _upstream_unavailable(exc) from exc
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    assets = await _run_cancellable(request, token, work, profile=payload.profile)
     return AssetResponse(assets=assets)
 
 
 @app.post("/pipeline", response_model=PipelineResponse)
-def api_pipeline(payload: PipelineRequest) -> PipelineResponse:
+async def api_pipeline(payload: PipelineRequest, request: Request, response: Response) -> PipelineResponse:
     types = _validate_types(payload.types)
-    try:
-        client = create_client(payload.api_key)
-        launch_brief = payload.launch_brief
-        if not launch_brief:
-            launch_brief = run_summary(
+    if payload.launch_brief and not payload.launch_brief.strip():
+        raise HTTPException(status_code=400, detail="launch_brief cannot be empty")
+    token = _register_job(payload, response)
+
+    def work() -> PipelineResponse:
+        try:
+            client = create_client(payload.api_key)
+            token.on_cancel(client.close)
+            launch_brief = payload.launch_brief
+            if not launch_brief:
+                try:
+                    launch_brief = run_summary(
+                        client,
+                        model=payload.summary_model,
+                        temperature=payload.summary_temperature,
+                        max_tokens=payload.summary_max_tokens,
+                        cancel=token,
+                        run_id=token.job_id,
+                    )
+                except RunCancelled:
+                    record_skipped_assets(types, launch_brief="", max_tokens=payload.asset_max_tokens)
+                    raise
+            assets = run_assets(
                 client,
-                model=payload.summary_model,
-                temperature=payload.summary_temperature,
-                max_tokens=payload.summary_max_tokens,
+                content_types=types,
+                launch_brief=launch_brief,
+                model=payload.asset_model,
+                temperature=payload.asset_temperature,
+                max_tokens=payload.asset_max_tokens,
+                cancel=token,
+                hedge=HEDGE_POLICY,
+                run_id=token.job_id,
             )
-        elif not launch_brief.strip():
-            raise HTTPException(status_code=400, detail="launch_brief cannot be empty")
-        assets = run_assets(
-            client,
-            content_types=types,
-            launch_brief=launch_brief,
-            model=payload.asset_model,
-            temperature=payload.asset_temperature,
-            max_tokens=payload.asset_max_tokens,
-        )
-    except HTTPException:
-        raise
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-    return PipelineResponse(launch_brief=launch_brief, assets=assets)
+        except (HTTPException, RunCancelled):
+            raise
+        except RetriesExhausted as exc:
+            raise _upstream_unavailable(exc) from exc
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=str(exc)) from exc
+        return PipelineResponse(launch_brief=launch_brief, assets=assets)
+
+    return await _run_cancellable(request, token, work, profile=payload.profile)
+
+
+@app.get("/jobs")
+def list_jobs() -> Dict[str, object]:
+    stats: Dict[str, object] = {"jobs": JOBS.active(), "cancellation": CANCELLATION_STATS.snapshot()}
+    if HEDGE_POLICY is not None:
+        stats["hedging"] = HEDGE_POLICY.snapshot()
+    return stats
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str) -> Dict[str, str]:
+    if not JOBS.cancel(job_id):
+        raise HTTPException(status_code=404, detail=f"No running job '{job_id}'")
+    return {"job_id": job_id, "status": "cancelling"}
 
 
 @app.post("/slack/actions")
@@ -225,6 +445,10 @@ async def slack_actions(request: Request) -> Dict[str, str]:
     if not raw_payload:
         raise HTTPException(status_code=400, detail="Missing payload")
     data = json.loads(raw_payload)
+    if data.get("type") in {"view_submission", "view_closed"}:
+        if (data.get("view") or {}).get("callback_id") != FEEDBACK_CALLBACK_ID:
+            raise HTTPException(status_code=400, detail="Unknown view interaction")
+        return _record_feedback(data)
     action = (data.get("actions") or [{}])[0]
     try:
         value = json.loads(action.get("value", "{}"))
@@ -237,6 +461,24 @@ async def slack_actions(request: Request) -> Dict[str, str]:
         raise HTTPException(status_code=400, detail="Incomplete approval payload")
     status = "approved" if decision == "approve" else "rejected"
     approver = data.get("user", {})
+    channel = data.get("channel", {}).get("id")
+    ts = data.get("message", {}).get("ts")
+    if status == "rejected" and SLACK_BOT_TOKEN and data.get("trigger_id"):
+        # Ask for a reason first; the rejection is recorded when the modal is submitted or closed.
+        item = approval_store.get_item(run_id=run_id, item_id=item_id) or {}
+        try:
+            await run_in_threadpool(
+                _slack_notifier().open_feedback_modal,
+                trigger_id=data["trigger_id"],
+                run_id=run_id,
+                item_id=item_id,
+                channel=channel,
+                ts=ts,
+                title=item.get("title"),
+            )
+            return {"text": "Collecting feedback"}
+        except Exception as exc:  # pragma: no cover - fall back to a reasonless rejection
+            print(f"Warning: failed to open Slack feedback modal ({exc}); recording rejection without a reason.")
     approval_store.update_status(
         run_id=run_id,
         item_id=item_id,
@@ -244,16 +486,61 @@ async def slack_actions(request: Request) -> Dict[str, str]:
         approver_id=approver.get("id"),
         approver_name=approver.get("name") or approver.get("username"),
     )
-    if SLACK_BOT_TOKEN:
-        channel = data.get("channel", {}).get("id")
-        ts = data.get("message", {}).get("ts")
-        if channel and ts:
-            notifier = SlackNotifier(SLACK_BOT_TOKEN, channel)
-            notifier.update_message(
-                channel=channel,
-                ts=ts,
-                status=status,
-                approver=approver.get("name") or approver.get("username"),
-            )
+    _update_slack_message(channel=channel, ts=ts, status=status, approver=approver)
     status_text = "Approval recorded" if status == "approved" else "Changes requested"
     return {"response_action": "clear", "text": status_text}
+
+
+def _update_slack_message(
+    *,
+    channel: str | None,
+    ts: str | None,
+    status: str,
+    approver: Dict[str, str],
+    reason: str | None = None,
+) -> None:
+    if not SLACK_BOT_TOKEN or not channel or not ts:
+        return
+    # Fire and forget: Slack expects the interaction ack within 3 seconds.
+    update = slack_queue.submit(
+        _slack_notifier().update_message,
+        channel=channel,
+        ts=ts,
+        status=status,
+        approver=approver.get("name") or approver.get("username"),
+        reason=reason,
+    )
+    update.add_done_callback(_warn_on_slack_failure)
+
+
+def _record_feedback(data: Dict[str, object]) -> Dict[str, str]:
+    """Store a "Request changes" modal submission as a rejection with its reason.
+
+    A closed (cancelled) modal is a rejection without a reason, so the pipeline skips the
+    asset instead of waiting for ``--approval-timeout``.
+    """
+    view = data.get("view") or {}
+    try:
+        metadata = json.loads(view.get("private_metadata") or "{}")
+    except json.JSONDecodeError as exc:  # pragma: no cover
+        raise HTTPException(status_code=400, detail="Invalid modal metadata") from exc
+    run_id, item_id = metadata.get("run_id"), metadata.get("item_id")
+    if not run_id or not item_id:
+        raise HTTPException(status_code=400, detail="Incomplete feedback payload")
+    values = (view.get("state") or {}).get("values") or {}
+    reason = ""
+    if data.get("type") == "view_submission":
+        reason = ((values.get("reason") or {}).get("reason") or {}).get("value") or ""
+    approver = data.get("user", {})
+    approval_store.update_status(
+        run_id=run_id,
+        item_id=item_id,
+        status="rejected",
+        approver_id=approver.get("id"),
+        approver_name=approver.get("name") or approver.get("username"),
+        reason=reason.strip() or None,
+    )
+    _update_slack_message(
+        channel=metadata.get("channel"), ts=metadata.get("ts"), status="rejected", approver=approver, reason=reason
+    )
+    return {"response_action": "clear"} if data.get("type") == "view_submission" else {}
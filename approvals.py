@@ -8,6 +8,8 @@ import time
 from pathlib import Path
 from typing import Dict, Optional
 
+from tracing import span
+
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS approvals (
     run_id TEXT NOT NULL,
@@ -126,6 +128,11 @@ class ApprovalStore:
         ]
         return dict(zip(keys, row))
 
+    def count_by_status(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM approvals GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
     def wait_for_status(
         self,
         *,
@@ -134,16 +141,21 @@ class ApprovalStore:
         timeout: int,
         poll_interval: float = 5.0,
     ) -> Dict[str, str | None]:
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            record = self.get_item(run_id=run_id, item_id=item_id)
-            if record and record.get("status") in {"approved", "rejected"}:
-                return record
-            time.sleep(poll_interval)
-        return {
-            "run_id": run_id,
-            "item_id": item_id,
-            "status": "timeout",
-        }
+        with span("approvals.wait_for_status", item_id=item_id) as wait_span:
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                record = self.get_item(run_id=run_id, item_id=item_id)
+                if record and record.get("status") in {"approved", "rejected"}:
+                    if wait_span is not None:
+                        wait_span.set(status=record["status"])
+                    return record
+                time.sleep(poll_interval)
+            if wait_span is not None:
+                wait_span.set(status="timeout")
+            return {
+                "run_id": run_id,
+                "item_id": item_id,
+                "status": "timeout",
+            }
 
 __all__ = ["ApprovalStore"]
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+"""Versioned, content-addressed store for generated briefs and assets.
+
+Every launch brief and asset the pipeline produces is recorded here, whether or not it
+was approved. Content lives once under ``objects/<sha[:2]>/<sha>`` no matter how many
+runs produce it; ``index.db`` holds one row per version with its run id, content type,
+inputs and approval status, indexed so the latest approved version of a type is a single
+lookup.
+
+    python artifacts.py list                      # recent versions
+    python artifacts.py list --type linkedin --status approved
+    python artifacts.py show 12                   # print version 12 (or a hash prefix)
+    python artifacts.py latest launch_brief       # latest approved brief
+
+``pipeline.py --summary-input`` accepts a version id, hash prefix or ``latest`` as well
+as a file path.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from manifest import sha256_hex, write_atomic
+
+STATUSES = ("pending", "approved", "rejected")
+MIN_PREFIX = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha256 TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    inputs TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (run_id, content_type, sha256)
+);
+CREATE INDEX IF NOT EXISTS versions_latest ON versions (content_type, status, id DESC);
+CREATE INDEX IF NOT EXISTS versions_sha ON versions (sha256)
+"""
+
+
+def default_artifact_path(base_dir: Path) -> Path:
+    return Path(os.getenv("ARTIFACT_STORE") or base_dir / "artifacts")
+
+
+class ArtifactNotFound(LookupError):
+    pass
+
+
+class ArtifactStore:
+    """Content blobs on disk plus a SQLite index of versions.
+
+    A version is identified by its integer id or by a prefix (at least six hex
+    characters) of its content hash; the same content in two runs is two versions
+    sharing one blob.
+    """
+
+    def __init__(self, root: Path | str):
+        self.root = Path(root).expanduser()
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / "index.db"
+        self._ensure_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        except sqlite3.OperationalError as exc:
+            raise sqlite3.OperationalError(f"{exc} (path={self.path})") from exc
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self) -> None:
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def put(
+        self,
+        content_type: str,
+        text: str,
+        *,
+        run_id: str,
+        status: str = "pending",
+        inputs: Mapping[str, Any] | None = None,
+    ) -> Dict[str, Any]:
+        """Record ``text`` as a version of ``content_type``; returns the version record.
+
+        The blob is written only if no earlier version has the same hash. Recording the
+        same content twice for one run updates that version's status instead of adding a
+        row.
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Unknown artifact status {status!r}; expected one of {', '.join(STATUSES)}")
+        data = text.strip().encode("utf-8") + b"\n"
+        digest = sha256_hex(data)
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            write_atomic(blob, data)
+        now = time.time()
+        payload = json.dumps(dict(inputs or {}), sort_keys=True, default=str)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO versions (sha256, content_type, run_id, status, size, inputs, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(run_id, content_type, sha256)
+                DO UPDATE SET status=excluded.status, inputs=excluded.inputs, updated_at=excluded.updated_at
+                """,
+                (digest, content_type, run_id, status, len(data), payload, now, now),
+            )
+            row = conn.execute(
+                "SELECT * FROM versions WHERE run_id=? AND content_type=? AND sha256=?",
+                (run_id, content_type, digest),
+            ).fetchone()
+        return self._record(row)
+
+    def set_status(self, version_id: int, status: str) -> bool:
+        if status not in STATUSES:
+            raise ValueError(f"Unknown artifact status {status!r}; expected one of {', '.join(STATUSES)}")
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE versions SET status=?, updated_at=? WHERE id=?",
+                (status, time.time(), version_id),
+            )
+            return cur.rowcount > 0
+
+    def get(self, ref: str | int) -> Dict[str, Any]:
+        """Look up a version by id or content-hash prefix; raises ``ArtifactNotFound``."""
+        text = str(ref).strip().lstrip("#").lower()
+        with self._connect() as conn:
+            if text.isdigit():
+                row = conn.execute("SELECT * FROM versions WHERE id=?", (int(text),)).fetchone()
+                if row is not None:
+                    return self._record(row)
+            if len(text) < MIN_PREFIX or any(char not in "0123456789abcdef" for char in text):
+                raise ArtifactNotFound(f"No artifact version {ref!r} (use an id or a {MIN_PREFIX}+ character hash prefix)")
+            rows = conn.execute(
+                "SELECT * FROM versions WHERE sha256 >= ? AND sha256 < ? ORDER BY id DESC",
+                (text, text + "g"),
+            ).fetchall()
+        hashes = {row["sha256"] for row in rows}
+        if not rows:
+            raise ArtifactNotFound(f"No artifact version matches {ref!r}")
+        if len(hashes) > 1:
+            raise ArtifactNotFound(f"Hash prefix {ref!r} is ambiguous ({len(hashes)} matches)")
+        return self._record(rows[0])
+
+    def latest(self, content_type: str, *, status: str | None = "approved") -> Optional[Dict[str, Any]]:
+        query = "SELECT * FROM versions WHERE content_type=?"
+        params: List[Any] = [content_type]
+        if status:
+            query += " AND status=?"
+            params.append(status)
+        with self._connect() as conn:
+            row = conn.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return self._record(row) if row else None
+
+    def list_versions(
+        self,
+        *,
+        content_type: str | None = None,
+        status: str | None = None,
+        run_id: str | None = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        for column, value in (("content_type", content_type), ("status", status), ("run_id", run_id)):
+            if value:
+                clauses.append(f"{column}=?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM versions{where} ORDER BY id DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def read_text(self, record_or_ref: Mapping[str, Any] | str | int) -> str:
+        record = record_or_ref if isinstance(record_or_ref, Mapping) else self.get(record_or_ref)
+        try:
+            return self._blob_path(record["sha256"]).read_text(encoding="utf-8").strip()
+        except FileNotFoundError as exc:
+            raise ArtifactNotFound(f"Blob {record['sha256']} for version {record['id']} is missing") from exc
+
+    def resolve(self, ref: str, *, content_type: str) -> Dict[str, Any]:
+        """Resolve ``latest`` (latest approved of ``content_type``), an id or a hash prefix."""
+        if ref.strip().lower() == "latest":
+            record = self.latest(content_type)
+            if record is None:
+                raise ArtifactNotFound(f"No approved {content_type} in {self.root}")
+            return record
+        return self.get(ref)
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record["inputs"] = json.loads(record["inputs"] or "{}")
+        return record
+
+
+def format_versions(records: List[Dict[str, Any]]) -> str:
+    if not records:
+        return "No artifact versions recorded."
+    lines = []
+    for record in records:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["created_at"]))
+        lines.append(
+            f"#{record['id']:<5} {record['sha256'][:12]}  {record['content_type']:<14} {record['status']:<8} "
+            f"{when}  run={record['run_id'][:8]}  {record['size']}B"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Iterable[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Browse versions of generated briefs and assets.")
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=default_artifact_path(Path("outputs")),
+        help="Artifact store directory (default outputs/artifacts or ARTIFACT_STORE)",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    listing = sub.add_parser("list", help="List recent versions")
+    listing.add_argument("--type", dest="content_type")
+    listing.add_argument("--status", choices=STATUSES)
+    listing.add_argument("--run-id")
+    listing.add_argument("--limit", type=int, default=20)
+    listing.add_argument("--json", action="store_true", help="Print records as JSON")
+    show = sub.add_parser("show", help="Print one version's content")
+    show.add_argument("ref", help="Version id or content-hash prefix")
+    show.add_argument("--meta", action="store_true", help="Print the version record instead of the content")
+    latest = sub.add_parser("latest", help="Print the latest version of a content type")
+    latest.add_argument("content_type")
+    latest.add_argument("--status", choices=STATUSES, default="approved")
+    latest.add_argument("--meta", action="store_true", help="Print the version record instead of the content")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    store = ArtifactStore(args.store)
+    if args.command == "list":
+        records = store.list_versions(
+            content_type=args.content_type, status=args.status, run_id=args.run_id, limit=args.limit
+        )
+        print(json.dumps(records, indent=2) if args.json else format_versions(records))
+        return
+    try:
+        if args.command == "show":
+            record = store.get(args.ref)
+        else:
+            record = store.latest(args.content_type, status=args.status)
+            if record is None:
+                raise ArtifactNotFound(f"No {args.status} {args.content_type} in {store.root}")
+        print(json.dumps(record, indent=2) if args.meta else store.read_text(record))
+    except ArtifactNotFound as exc:
+        raise SystemExit(str(exc)) from exc
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = [
+    "ArtifactNotFound",
+    "ArtifactStore",
+    "STATUSES",
+    "default_artifact_path",
+    "format_versions",
+]
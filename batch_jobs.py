@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+"""Offline generation through the provider's Batch API.
+
+Non-urgent summary and asset requests are written as JSONL in the OpenAI Batch format:
+one ``POST /v1/responses`` body per line, tagged with a ``custom_id`` of
+``<run_id>:<stage>:<content_type>``. The file is uploaded, the job is polled until it
+ends, and every result line is mapped back to its run and content type. Results are
+recorded on the call ledger at the batch price (``ledger.BATCH_DISCOUNT``). Jobs finish
+within the 24h completion window rather than in seconds, so this suits overnight
+regeneration, not interactive runs.
+
+``FakeOpenAI`` (``python bench.py pipeline --batch-api``) implements ``files`` / ``batches`` in-process, so
+the whole flow runs without network access.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from ledger import record_call
+from manifest import write_atomic
+from tracing import span
+
+BATCH_ENDPOINT = "/v1/responses"
+COMPLETION_WINDOW = "24h"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    run_id: str
+    stage: str
+    body: Dict[str, Any]
+    content_type: Optional[str] = None
+
+    @property
+    def custom_id(self) -> str:
+        return f"{self.run_id}:{self.stage}:{self.content_type or '-'}"
+
+    def line(self) -> Dict[str, Any]:
+        return {"custom_id": self.custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": self.body}
+
+
+@dataclass
+class BatchResult:
+    request: BatchRequest
+    text: str = ""
+    usage: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def write_requests(path: Path | str, requests: Iterable[BatchRequest]) -> int:
+    """Write ``requests`` as a Batch API input file; returns the number of lines."""
+    lines: List[str] = []
+    seen = set()
+    for request in requests:
+        if request.custom_id in seen:
+            raise ValueError(f"Duplicate batch custom_id {request.custom_id!r}")
+        seen.add(request.custom_id)
+        lines.append(json.dumps(request.line(), ensure_ascii=False))
+    write_atomic(path, ("\n".join(lines) + "\n").encode("utf-8"))
+    return len(lines)
+
+
+def response_text(body: Mapping[str, Any]) -> str:
+    """Concatenated ``output_text`` parts of a raw Responses API body."""
+    if body.get("output_text"):
+        return str(body["output_text"])
+    parts = [
+        content.get("text", "")
+        for item in body.get("output") or []
+        if item.get("type") == "message"
+        for content in item.get("content") or []
+        if content.get("type") == "output_text"
+    ]
+    return "".join(parts)
+
+
+def parse_results(text: str, requests: Mapping[str, BatchRequest]) -> Dict[str, BatchResult]:
+    """Map Batch API output/error lines back to their requests by ``custom_id``."""
+    results: Dict[str, BatchResult] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        request = requests.get(record.get("custom_id"))
+        if request is None:
+            print(f"Warning: ignoring batch result for unknown custom_id {record.get('custom_id')!r}.")
+            continue
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or body.get("error") or {}
+            message = error.get("message") if isinstance(error, dict) else str(error)
+            results[request.custom_id] = BatchResult(
+                request, error=f"HTTP {response.get('status_code', '?')}: {message or 'request failed'}"
+            )
+            continue
+        usage = body.get("usage") or {}
+        results[request.custom_id] = BatchResult(
+            request,
+            text=response_text(body).strip(),
+            usage={
+                "input_tokens": int(usage.get("input_tokens") or 0),
+                "output_tokens": int(usage.get("output_tokens") or 0),
+                "cached_tokens": int((usage.get("input_tokens_details") or {}).get("cached_tokens") or 0),
+            },
+        )
+    return results
+
+
+def _download(client: Any, file_id: Optional[str]) -> str:
+    if not file_id:
+        return ""
+    return client.files.content(file_id).text
+
+
+class BatchJob:
+    """One submitted batch: its requests, provider id, and (after ``wait``) results."""
+
+    def __init__(self, client: Any, requests: Iterable[BatchRequest], *, path: Path | str):
+        self.client = client
+        self.requests: Dict[str, BatchRequest] = {request.custom_id: request for request in requests}
+        self.path = Path(path)
+        self.id: Optional[str] = None
+        self.status = "new"
+        self.submitted_at: Optional[float] = None
+
+    def submit(self, *, metadata: Mapping[str, str] | None = None) -> str:
+        count = write_requests(self.path, self.requests.values())
+        with open(self.path, "rb") as handle:
+            upload = self.client.files.create(file=handle, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=COMPLETION_WINDOW,
+            metadata=dict(metadata or {}),
+        )
+        self.id, self.status, self.submitted_at = batch.id, batch.status, time.time()
+        print(f"Submitted batch {batch.id} ({count} request(s), input {self.path}).")
+        return batch.id
+
+    def wait(
+        self,
+        *,
+        poll_interval: float = 30.0,
+        timeout: float | None = None,
+        on_poll: Callable[[Any], None] | None = None,
+    ) -> Any:
+        """Poll until the batch reaches a terminal status; raises ``TimeoutError`` after ``timeout``."""
+        if self.id is None:
+            raise RuntimeError("Submit the batch before waiting on it.")
+        deadline = time.monotonic() + timeout if timeout else None
+        delay = min(1.0, poll_interval)
+        while True:
+            batch = self.client.batches.retrieve(self.id)
+            self.status = batch.status
+            if on_poll is not None:
+                on_poll(batch)
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Batch {self.id} still {batch.status} after {timeout:.0f}s")
+            time.sleep(delay)
+            # Short jobs (and the fake backend) finish fast; back off towards the poll interval.
+            delay = min(delay * 2, poll_interval)
+
+    def collect(self, batch: Any) -> Dict[str, BatchResult]:
+        """Download output and error files, map them to requests and record them on the ledger."""
+        raw = _download(self.client, batch.output_file_id) + _download(self.client, batch.error_file_id)
+        write_atomic(self.path.with_name(self.path.stem + "-output.jsonl"), raw.encode("utf-8"))
+        results = parse_results(raw, self.requests)
+        turnaround_ms = (time.time() - (self.submitted_at or time.time())) * 1000
+        for custom_id, request in self.requests.items():
+            result = results.setdefault(
+                custom_id, BatchResult(request, error=f"no result (batch {batch.status})")
+            )
+            record_call(
+                run_id=request.run_id,
+                stage=f"{request.stage}_batch",
+                content_type=request.content_type,
+                model=str(request.body.get("model", "")),
+                status="ok" if result.ok else "error",
+                latency_ms=turnaround_ms,
+                response=SimpleNamespace(
+                    usage=SimpleNamespace(
+                        input_tokens=result.usage.get("input_tokens", 0),
+                        output_tokens=result.usage.get("output_tokens", 0),
+                        input_tokens_details=SimpleNamespace(cached_tokens=result.usage.get("cached_tokens", 0)),
+                    )
+                ),
+                batch=True,
+            )
+        return results
+
+
+def run_batch(
+    client: Any,
+    requests: List[BatchRequest],
+    *,
+    path: Path | str,
+    poll_interval: float = 30.0,
+    timeout: float | None = None,
+    metadata: Mapping[str, str] | None = None,
+) -> Dict[str, BatchResult]:
+    """Submit ``requests`` as one batch, wait for it, and return results keyed by ``custom_id``."""
+    if not requests:
+        return {}
+    job = BatchJob(client, requests, path=path)
+    with span("batch_job", requests=len(requests)) as job_span:
+        job.submit(metadata=metadata)
+        last_progress = [""]
+
+        def report(batch: Any) -> None:
+            counts = batch.request_counts
+            progress = f"{batch.status} {counts.completed + counts.failed}/{counts.total}"
+            if progress != last_progress[0]:
+                print(f"Batch {batch.id}: {progress}")
+                last_progress[0] = progress
+
+        batch = job.wait(poll_interval=poll_interval, timeout=timeout, on_poll=report)
+        results = job.collect(batch)
+        if job_span is not None:
+            job_span.set(batch_id=job.id, status=batch.status, failed=sum(not r.ok for r in results.values()))
+    return results
+
+
+__all__ = [
+    "BATCH_ENDPOINT",
+    "BatchJob",
+    "BatchRequest",
+    "BatchResult",
+    "TERMINAL_STATUSES",
+    "parse_results",
+    "response_text",
+    "run_batch",
+    "write_requests",
+]
@@ -0,0 +1,626 @@
+from __future__ import annotations
+
+"""Offline end-to-end benchmarks against the fake LLM backend.
+
+Each scenario runs in a fresh subprocess (so peak RSS and import costs are its own)
+against a synthetic ``docs_in`` corpus, with ``fakes.FakeOpenAI`` installed as the
+client (``use_fake_llm``) so no OpenAI calls are made. Results are printed and written as JSON; pass ``--compare`` with an earlier
+report to see the deltas run over run.
+
+    python bench.py --sizes small,medium --latency 0.2 --repeat 3
+    python bench.py --compare outputs/bench/bench-20250101-120000.json
+    python bench.py corpus --size large --out /tmp/large-corpus
+    python bench.py startup --repeat 10          # cold-start times vs. budgets
+    python bench.py markdown                     # in-process renderer vs. pandoc/regex
+    python bench.py pipeline --auto-approve      # pipeline.py itself, offline against the fake
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT_DIR = BASE_DIR / "outputs" / "bench"
+SCENARIOS = ("cli", "api")
+# size -> (documents, pages per document); half DOCX, half PDF.
+CORPUS_SIZES: Dict[str, tuple[int, int]] = {
+    "small": (4, 2),
+    "medium": (12, 8),
+    "large": (30, 25),
+}
+PARAGRAPHS_PER_PAGE = 8
+_WORDS = (
+    "customers reported faster onboarding after the beta while support tickets dropped "
+    "engineering shipped the integration behind a flag pricing stays unchanged for teams "
+    "security review is pending rollout starts with enterprise accounts adoption metrics "
+    "show weekly active usage growth dashboards latency improved export workflow"
+).split()
+
+
+# --- Synthetic corpora -------------------------------------------------------
+
+
+def _paragraphs(rng: random.Random, count: int) -> List[str]:
+    return [
+        " ".join(rng.choice(_WORDS) for _ in range(rng.randint(25, 60))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int = 95) -> List[str]:
+    lines: List[str] = []
+    current = ""
+    for word in text.split():
+        if current and len(current) + len(word) + 1 > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    if current:
+        lines.append(current)
+    return lines
+
+
+def write_pdf(path: Path, pages: Sequence[Sequence[str]]) -> None:
+    """Write a minimal text-only PDF (one Helvetica content stream per page)."""
+    objects: List[bytes] = []
+    page_ids = [4 + index * 2 for index in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for page_id, paragraphs in zip(page_ids, pages):
+        lines = [line for para in paragraphs for line in _wrap(para) + [""]]
+        body = "\n".join(f"({_pdf_escape(line)}) '" for line in lines[:64])
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td\n{body}\nET".encode("latin-1", "replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    path.write_bytes(out.getvalue())
+
+
+def write_docx(path: Path, pages: Sequence[Sequence[str]]) -> None:
+    from docx import Document
+
+    document = Document()
+    for index, paragraphs in enumerate(pages, start=1):
+        document.add_heading(f"Section {index}", level=2)
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+    document.save(str(path))
+
+
+def generate_corpus(out_dir: Path, *, documents: int, pages: int, seed: int = 7) -> Path:
+    """Create ``documents`` DOCX/PDF sources of ``pages`` pages each (reused if present)."""
+    marker = out_dir / ".corpus.json"
+    spec = {"documents": documents, "pages": pages, "seed": seed}
+    if marker.exists() and json.loads(marker.read_text()) == spec:
+        return out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for stale in out_dir.iterdir():
+        if stale.suffix in {".docx", ".pdf"}:
+            stale.unlink()
+    rng = random.Random(seed)
+    for index in range(documents):
+        content = [_paragraphs(rng, PARAGRAPHS_PER_PAGE) for _ in range(pages)]
+        if index % 2:
+            write_pdf(out_dir / f"research-notes-{index:02d}.pdf", content)
+        else:
+            write_docx(out_dir / f"product-spec-{index:02d}.docx", content)
+    marker.write_text(json.dumps(spec))
+    return out_dir
+
+
+def corpus_for(size: str, root: Path) -> Path:
+    documents, pages = CORPUS_SIZES[size]
+    return generate_corpus(root / size, documents=documents, pages=pages)
+
+
+# --- Worker (runs inside the scenario subprocess) -----------------------------
+
+
+def _stage_breakdown() -> Dict[str, Dict[str, float]]:
+    from metrics import STAGE_SECONDS
+
+    stages: Dict[str, Dict[str, float]] = {}
+    for (stage, content_type, _status), (count, total) in STAGE_SECONDS.totals().items():
+        name = f"{stage}:{content_type}" if content_type else stage
+        entry = stages.setdefault(name, {"count": 0, "seconds": 0.0})
+        entry["count"] += count
+        entry["seconds"] = round(entry["seconds"] + total, 4)
+    return stages
+
+
+def use_fake_llm() -> None:
+    """Make ``pipeline.create_client`` (and so the CLI and API) return ``FakeOpenAI`` from the env."""
+    from fakes import FakeOpenAI
+    from pipeline import configure_client_factory
+
+    configure_client_factory(lambda api_key: FakeOpenAI.from_env())
+
+
+def _run_cli(work_dir: Path) -> None:
+    import pipeline
+
+    pipeline.main(["--auto-approve", "--assets-dir", str(work_dir)])
+
+
+def _run_api(work_dir: Path) -> None:
+    from fastapi.testclient import TestClient
+
+    import api
+
+    client = TestClient(api.app)
+    response = client.post("/pipeline", json={})
+    response.raise_for_status()
+    brief = response.json()["launch_brief"]
+    response = client.post("/assets", json={"launch_brief": brief})
+    response.raise_for_status()
+
+
+def _usage_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux but bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def worker_main(scenario: str, work_dir: Path) -> None:
+    runner = {"cli": _run_cli, "api": _run_api}[scenario]
+    use_fake_llm()
+    wall_start = time.perf_counter()
+    cpu_start = _usage_seconds()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        runner(work_dir)
+    wall = time.perf_counter() - wall_start
+    cpu = _usage_seconds() - cpu_start
+
+    from ledger import get_ledger
+    from rate_limit import get_default_limiter
+
+    ledger = get_ledger()
+    totals = ledger.report(group_by=()) if ledger else []
+    calls = totals[0] if totals else {}
+    result = {
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "llm_calls": calls.get("calls") or 0,
+        "llm_failed": calls.get("failed") or 0,
+        "llm_retries": get_default_limiter().stats["retries"],
+        "input_tokens": calls.get("input_tokens") or 0,
+        "output_tokens": calls.get("output_tokens") or 0,
+        "stages": _stage_breakdown(),
+    }
+    sys.stdout.write(json.dumps(result) + "\n")
+
+
+# --- Cold start ---------------------------------------------------------------
+
+# Third-party packages that entry points must only import when they actually need them.
+HEAVY_MODULES = ("openai", "slack_sdk", "requests", "markdown", "pydantic", "dotenv", "pypdf", "docx", "fastapi")
+# name -> (argv after the interpreter, budget in ms, heavy modules allowed at startup)
+STARTUP_ENTRY_POINTS: Dict[str, tuple[List[str], float, tuple[str, ...]]] = {
+    # Dry runs read docs_in to print the summary prompt, so PDF parsing is expected.
+    "pipeline --dry-run": (["pipeline.py", "--dry-run"], 400.0, ("pypdf",)),
+    "generate": (["generate.py", "linkedin", "-s", "{brief}"], 150.0, ()),
+    "pipeline --help": (["pipeline.py", "--help"], 300.0, ()),
+    "import api": (["-c", "import api"], 1000.0, ("fastapi", "pydantic", "dotenv")),
+}
+
+
+def _import_profile(argv: List[str], env: Dict[str, str]) -> tuple[set[str], List[tuple[int, str]]]:
+    """Top-level packages imported by ``argv`` and the slowest imports (cumulative µs)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    loaded: set[str] = set()
+    costs: List[tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if not cumulative.isdigit():
+            continue
+        loaded.add(name.split(".")[0])
+        if "." not in name:
+            costs.append((int(cumulative), name))
+    return loaded, sorted(costs, reverse=True)
+
+
+def measure_startup(repeat: int = 5) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as tmp:
+        brief = Path(tmp) / "brief.md"
+        brief.write_text("# Launch brief\n\nShort brief for startup timing.\n")
+        env = dict(os.environ, LEDGER_DB=str(Path(tmp) / "ledger.db"), TRACE_FILE="off")
+        env["APPROVALS_DB"] = str(Path(tmp) / "approvals.db")
+        for name, (template, budget, allowed) in STARTUP_ENTRY_POINTS.items():
+            argv = [part.format(brief=brief) for part in template]
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                subprocess.run([sys.executable, *argv], cwd=BASE_DIR, env=env, capture_output=True)
+                timings.append(time.perf_counter() - started)
+            loaded, costs = _import_profile(argv, env)
+            heavy = sorted(module for module in HEAVY_MODULES if module in loaded and module not in allowed)
+            results[name] = {
+                "best_ms": round(min(timings) * 1000, 1),
+                "median_ms": round(statistics.median(timings) * 1000, 1),
+                "budget_ms": budget,
+                "unexpected_heavy_imports": heavy,
+                "slowest_imports": [{"module": module, "cumulative_ms": round(us / 1000, 1)} for us, module in costs[:5]],
+            }
+    return results
+
+
+def startup_main(argv: Iterable[str]) -> None:
+    parser = argparse.ArgumentParser(description="Measure CLI/API cold-start time against budgets.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per entry point (best and median reported)")
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="NAME=MS",
+        help="Override an entry point's budget, e.g. --budget 'import api=2000'",
+    )
+    parser.add_argument("--output", type=Path, help="Optional JSON report path")
+    args = parser.parse_args(list(argv))
+    for override in args.budget:
+        name, _, value = override.rpartition("=")
+        if name not in STARTUP_ENTRY_POINTS:
+            raise SystemExit(f"Unknown entry point {name!r}; choose from: {', '.join(STARTUP_ENTRY_POINTS)}")
+        template, _, allowed = STARTUP_ENTRY_POINTS[name]
+        STARTUP_ENTRY_POINTS[name] = (template, float(value), allowed)
+
+    results = measure_startup(args.repeat)
+    failures = []
+    print(f"{'entry point':<20} {'best_ms':>8} {'median':>8} {'budget':>8}  slowest imports")
+    for name, result in results.items():
+        slowest = ", ".join(f"{item['module']} {item['cumulative_ms']:.0f}ms" for item in result["slowest_imports"][:3])
+        print(f"{name:<20} {result['best_ms']:8.1f} {result['median_ms']:8.1f} {result['budget_ms']:8.0f}  {slowest}")
+        if result["best_ms"] > result["budget_ms"]:
+            failures.append(f"{name}: {result['best_ms']:.0f}ms exceeds the {result['budget_ms']:.0f}ms budget")
+        if result["unexpected_heavy_imports"]:
+            failures.append(f"{name}: imports {', '.join(result['unexpected_heavy_imports'])} at startup")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+    if failures:
+        print("\nStartup budget exceeded:\n  " + "\n  ".join(failures))
+        raise SystemExit(1)
+    print("\nAll entry points within budget.")
+
+
+# --- Markdown rendering -------------------------------------------------------
+
+_LEGACY_TEXT_PASSES = (
+    (r"```[\s\S]*?```", "", 0),
+    (r"`([^`]*)`", r"\1", 0),
+    (r"^\s{0,3}[-*+]\s+", "- ", re.MULTILINE),
+    (r"^\s{0,3}\d+[.)]\s+", "- ", re.MULTILINE),
+    (r"^#+\s*", "", re.MULTILINE),
+    (r"\[(.*?)\]\((.*?)\)", r"\1 (\2)", 0),
+    (r"\*\*(.*?)\*\*", r"\1", 0),
+    (r"\*(.*?)\*", r"\1", 0),
+    (r"\s+", " ", 0),
+)
+
+
+def legacy_regex_to_text(markdown: str) -> str:
+    """The regex chain ``email_helpers.markdown_to_text`` used when pandoc was missing."""
+    text = markdown
+    for pattern, replacement, flags in _LEGACY_TEXT_PASSES:
+        text = re.sub(pattern, replacement, text, flags=flags)
+    return text.strip()
+
+
+def _pandoc(markdown: str, to: str) -> str:
+    proc = subprocess.run(
+        [shutil.which("pandoc") or "pandoc", "-f", "markdown", "-t", to],
+        input=markdown.encode("utf-8"),
+        capture_output=True,
+        check=True,
+    )
+    return proc.stdout.decode("utf-8")
+
+
+def markdown_approaches() -> Dict[str, Any]:
+    """Name -> callable(markdown) for every available way to get text + HTML."""
+    import markdown_render
+
+    def in_process_cold(markdown: str) -> Any:
+        markdown_render.clear_cache()
+        return markdown_render.render(markdown)
+
+    approaches: Dict[str, Any] = {
+        "in-process (cold)": in_process_cold,
+        "in-process (memoised)": markdown_render.render,
+        "legacy regex text only": legacy_regex_to_text,
+    }
+    if shutil.which("pandoc"):
+        approaches["pandoc subprocess (text + html)"] = lambda markdown: (
+            _pandoc(markdown, "plain"),
+            _pandoc(markdown, "html"),
+        )
+    try:
+        import markdown as python_markdown
+    except ImportError:
+        pass
+    else:
+        approaches["python-markdown html + regex text"] = lambda markdown: (
+            python_markdown.markdown(markdown),
+            legacy_regex_to_text(markdown),
+        )
+    return approaches
+
+
+def measure_markdown(documents: Sequence[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, render in markdown_approaches().items():
+        for document in documents:  # warm up imports and, for the memoised case, the cache
+            render(document)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for document in documents:
+                render(document)
+            timings.append((time.perf_counter() - started) / len(documents))
+        per_doc = statistics.median(timings)
+        results[name] = {"ms_per_doc": round(per_doc * 1000, 4), "docs_per_second": round(1 / per_doc, 1)}
+    return results
+
+
+def markdown_main(argv: Iterable[str]) -> None:
+    parser = argparse.ArgumentParser(description="Compare Markdown → text/HTML conversion paths.")
+    parser.add_argument(
+        "files",
+        nargs="*",
+        type=Path,
+        help="Markdown files to convert (default README.md plus outputs/*.md)",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the documents (median reported)")
+    parser.add_argument("--output", type=Path, help="Optional JSON report path")
+    args = parser.parse_args(list(argv))
+    files = args.files or [BASE_DIR / "README.md", *sorted((BASE_DIR / "outputs").glob("*.md"))]
+    documents = [path.read_text(encoding="utf-8") for path in files if path.exists()]
+    if not documents:
+        raise SystemExit("No Markdown files to benchmark.")
+    results = measure_markdown(documents, args.repeat)
+    print(f"{len(documents)} documents, {sum(len(doc) for doc in documents) // 1024} KiB, median of {args.repeat} passes")
+    print(f"{'approach':<36} {'ms/doc':>10} {'docs/s':>10}")
+    for name, result in results.items():
+        print(f"{name:<36} {result['ms_per_doc']:10.3f} {result['docs_per_second']:10.1f}")
+    if not shutil.which("pandoc"):
+        print("(pandoc not installed; the subprocess path was skipped)")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+# --- Driver -------------------------------------------------------------------
+
+
+def run_scenario(
+    scenario: str,
+    corpus: Path,
+    *,
+    fake_env: Dict[str, str],
+    extra_env: Dict[str, str] | None = None,
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scenario}-") as tmp:
+        work_dir = Path(tmp)
+        env = dict(os.environ)
+        env.update(fake_env)
+        env.update(
+            {
+                "DOCS_DIR": str(corpus),
+                "LEDGER_DB": str(work_dir / "ledger.db"),
+                "TRACE_FILE": str(work_dir / "traces.jsonl"),
+                "APPROVALS_DB": str(work_dir / "approvals.db"),
+                "PYTHONHASHSEED": "0",
+            }
+        )
+        env.update(extra_env or {})
+        proc = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "_worker", scenario, str(work_dir)],
+            cwd=BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{scenario} scenario failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _median_result(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"runs": len(results)}
+    for key in ("wall_seconds", "cpu_seconds", "peak_rss_mb", "llm_calls", "llm_failed", "llm_retries", "input_tokens", "output_tokens"):
+        summary[key] = round(statistics.median(result[key] for result in results), 4)
+    stages: Dict[str, Dict[str, float]] = {}
+    names = {name for result in results for name in result["stages"]}
+    for name in sorted(names):
+        seconds = [result["stages"].get(name, {}).get("seconds", 0.0) for result in results]
+        stages[name] = {"seconds": round(statistics.median(seconds), 4)}
+    summary["stages"] = stages
+    return summary
+
+
+def _delta(new: float, old: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def format_results(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any] | None = None) -> str:
+    base = (baseline or {}).get("results", {})
+    lines = [f"{'case':<14} {'wall_s':>8} {'cpu_s':>8} {'rss_mb':>8} {'calls':>6} {'failed':>6} {'retries':>7}"]
+    for case, result in results.items():
+        line = (
+            f"{case:<14} {result['wall_seconds']:8.3f} {result['cpu_seconds']:8.3f} "
+            f"{result['peak_rss_mb']:8.1f} {result['llm_calls']:6.0f} {result['llm_failed']:6.0f} {result['llm_retries']:7.0f}"
+        )
+        previous = base.get(case)
+        if previous:
+            line += (
+                f"  wall {_delta(result['wall_seconds'], previous['wall_seconds'])}"
+                f" cpu {_delta(result['cpu_seconds'], previous['cpu_seconds'])}"
+                f" rss {_delta(result['peak_rss_mb'], previous['peak_rss_mb'])}"
+            )
+        lines.append(line)
+        for stage, entry in result["stages"].items():
+            stage_line = f"  {stage:<24} {entry['seconds']:8.3f}s"
+            old_stage = (previous or {}).get("stages", {}).get(stage)
+            if old_stage:
+                stage_line += f"  {_delta(entry['seconds'], old_stage['seconds'])}"
+            lines.append(stage_line)
+    return "\n".join(lines)
+
+
+def _git_revision() -> str | None:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline offline against a fake LLM.")
+    parser.add_argument(
+        "--sizes",
+        default="small,medium",
+        help=f"Comma-separated corpus sizes ({', '.join(CORPUS_SIZES)})",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="Comma-separated scenarios: cli (pipeline.main), api (FastAPI /pipeline + /assets)",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the median is reported")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean fake LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Std-dev of fake LLM latency")
+    parser.add_argument("--output-tokens", type=int, default=600, help="Tokens per fake LLM response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake calls failing with 429")
+    parser.add_argument("--corpus-dir", type=Path, default=DEFAULT_OUTPUT_DIR / "corpora")
+    parser.add_argument("--output", type=Path, help="Report path (default outputs/bench/bench-<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier report to diff against")
+    return parser.parse_args(list(argv) if argv is not None else None)
+
+
+def corpus_main(argv: Iterable[str]) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic docs_in corpus.")
+    parser.add_argument("--size", choices=sorted(CORPUS_SIZES), default="medium")
+    parser.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args(list(argv))
+    documents, pages = CORPUS_SIZES[args.size]
+    path = generate_corpus(args.out, documents=documents, pages=pages)
+    print(f"Wrote {documents} documents ({pages} pages each) to {path}")
+
+
+def main(argv: Iterable[str] | None = None) -> None:
+    argv = list(argv) if argv is not None else sys.argv[1:]
+    if argv and argv[0] == "_worker":
+        worker_main(argv[1], Path(argv[2]))
+        return
+    if argv and argv[0] == "corpus":
+        corpus_main(argv[1:])
+        return
+    if argv and argv[0] == "startup":
+        startup_main(argv[1:])
+        return
+    if argv and argv[0] == "markdown":
+        markdown_main(argv[1:])
+        return
+    if argv and argv[0] == "pipeline":
+        import pipeline
+
+        use_fake_llm()
+        pipeline.main(argv[1:])
+        return
+    args = parse_args(argv)
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [size for size in sizes if size not in CORPUS_SIZES] + [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown size/scenario: {', '.join(unknown)}")
+
+    fake_env = {
+        "FAKE_LLM_LATENCY": str(args.latency),
+        "FAKE_LLM_JITTER": str(args.jitter),
+        "FAKE_LLM_OUTPUT_TOKENS": str(args.output_tokens),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "FAKE_LLM_SEED": "1",
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for size in sizes:
+        corpus = corpus_for(size, args.corpus_dir)
+        for scenario in scenarios:
+            case = f"{size}/{scenario}"
+            print(f"Running {case} x{args.repeat}...", file=sys.stderr)
+            runs = [run_scenario(scenario, corpus, fake_env=fake_env) for _ in range(args.repeat)]
+            results[case] = _median_result(runs)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "config": {key: value for key, value in vars(args).items() if key not in {"output", "compare", "corpus_dir"}},
+        "results": results,
+    }
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print(format_results(results, baseline))
+    output = args.output or DEFAULT_OUTPUT_DIR / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Saved benchmark report to {output}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["CORPUS_SIZES", "generate_corpus", "run_scenario", "use_fake_llm", "write_docx", "write_pdf"]
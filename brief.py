@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+"""The launch brief's sections, as structured output and as Markdown.
+
+With ``pipeline.py --structured-brief`` the summary call returns one JSON field per
+section (``BRIEF_SECTIONS``). The brief is still reviewed, versioned and saved as
+Markdown, rendered with one ``## <title>`` heading per section in a fixed order, so
+``parse_brief`` can recover the sections from the Markdown alone. That means a saved
+or versioned brief (``--summary-input``) keeps its structure without a sidecar file.
+
+``project_brief`` renders only the sections a ``ContentSpec`` asks for, so asset
+prompts stop carrying blockers and next steps the channel never uses. Free-form briefs
+that do not follow the rendering are passed through whole.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+BRIEF_TITLE = "# Launch brief"
+
+# key -> (heading, what the summary model should put there); order is the rendering order.
+BRIEF_SECTIONS: Dict[str, tuple[str, str]] = {
+    "executive_summary": ("Executive summary", "2-3 sentences"),
+    "customer_insights": ("Customer insights", "pain points, desired outcomes"),
+    "product_details": ("Product & engineering details", "scope, status, differentiators, blockers"),
+    "messaging": ("Messaging pillars & proof points", "3 concise bullets"),
+    "risks": ("Launch risks / open questions", "bullet list"),
+    "next_steps": ("Recommended next steps", "for Marketing, Product, and Engineering"),
+}
+
+_HEADING_RE = re.compile(r"^##[ \t]+(.+?)[ \t]*$", re.MULTILINE)
+_NESTED_HEADING_RE = re.compile(r"^#{1,2}(?=[ \t])", re.MULTILINE)
+
+
+def brief_schema() -> Dict[str, Any]:
+    """Strict JSON schema of the structured brief, for request bodies built by hand (Batch API)."""
+    return {
+        "type": "object",
+        "properties": {
+            key: {"type": "string", "description": f"{title} ({guidance})"}
+            for key, (title, guidance) in BRIEF_SECTIONS.items()
+        },
+        "required": list(BRIEF_SECTIONS),
+        "additionalProperties": False,
+    }
+
+
+def brief_model() -> Any:
+    """Pydantic model of the structured brief for ``responses.parse`` (imports pydantic lazily)."""
+    from pydantic import Field, create_model
+
+    return create_model(
+        "LaunchBrief",
+        **{
+            key: (str, Field(description=f"{title} ({guidance})"))
+            for key, (title, guidance) in BRIEF_SECTIONS.items()
+        },
+    )
+
+
+def render_brief(sections: Mapping[str, str], keys: Iterable[str] | None = None) -> str:
+    """Markdown for ``sections`` (all of them, or ``keys``) in ``BRIEF_SECTIONS`` order.
+
+    Headings inside a section are demoted below ``##`` so the rendering parses back.
+    """
+    wanted = set(BRIEF_SECTIONS if keys is None else keys)
+    parts = [BRIEF_TITLE]
+    for key, (title, _) in BRIEF_SECTIONS.items():
+        if key in wanted:
+            body = _NESTED_HEADING_RE.sub("###", str(sections.get(key) or "").strip())
+            parts.append(f"## {title}\n\n{body or '_None._'}")
+    return "\n\n".join(parts)
+
+
+def parse_brief(markdown: str) -> Optional[Dict[str, str]]:
+    """Sections of a brief rendered by ``render_brief`` (all six, in order), else None."""
+    text = markdown.strip()
+    if text.startswith(BRIEF_TITLE):
+        text = text[len(BRIEF_TITLE) :]
+    matches = list(_HEADING_RE.finditer(text))
+    titles = [title for title, _ in BRIEF_SECTIONS.values()]
+    if [match.group(1) for match in matches] != titles or text[: matches[0].start()].strip():
+        return None
+    ends = [match.start() for match in matches[1:]] + [len(text)]
+    return {key: text[match.end() : end].strip() for key, match, end in zip(BRIEF_SECTIONS, matches, ends)}
+
+
+def brief_from_json(text: str) -> Optional[str]:
+    """Render a structured-output JSON brief (e.g. a Batch API result) as Markdown, else None."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not all(isinstance(data.get(key), str) for key in BRIEF_SECTIONS):
+        return None
+    return render_brief(data)
+
+
+def project_brief(launch_brief: str, keys: Sequence[str]) -> str:
+    """Only the ``keys`` sections of a structured brief; other briefs, or no ``keys``, pass through."""
+    if not keys:
+        return launch_brief
+    sections = parse_brief(launch_brief)
+    if sections is None:
+        return launch_brief
+    return render_brief(sections, keys)
+
+
+__all__ = [
+    "BRIEF_SECTIONS",
+    "brief_from_json",
+    "brief_model",
+    "brief_schema",
+    "parse_brief",
+    "project_brief",
+    "render_brief",
+]
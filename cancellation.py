@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+"""Cooperative cancellation for in-flight pipeline runs."""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+
+class RunCancelled(RuntimeError):
+    """Raised when a run is cancelled before or during an OpenAI call."""
+
+
+class CancelToken:
+    """Thread-safe flag shared between the HTTP layer and pipeline stages."""
+
+    def __init__(self, job_id: str | None = None, *, parent: "CancelToken | None" = None):
+        self.job_id = job_id or str(uuid4())
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self.created_at = time.time()
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Flag the run as cancelled and fire abort callbacks once."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:  # pragma: no cover - best-effort abort
+                print(f"Warning: cancel callback failed for job {self.job_id} ({exc}).")
+        return True
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """Register a callback (e.g. closing an HTTP client) to abort pending work."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def child(self) -> "CancelToken":
+        """Token cancelled with this one but also cancellable on its own (e.g. a losing hedge)."""
+        token = CancelToken(self.job_id, parent=self)
+        self.on_cancel(lambda: token.cancel(self.reason or "cancelled"))
+        return token
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise RunCancelled(f"Job {self.job_id} cancelled ({self.reason})")
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to ``timeout`` seconds, returning early (True) on cancellation."""
+        return self._event.wait(timeout)
+
+
+class CancellationStats:
+    """Running totals of the work skipped because callers went away."""
+
+    def __init__(self, smoothing: float = 0.2):
+        self._lock = threading.Lock()
+        self._smoothing = smoothing
+        self.avg_call_seconds = 0.0
+        self.cancelled_runs = 0
+        self.skipped_calls = 0
+        self.aborted_calls = 0
+        self.tokens_saved = 0
+        self.seconds_saved = 0.0
+
+    def record_call(self, seconds: float) -> None:
+        with self._lock:
+            if self.avg_call_seconds == 0.0:
+                self.avg_call_seconds = seconds
+            else:
+                self.avg_call_seconds += self._smoothing * (seconds - self.avg_call_seconds)
+
+    def record_cancelled_run(self) -> None:
+        with self._lock:
+            self.cancelled_runs += 1
+
+    def record_skipped(self, *, calls: int, tokens: int) -> None:
+        with self._lock:
+            self.skipped_calls += calls
+            self.tokens_saved += tokens
+            self.seconds_saved += calls * self.avg_call_seconds
+
+    def record_aborted(self, *, elapsed: float) -> None:
+        with self._lock:
+            self.aborted_calls += 1
+            self.seconds_saved += max(self.avg_call_seconds - elapsed, 0.0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "cancelled_runs": self.cancelled_runs,
+                "skipped_calls": self.skipped_calls,
+                "aborted_calls": self.aborted_calls,
+                "tokens_saved": self.tokens_saved,
+                "seconds_saved": round(self.seconds_saved, 3),
+                "avg_call_seconds": round(self.avg_call_seconds, 3),
+            }
+
+
+class JobRegistry:
+    """Tracks cancel tokens for in-flight jobs so they can be cancelled by id."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, CancelToken] = {}
+
+    def register(self, job_id: str | None = None) -> CancelToken:
+        token = CancelToken(job_id)
+        with self._lock:
+            if token.job_id in self._jobs:
+                raise ValueError(f"Job {token.job_id} is already running")
+            self._jobs[token.job_id] = token
+        return token
+
+    def cancel(self, job_id: str, reason: str = "cancelled by request") -> bool:
+        with self._lock:
+            token = self._jobs.get(job_id)
+        if token is None:
+            return False
+        token.cancel(reason)
+        return True
+
+    def release(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def active(self) -> List[Dict[str, object]]:
+        with self._lock:
+            tokens = list(self._jobs.values())
+        return [
+            {
+                "job_id": token.job_id,
+                "cancelled": token.cancelled,
+                "age_seconds": round(time.time() - token.created_at, 3),
+            }
+            for token in tokens
+        ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap ~4 chars/token heuristic used for savings estimates."""
+    return max(len(text) // 4, 1) if text else 0
+
+
+CANCELLATION_STATS = CancellationStats()
+JOBS = JobRegistry()
+
+
+__all__ = [
+    "CANCELLATION_STATS",
+    "JOBS",
+    "CancelToken",
+    "CancellationStats",
+    "JobRegistry",
+    "RunCancelled",
+    "estimate_tokens",
+]
@@ -1,83 +1,492 @@
 from __future__ import annotations
-from pydantic import BaseModel
 
 """Utility helpers for sending approval emails."""
 
-import shutil
+import queue
 import smtplib
-import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Iterable, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import re
 
+from metrics import record_cache, stage_timer
+from openai_helpers import call_openai
+from profiling import stage as profile_stage
+from tracing import span
 
-def send_email(
+
+def build_message(
     *,
-    smtp_host: str,
-    smtp_port: int,
-    username: str | None,
-    password: str | None,
-    use_tls: bool,
     subject: str,
     body: str,
     sender: str,
     recipients: Iterable[str],
-) -> None:
+    text_body: str | None = None,
+) -> MIMEMultipart:
+    """HTML email with a plain-text alternative (tag-stripped HTML unless ``text_body`` is given)."""
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
     msg["From"] = sender
     msg["To"] = ", ".join(recipients)
     html_body = body
-    plain_body = re.sub(r"<[^>]+>", "", html_body)
+    plain_body = text_body if text_body is not None else re.sub(r"<[^>]+>", "", html_body)
     msg.attach(MIMEText(plain_body, "plain"))
     msg.attach(MIMEText(html_body, "html"))
+    return msg
+
+
+def open_smtp(
+    *,
+    smtp_host: str,
+    smtp_port: int,
+    username: str | None,
+    password: str | None,
+    use_tls: bool,
+    plain: bool = False,
+    timeout: float = 30.0,
+) -> smtplib.SMTP:
+    """Connected, authenticated SMTP session.
 
-    if use_tls:
-        server = smtplib.SMTP(smtp_host, smtp_port)
+    ``use_tls`` upgrades with STARTTLS, otherwise implicit SSL is used; ``plain``
+    skips encryption entirely (local relays and test servers only).
+    """
+    if plain:
+        server = smtplib.SMTP(smtp_host, smtp_port, timeout=timeout)
+    elif use_tls:
+        server = smtplib.SMTP(smtp_host, smtp_port, timeout=timeout)
         server.starttls()
     else:
-        server = smtplib.SMTP_SSL(smtp_host, smtp_port)
-
-    with server:
+        server = smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=timeout)
+    try:
         if username and password:
             server.login(username, password)
-        server.send_message(msg)
+    except Exception:
+        server.close()
+        raise
+    return server
 
 
-def markdown_to_text(markdown: str) -> str:
-    """Convert Markdown to html text via pandoc with regex fallback."""
-    pandoc = shutil.which("pandoc")
-    if pandoc:
+def send_email(
+    *,
+    smtp_host: str,
+    smtp_port: int,
+    username: str | None,
+    password: str | None,
+    use_tls: bool,
+    subject: str,
+    body: str,
+    sender: str,
+    recipients: Iterable[str],
+    plain: bool = False,
+    text_body: str | None = None,
+) -> Dict[str, Tuple[int, bytes]]:
+    """Send one message to every recipient; returns the recipients the server refused.
+
+    ``smtplib`` raises ``SMTPRecipientsRefused`` only when all of them are refused;
+    otherwise the refusals come back here as ``{recipient: (code, reply)}``.
+    """
+    recipients = list(recipients)
+    msg = build_message(subject=subject, body=body, sender=sender, recipients=recipients, text_body=text_body)
+
+    with span("email.send", recipients=len(recipients)):
+        server = open_smtp(
+            smtp_host=smtp_host,
+            smtp_port=smtp_port,
+            username=username,
+            password=password,
+            use_tls=use_tls,
+            plain=plain,
+        )
+        with server:
+            return server.send_message(msg)
+
+
+# --- Pooled batch delivery ----------------------------------------------------
+
+# Errors worth retrying on a fresh connection; 5xx replies are permanent.
+_TRANSIENT_SMTP_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)
+
+
+def is_transient_smtp_error(exc: BaseException) -> bool:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return isinstance(exc, _TRANSIENT_SMTP_ERRORS)
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+
+    def close(self) -> None:
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+
+
+class SMTPConnectionPool:
+    """Bounded pool of authenticated SMTP sessions shared by sender threads.
+
+    A session is retired after ``max_messages_per_connection`` messages (many relays
+    cap this) and whenever it errors, so the next checkout reconnects.
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int = 4,
+        max_messages_per_connection: int = 100,
+        **connect_kwargs: object,
+    ):
+        self.size = size
+        self.max_messages_per_connection = max_messages_per_connection
+        self._connect_kwargs = connect_kwargs
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @contextmanager
+    def connection(self) -> Iterator[_PooledConnection]:
+        self._slots.acquire()
+        conn: Optional[_PooledConnection] = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = _PooledConnection(open_smtp(**self._connect_kwargs))  # type: ignore[arg-type]
+                with self._lock:
+                    self.opened += 1
+            yield conn
+            conn.sent += 1
+        except BaseException as exc:
+            # smtplib resets the session after a permanent rejection, so it stays usable.
+            if conn is not None and (is_transient_smtp_error(exc) or not isinstance(exc, smtplib.SMTPException)):
+                conn.close()
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                if conn.sent >= self.max_messages_per_connection:
+                    conn.close()
+                else:
+                    self._idle.put(conn)
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+@dataclass
+class RecipientResult:
+    recipient: str
+    ok: bool
+    attempts: int
+    seconds: float
+    error: str | None = None
+    transient: bool = False
+
+
+@dataclass
+class BatchReport:
+    results: List[RecipientResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    connections: int = 0
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for result in self.results if result.ok)
+
+    @property
+    def failed(self) -> Dict[str, str]:
+        return {result.recipient: result.error or "unknown error" for result in self.results if not result.ok}
+
+    @property
+    def retryable(self) -> List[str]:
+        """Failed recipients whose last error was transient (worth another attempt later)."""
+        return [result.recipient for result in self.results if not result.ok and result.transient]
+
+    @property
+    def throughput(self) -> float:
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        line = (
+            f"Sent {self.sent}/{len(self.results)} emails in {self.elapsed:.1f}s "
+            f"({self.throughput:.1f}/s over {self.connections} SMTP connections)"
+        )
+        failures = [f"  {recipient}: {error}" for recipient, error in sorted(self.failed.items())]
+        return "\n".join([line] + (["Failed:"] + failures if failures else []))
+
+
+# personalise(recipient) -> (subject, html_body, text_body) for that recipient; a None
+# text_body falls back to the tag-stripped HTML.
+Personaliser = Callable[[str], Tuple[str, str, Optional[str]]]
+
+
+def send_batch(
+    *,
+    smtp_host: str,
+    smtp_port: int,
+    username: str | None,
+    password: str | None,
+    use_tls: bool,
+    subject: str,
+    body: str,
+    sender: str,
+    recipients: Iterable[str],
+    text_body: str | None = None,
+    personalise: Personaliser | None = None,
+    plain: bool = False,
+    pool_size: int = 4,
+    max_messages_per_connection: int = 100,
+    max_attempts: int = 3,
+    retry_delay: float = 1.0,
+) -> BatchReport:
+    """Send one message per recipient concurrently over a bounded SMTP connection pool.
+
+    Transient failures (disconnects, 4xx replies) are retried on a fresh connection up
+    to ``max_attempts`` times; 5xx rejections fail that recipient only.
+    """
+    unique = list(dict.fromkeys(address.strip() for address in recipients if address.strip()))
+    pool = SMTPConnectionPool(
+        size=pool_size,
+        max_messages_per_connection=max_messages_per_connection,
+        smtp_host=smtp_host,
+        smtp_port=smtp_port,
+        username=username,
+        password=password,
+        use_tls=use_tls,
+        plain=plain,
+    )
+
+    def deliver(recipient: str) -> RecipientResult:
+        started = time.perf_counter()
+        message_subject, message_body, message_text = (
+            personalise(recipient) if personalise else (subject, body, text_body)
+        )
+        msg = build_message(
+            subject=message_subject,
+            body=message_body,
+            sender=sender,
+            recipients=[recipient],
+            text_body=message_text,
+        )
+        error: str | None = None
+        transient = False
+        for attempt in range(1, max_attempts + 1):
+            try:
+                with pool.connection() as conn:
+                    conn.server.send_message(msg)
+                return RecipientResult(recipient, True, attempt, time.perf_counter() - started)
+            except (smtplib.SMTPException, OSError) as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                transient = is_transient_smtp_error(exc)
+                if not transient or attempt == max_attempts:
+                    break
+                time.sleep(retry_delay * attempt)
+        return RecipientResult(recipient, False, attempt, time.perf_counter() - started, error, transient)
+
+    started = time.perf_counter()
+    with span("email.send_batch", recipients=len(unique), pool_size=pool_size):
         try:
-            proc = subprocess.run(
-                [pandoc, "-f", "markdown", "-t", "plain"],
-                input=markdown.encode("utf-8"),
-                capture_output=True,
-                check=True,
-            )
-            text = proc.stdout.decode("utf-8").strip()
-            if text:
-                return text
-        except subprocess.SubprocessError:
-            pass
-
-    text = markdown
-    text = re.sub(r"```[\s\S]*?```", "", text)
-    text = re.sub(r"`([^`]*)`", r"\1", text)
-    text = re.sub(r"^\s{0,3}[-*+]\s+", "- ", text, flags=re.MULTILINE)
-    text = re.sub(r"^\s{0,3}\d+[.)]\s+", "- ", text, flags=re.MULTILINE)
-    text = re.sub(r"^#+\s*", "", text, flags=re.MULTILINE)
-    text = re.sub(r"\[(.*?)\]\((.*?)\)", r"\1 (\2)", text)
-    text = re.sub(r"\*\*(.*?)\*\*", r"\1", text)
-    text = re.sub(r"\*(.*?)\*", r"\1", text)
-    text = re.sub(r"\s+", " ", text)
+            with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="smtp") as executor:
+                results = list(executor.map(deliver, unique))
+        finally:
+            pool.close()
+    return BatchReport(results=results, elapsed=time.perf_counter() - started, connections=pool.opened)
+
+
+def markdown_to_text(markdown: str) -> str:
+    """Plain text for ``markdown`` via the in-process renderer (memoised by content hash)."""
+    from markdown_render import markdown_to_text as render_text
+
+    with profile_stage("markdown_to_text"):
+        return render_text(markdown)
+
+
+# --- Local subject/preview/body extraction --------------------------------------
+
+# Headings after the email copy that are notes for the sender, not content.
+_NOTES_HEADING_RE = re.compile(r"\b(design|notes?|layout|a/b|variants?|alt text|rationale|tips)\b", re.IGNORECASE)
+_LIST_MARKER_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_MIN_BODY_WORDS = 15
+_MAX_SUBJECT_CHARS = 150
+
+
+@dataclass(frozen=True)
+class EmailParts:
+    subject: str
+    preview: str
+    body: str
+    source: str  # "local" or "llm"
+
+
+@dataclass
+class EmailPrepStats:
+    local: int = 0
+    llm: int = 0
+
+    def record(self, source: str) -> None:
+        if source == "local":
+            self.local += 1
+        else:
+            self.llm += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        total = self.local + self.llm
+        return {
+            "local": self.local,
+            "llm": self.llm,
+            "hit_rate": self.local / total if total else 0.0,
+        }
+
+
+EMAIL_PREP_STATS = EmailPrepStats()
+
+
+def _classify_line(line: str) -> Optional[Tuple[str, str]]:
+    """Return (kind, inline value) when ``line`` labels a newsletter section."""
+    match = re.match(r"^\s*(#{1,6}\s+)?([-*]\s+)?(.*)$", line)
+    heading = bool(match.group(1))
+    bullet = bool(match.group(2))
+    text = match.group(3).replace("**", "").replace("__", "")
+    label, colon, value = text.partition(":")
+    if not colon and not heading:
+        return None
+    key = re.sub(r"\(.*?\)", "", label).strip().lower()
+    if len(key) > 40:
+        return None  # a sentence that happens to contain a colon
+    if key.startswith("subject"):
+        return "subject", value.strip()
+    if key.startswith(("preview", "preheader", "pre-header")):
+        return "preview", value.strip()
+    if key in {"body", "email body", "email copy", "body copy", "copy"}:
+        return "body", value.strip()
+    if heading:
+        return ("notes" if _NOTES_HEADING_RE.search(key) else "heading"), ""
+    if not bullet and len(key.split()) <= 3 and _NOTES_HEADING_RE.match(key):
+        return "notes", value.strip()
+    return None
+
+
+def _clean_value(value: str) -> str:
+    value = _LIST_MARKER_RE.sub("", value).strip()
+    return value.strip("\"'“”‘’*_` ").strip()
+
+
+def _first_value(inline: str, lines: List[str]) -> Tuple[str, List[str]]:
+    """Inline value, else the first non-empty line; returns it and the lines after it."""
+    if inline:
+        return _clean_value(inline), lines
+    for index, line in enumerate(lines):
+        if line.strip():
+            rest = lines[index + 1 :]
+            # Skip the remaining alternatives of a numbered "subject line options" list.
+            while rest and _LIST_MARKER_RE.match(rest[0]):
+                rest = rest[1:]
+            return _clean_value(line), rest
+    return "", []
+
+
+def _trim_body(lines: List[str]) -> str:
+    text = "\n".join(lines).strip()
+    text = re.sub(r"^(?:[-*_]{3,}\s*\n)+", "", text)
+    text = re.sub(r"(?:\n\s*[-*_]{3,}\s*)+$", "", text)
     return text.strip()
 
 
-__all__ = ["send_email", "markdown_to_text", "prep_email_with_openai"]
+def extract_email_parts(newsletter_markdown: str) -> Optional[EmailParts]:
+    """Split a newsletter draft that follows ``CONTENT_SPECS["newsletter"]`` without an LLM.
+
+    Recognises ``Subject line:`` / ``Preview text:`` labels (inline, on the next line, or
+    as headings with an options list) and an optional ``Email body`` heading, and drops
+    trailing design/notes sections. Returns ``None`` when the draft does not look like
+    the spec so the caller can fall back to the model.
+    """
+    sections: List[Tuple[str, str, List[str]]] = [("preamble", "", [])]
+    for line in newsletter_markdown.splitlines():
+        classified = _classify_line(line)
+        if classified is None:
+            sections[-1][2].append(line)
+        elif classified[0] == "heading":
+            sections[-1][2].append(line)
+        else:
+            sections.append((classified[0], classified[1], []))
 
+    subject = preview = ""
+    body_lines: List[str] = []
+    explicit_body = any(kind == "body" for kind, _, _ in sections)
+    in_body = False
+    for kind, inline, lines in sections:
+        if kind == "subject" and not subject:
+            subject, rest = _first_value(inline, lines)
+            in_body = False
+            if not explicit_body:
+                body_lines, in_body = list(rest), True
+        elif kind == "preview" and not preview:
+            preview, rest = _first_value(inline, lines)
+            in_body = False
+            if not explicit_body:
+                body_lines, in_body = list(rest), True
+        elif kind == "body":
+            body_lines = ([inline] if inline else []) + list(lines)
+            in_body = True
+        elif kind == "notes":
+            in_body = False
+        elif in_body:
+            body_lines.extend(lines)
 
+    body = _trim_body(body_lines)
+    if not subject or len(subject) > _MAX_SUBJECT_CHARS or len(body.split()) < _MIN_BODY_WORDS:
+        return None
+    return EmailParts(subject=subject, preview=preview, body=body, source="local")
+
+
+def prepare_email(
+    *,
+    client,
+    model: str,
+    system_prompt: str,
+    newsletter_markdown: str,
+    run_id: str | None = None,
+    use_llm: bool = True,
+) -> EmailParts:
+    """Subject/preview/body for the newsletter, parsed locally when the draft follows the spec.
+
+    Only drafts the local parser cannot handle cost an LLM call; ``EMAIL_PREP_STATS``
+    and the ``cache_requests_total{cache="email_prep"}`` metric count the calls avoided.
+    """
+    with span("email.extract") as extract_span:
+        parts = extract_email_parts(newsletter_markdown)
+        if extract_span is not None:
+            extract_span.set(parsed=parts is not None)
+    record_cache("email_prep", parts is not None)
+    if parts is None:
+        if not use_llm:
+            raise ValueError("Newsletter draft has no recognisable subject line and LLM fallback is disabled")
+        subject, body = prep_email_with_openai(
+            client=client,
+            model=model,
+            system_prompt=system_prompt,
+            newsletter_markdown=newsletter_markdown,
+            run_id=run_id,
+        )
+        parts = EmailParts(subject=subject, preview="", body=body, source="llm")
+    EMAIL_PREP_STATS.record(parts.source)
+    return parts
 
 
 def prep_email_with_openai(
@@ -86,6 +495,7 @@ def prep_email_with_openai(
     model: str,
     system_prompt: str,
     newsletter_markdown: str,
+    run_id: str | None = None,
 ) -> Tuple[str, str]:
 
     base_instructions = (
@@ -94,21 +504,48 @@ def prep_email_with_openai(
         " keys 'subject' and 'body'."
     )
     full_system_prompt = f"{system_prompt}\n\n{base_instructions}" if system_prompt else base_instructions
+
+    from pydantic import BaseModel
+
     class EmailExtraction(BaseModel):
         subject: str
         body: str
 
 
-    response = client.responses.parse(
-        model=model,
-        instructions=full_system_prompt,
-        input=[
-            {"role": "system", "content": base_instructions},
-            {"role": "user", "content": newsletter_markdown},
-        ],
-        text_format=EmailExtraction,
-        temperature=0.2,
-        max_output_tokens=400,
-    )
+    with stage_timer("email_prep", "newsletter"), span("email.prep"), profile_stage("email_prep"):
+        response = call_openai(
+            client,
+            stage="email_prep",
+            content_type="newsletter",
+            run_id=run_id,
+            method="parse",
+            model=model,
+            instructions=full_system_prompt,
+            input=[
+                {"role": "system", "content": base_instructions},
+                {"role": "user", "content": newsletter_markdown},
+            ],
+            text_format=EmailExtraction,
+            temperature=0.2,
+            max_output_tokens=400,
+        )
     parsed = response.output_parsed
     return parsed.subject, parsed.body
+
+
+__all__ = [
+    "EMAIL_PREP_STATS",
+    "BatchReport",
+    "EmailParts",
+    "EmailPrepStats",
+    "SMTPConnectionPool",
+    "build_message",
+    "extract_email_parts",
+    "is_transient_smtp_error",
+    "markdown_to_text",
+    "open_smtp",
+    "prep_email_with_openai",
+    "prepare_email",
+    "send_batch",
+    "send_email",
+]
@@ -1,67 +1,126 @@
 from __future__ import annotations
+import argparse
+import copy
+import os
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 
-def save_markdown_outputs(summary_output: str, assets: Dict[str, str], output_dir: str = "outputs") -> Path:
+from manifest import OutputManifest, atomic_path, default_manifest_path, sha256_hex
+from profiling import stage as profile_stage
+
+REPORT_NAME = "GenieAI_Marketing_Outputs.md"
+
+# (heading, asset key, placeholder when the asset is missing)
+REPORT_SECTIONS = (
+    ("LinkedIn Post", "linkedin", "⚠️ LinkedIn post not found."),
+    ("Newsletter Email", "newsletter", "⚠️ Newsletter email not found."),
+    ("Blog Post", "blog", "⚠️ Blog post not found."),
+)
+
+
+def _report_body(summary_output: str, assets: Dict[str, str]) -> str:
+    sections = [f"## Unified Launch Brief\n{summary_output}"]
+    sections += [f"## {heading}\n{assets.get(key, placeholder)}" for heading, key, placeholder in REPORT_SECTIONS]
+    return "\n\n---\n\n".join(sections) + "\n"
+
+
+def save_markdown_outputs(
+    summary_output: str,
+    assets: Dict[str, str],
+    output_dir: str = "outputs",
+    *,
+    manifest: Optional[OutputManifest] = None,
+    sources: Optional[Dict[str, str]] = None,
+) -> Path:
     """
     Save all generated marketing assets (summary + channel content) into a single Markdown file.
 
+    The report has a stable name and is only rewritten when its content changes; the
+    ``_Generated:`` line records when that last happened.
+
     Args:
         summary_output (str): The unified launch brief or summarised text.
         assets (Dict[str, str]): A dictionary containing channel outputs, e.g.
                                  {"linkedin": "...", "newsletter": "...", "blog": "..."}.
         output_dir (str): Directory to save the Markdown file (default: "outputs").
+        manifest (OutputManifest): Manifest tracking the output directory
+                                   (default: ``<output_dir>/manifest.json``).
+        sources (Dict[str, str]): Content hashes of the inputs, recorded so
+                                  ``build_combined_report`` can skip unchanged runs.
 
     Returns:
         Path: Path object of the saved Markdown file.
     """
 
-    # Ensure output directory exists
     out_dir = Path(output_dir)
-    out_dir.mkdir(exist_ok=True)
+    manifest = manifest or OutputManifest(default_manifest_path(out_dir))
+    md_output = out_dir / REPORT_NAME
 
-    # Build filename with timestamp
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-    md_output = out_dir / f"GenieAI_Marketing_Outputs_{timestamp}.md"
+    body = _report_body(summary_output, assets)
+    body_sha = sha256_hex(body.encode("utf-8"))
+    previous = manifest.entry(md_output)
+    if previous and previous.get("body_sha256") == body_sha and manifest.is_current(md_output, previous["sha256"]):
+        print(f"✅ Markdown report unchanged at {md_output.resolve()}")
+        return md_output
 
-    # Build Markdown content
     content = f"""# Genie AI – Feature Launch Marketing Outputs
 _Generated: {datetime.now():%Y-%m-%d %H:%M}_
 
 ---
 
-## Unified Launch Brief
-{summary_output}
-
----
-
-## LinkedIn Post
-{assets.get('linkedin', '⚠️ LinkedIn post not found.')}
-
----
-
-## Newsletter Email
-{assets.get('newsletter', '⚠️ Newsletter email not found.')}
-
----
-
-## Blog Post
-{assets.get('blog', '⚠️ Blog post not found.')}
-"""
-
-    # Write file
-    md_output.write_text(content, encoding="utf-8")
+{body}"""
+    manifest.write_text(md_output, content, kind="report", body_sha256=body_sha, sources=sources)
 
     print(f"✅ Saved Markdown to {md_output.resolve()}")
     return md_output
 
 
-if __name__ == "__main__":
+def build_combined_report(output_dir: Path | str = "outputs", *, manifest: Optional[OutputManifest] = None) -> Path:
+    """Assemble the combined report from the assets recorded in the output manifest.
+
+    When every asset's recorded hash matches what the current report was built from,
+    nothing is read or written.
+    """
+    out_dir = Path(output_dir)
+    manifest = manifest or OutputManifest(default_manifest_path(out_dir))
+    paths = {"launch_brief": out_dir / "launch_brief.md"}
+    paths.update({key: out_dir / f"{key}.md" for _, key, _ in REPORT_SECTIONS})
+    present = {name: path for name, path in paths.items() if manifest.entry(path) and path.exists()}
+    report_path = out_dir / REPORT_NAME
+
+    fingerprint = manifest.fingerprint(present)
+    previous = manifest.entry(report_path)
+    if (
+        fingerprint is not None
+        and previous
+        and previous.get("sources") == fingerprint
+        and manifest.is_current(report_path, previous["sha256"])
+    ):
+        print(f"✅ Markdown report unchanged at {report_path.resolve()}")
+        return report_path
+
+    texts = {name: path.read_text(encoding="utf-8").strip() for name, path in present.items()}
+    summary = texts.pop("launch_brief", "⚠️ Launch brief not found.")
+    return save_markdown_outputs(
+        summary,
+        texts,
+        str(out_dir),
+        manifest=manifest,
+        sources=fingerprint,
+    )
+
+
+def _example() -> None:
     # Example usage (for standalone testing)
     dummy_assets = {
         "linkedin": "LinkedIn example post here.",
@@ -78,12 +137,88 @@ BULLET_PATTERN = re.compile(r"^[-*+]\s+(.*)$")
 NUMBER_PATTERN = re.compile(r"^\d+[.)]\s+(.*)$")
 
 
-def markdown_to_docx(markdown_text: str, output_path: Path | str, *, title: Optional[str] = None) -> Path:
+# Loaded templates by path (None = python-docx default): the document emptied of body
+# content, plus its paragraph style ids by name.
+_TEMPLATES: Dict[Optional[str], Tuple[object, Dict[str, str]]] = {}
+
+
+def _load_template(template: Path | str | None) -> Tuple[object, Dict[str, str]]:
+    key = str(template) if template else None
+    loaded = _TEMPLATES.get(key)
+    if loaded is None:
+        base = Document(key) if key else Document()
+        body = base.element.body
+        for child in list(body):
+            if not child.tag.endswith("}sectPr"):
+                body.remove(child)
+        style_ids = {style.name: style.style_id for style in base.styles if style.type == WD_STYLE_TYPE.PARAGRAPH}
+        loaded = _TEMPLATES[key] = (base, style_ids)
+    return loaded
+
+
+def _new_document(template: Path | str | None = None):
+    """Blank document carrying ``template``'s styles.
+
+    The template is parsed once per process and deep-copied per file, which is
+    cheaper than re-reading and re-parsing the package for every ``Document()``.
+    """
+    return copy.deepcopy(_load_template(template)[0])
+
+
+class _StyledWriter:
+    """Adds paragraphs with style ids resolved once per template.
+
+    python-docx resolves a style name by scanning every style in the document on each
+    assignment, which dominated export time; setting ``pStyle`` directly skips that.
+    """
+
+    def __init__(self, doc, style_ids: Dict[str, str]):
+        self.doc = doc
+        self.style_ids = style_ids
+
+    def paragraph(self, text: str = "", style: str | None = None):
+        para = self.doc.add_paragraph(text)
+        if style:
+            style_id = self.style_ids.get(style)
+            if style_id is None:
+                para.style = style  # unknown to the template: let python-docx raise as before
+            else:
+                para._p.style = style_id
+        return para
+
+    def heading(self, text: str, level: int):
+        return self.paragraph(text, "Title" if level == 0 else f"Heading {level}")
+
+
+def _save_atomic(doc, path: Path) -> None:
+    with atomic_path(path) as tmp:
+        doc.save(str(tmp))
+
+
+def markdown_to_docx(
+    markdown_text: str,
+    output_path: Path | str,
+    *,
+    title: Optional[str] = None,
+    template: Path | str | None = None,
+) -> Path:
     """Convert Markdown text into a simple Word document."""
+    with profile_stage("markdown_to_docx"):
+        return _markdown_to_docx(markdown_text, output_path, title=title, template=template)
+
+
+def _markdown_to_docx(
+    markdown_text: str,
+    output_path: Path | str,
+    *,
+    title: Optional[str],
+    template: Path | str | None = None,
+) -> Path:
 
-    doc = Document()
+    doc = _new_document(template)
+    writer = _StyledWriter(doc, _load_template(template)[1])
     if title:
-        doc.add_heading(title, level=1)
+        writer.heading(title, level=1)
 
     in_code_block = False
     code_buffer: list[str] = []
@@ -94,8 +229,7 @@ def markdown_to_docx(markdown_text: str, output_path: Path | str, *, title: Opti
 
         if stripped.startswith("```"):
             if in_code_block:
-                para = doc.add_paragraph("\n".join(code_buffer))
-                para.style = "Intense Quote"
+                para = writer.paragraph("\n".join(code_buffer), "Intense Quote")
                 para.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
                 code_buffer.clear()
                 in_code_block = False
@@ -108,43 +242,192 @@ def markdown_to_docx(markdown_text: str, output_path: Path | str, *, title: Opti
             continue
 
         if not stripped:
-            doc.add_paragraph()
+            writer.paragraph()
             continue
 
         heading_match = HEADING_PATTERN.match(stripped)
         if heading_match:
             level = min(len(heading_match.group(1)), 6)
-            doc.add_heading(heading_match.group(2), level=level)
+            writer.heading(heading_match.group(2), level=level)
             continue
 
         bullet_match = BULLET_PATTERN.match(stripped)
         if bullet_match:
-            doc.add_paragraph(bullet_match.group(1), style="List Bullet")
+            writer.paragraph(bullet_match.group(1), "List Bullet")
             continue
 
         number_match = NUMBER_PATTERN.match(stripped)
         if number_match:
-            doc.add_paragraph(number_match.group(1), style="List Number")
+            writer.paragraph(number_match.group(1), "List Number")
             continue
 
         if stripped.startswith(">"):
-            para = doc.add_paragraph(stripped.lstrip("> "))
-            para.style = "Intense Quote"
+            writer.paragraph(stripped.lstrip("> "), "Intense Quote")
             continue
 
-        doc.add_paragraph(line)
+        writer.paragraph(line)
 
     path = Path(output_path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    doc.save(str(path))
+    _save_atomic(doc, path)
     return path
 
 
-def markdown_file_to_docx(markdown_path: Path | str, output_path: Path | str | None = None) -> Path:
+def markdown_file_to_docx(
+    markdown_path: Path | str,
+    output_path: Path | str | None = None,
+    *,
+    template: Path | str | None = None,
+) -> Path:
     """Read a Markdown file and save it as DOCX (same stem by default)."""
 
     src = Path(markdown_path)
     if output_path is None:
         output_path = src.with_suffix(".docx")
     text = src.read_text(encoding="utf-8")
-    return markdown_to_docx(text, output_path, title=src.stem.replace("_", " "))
+    return markdown_to_docx(text, output_path, title=src.stem.replace("_", " "), template=template)
+
+
+# --- Bulk export ---------------------------------------------------------------
+
+
+@dataclass
+class BulkExportReport:
+    converted: List[Path] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)
+    failed: Dict[Path, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        rate = len(self.converted) / self.elapsed if self.elapsed else 0.0
+        line = (
+            f"Converted {len(self.converted)}, skipped {len(self.skipped)} up to date, "
+            f"failed {len(self.failed)} in {self.elapsed:.1f}s ({rate:.1f} files/s)"
+        )
+        failures = [f"  {path}: {error}" for path, error in sorted(self.failed.items())]
+        return "\n".join([line] + failures)
+
+
+def find_markdown(paths: Iterable[Path | str]) -> List[Path]:
+    """Expand files and directories (recursively) into Markdown sources."""
+    found: List[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            found.extend(sorted(p for p in path.rglob("*.md") if p.is_file()))
+        elif path.suffix.lower() == ".md" and path.is_file():
+            found.append(path)
+    return list(dict.fromkeys(found))
+
+
+def _is_current(src: Path, dest: Path, template: Path | None) -> bool:
+    if not dest.exists():
+        return False
+    newest_input = src.stat().st_mtime
+    if template is not None:
+        newest_input = max(newest_input, template.stat().st_mtime)
+    return dest.stat().st_mtime >= newest_input
+
+
+def _export_one(job: Tuple[str, str, Optional[str]]) -> Tuple[str, Optional[str]]:
+    src, dest, template = job
+    try:
+        markdown_file_to_docx(src, dest, template=template)
+    except Exception as exc:  # reported per file; one bad input must not stop the batch
+        return src, f"{type(exc).__name__}: {exc}"
+    return src, None
+
+
+def bulk_export(
+    sources: Iterable[Path | str],
+    *,
+    out_dir: Path | str | None = None,
+    root: Path | str | None = None,
+    template: Path | str | None = None,
+    workers: int | None = None,
+    force: bool = False,
+) -> BulkExportReport:
+    """Convert many Markdown files to DOCX across a process pool.
+
+    Outputs go next to each source, or under ``out_dir`` mirroring the layout below
+    ``root``. Files whose DOCX is newer than both the source and the template are
+    skipped unless ``force``. Each worker loads the template once.
+    """
+    started = time.perf_counter()
+    report = BulkExportReport()
+    template_path = Path(template) if template else None
+    jobs: List[Tuple[str, str, Optional[str]]] = []
+    for src in (Path(item) for item in sources):
+        if out_dir is None:
+            dest = src.with_suffix(".docx")
+        else:
+            try:
+                relative = src.resolve().relative_to(Path(root or src.parent).resolve())
+            except ValueError:
+                relative = Path(src.name)
+            dest = Path(out_dir) / relative.with_suffix(".docx")
+        if not force and _is_current(src, dest, template_path):
+            report.skipped.append(src)
+            continue
+        jobs.append((str(src), str(dest), str(template_path) if template_path else None))
+
+    workers = workers or os.cpu_count() or 1
+    if len(jobs) <= 1 or workers <= 1:
+        results = [_export_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_export_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    for src, error in results:
+        if error is None:
+            report.converted.append(Path(src))
+        else:
+            report.failed[Path(src)] = error
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def bulk_main(argv: Iterable[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="export.py bulk",
+        description="Convert Markdown briefs and assets to DOCX in parallel, skipping up-to-date files.",
+    )
+    parser.add_argument("paths", nargs="*", type=Path, help="Markdown files or directories (default outputs/)")
+    parser.add_argument("--out-dir", type=Path, help="Write DOCX files here, mirroring the input layout")
+    parser.add_argument("--template", type=Path, help="DOCX whose styles (fonts, headings, margins) are reused")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Reconvert even when the DOCX is up to date")
+    args = parser.parse_args(list(argv))
+    paths = args.paths or [Path("outputs")]
+    sources = find_markdown(paths)
+    if not sources:
+        raise SystemExit(f"No Markdown files found in {', '.join(str(path) for path in paths)}")
+    root = paths[0] if len(paths) == 1 and paths[0].is_dir() else None
+    report = bulk_export(
+        sources,
+        out_dir=args.out_dir,
+        root=root,
+        template=args.template,
+        workers=args.workers,
+        force=args.force,
+    )
+    print(report.summary())
+    if report.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["bulk"]:
+        bulk_main(sys.argv[2:])
+    else:
+        _example()
+
+
+__all__ = [
+    "BulkExportReport",
+    "REPORT_NAME",
+    "build_combined_report",
+    "bulk_export",
+    "find_markdown",
+    "markdown_file_to_docx",
+    "markdown_to_docx",
+    "save_markdown_outputs",
+]
@@ -0,0 +1,553 @@
+from __future__ import annotations
+
+"""Local stand-ins for external services, used by benchmarks and offline runs.
+
+``FakeOpenAI`` implements the slice of the OpenAI client the pipeline uses
+(``responses.create`` / ``responses.parse``, ``with_options`` and ``close``) with
+configurable latency, output size and error rate. Harnesses install it with
+``pipeline.configure_client_factory`` (``bench.use_fake_llm``); tune it with the
+``FAKE_LLM_*`` env vars. Production code never imports this module. Its ``files`` and
+``batches`` attributes are an in-process Batch API: submitted JSONL is worked through on
+a background thread and written back in the provider's output-file format.
+
+``FakeSlackServer`` is a local HTTP server answering the Slack Web API methods and
+incoming webhooks the toolkit calls; point ``SLACK_API_URL`` at its ``api_url``.
+``FakeSMTPServer`` is a plain-text SMTP sink for exercising the email senders.
+"""
+
+import hashlib
+import json
+import os
+import random
+import socketserver
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List
+
+from cancellation import estimate_tokens
+
+_WORDS = (
+    "launch customers workflow latency adoption pricing rollout beta feedback teams "
+    "dashboard integration security onboarding insight pipeline release metric growth"
+).split()
+
+
+class FakeAPIError(Exception):
+    """Mimics ``openai.APIStatusError`` closely enough for ``rate_limit`` to classify it."""
+
+    def __init__(self, status_code: int, *, retry_after: float | None = None):
+        super().__init__(f"Fake LLM returned HTTP {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+@dataclass(frozen=True)
+class FakeLLMConfig:
+    latency: float = 0.2
+    jitter: float = 0.05
+    output_tokens: int = 600
+    error_rate: float = 0.0
+    error_status: int = 429
+    retry_after: float | None = 0.1
+    seed: int | None = None
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        def number(name: str, default: float) -> float:
+            raw = os.getenv(name)
+            return float(raw) if raw else default
+
+        seed = os.getenv("FAKE_LLM_SEED")
+        return cls(
+            latency=number("FAKE_LLM_LATENCY", cls.latency),
+            jitter=number("FAKE_LLM_JITTER", cls.jitter),
+            output_tokens=int(number("FAKE_LLM_OUTPUT_TOKENS", cls.output_tokens)),
+            error_rate=number("FAKE_LLM_ERROR_RATE", cls.error_rate),
+            error_status=int(number("FAKE_LLM_ERROR_STATUS", cls.error_status)),
+            seed=int(seed) if seed else None,
+        )
+
+
+def _request_text(request: Dict[str, Any]) -> str:
+    text = str(request.get("instructions") or "")
+    for message in request.get("input") or []:
+        if isinstance(message, dict):
+            text += str(message.get("content") or "")
+    return text
+
+
+def _usage(input_tokens: int, output_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+        input_tokens_details=SimpleNamespace(cached_tokens=0),
+        output_tokens_details=SimpleNamespace(reasoning_tokens=0),
+    )
+
+
+class _FakeResponses:
+    def __init__(self, owner: "FakeOpenAI"):
+        self._owner = owner
+
+    def create(self, **request: Any) -> SimpleNamespace:
+        text, usage = self._owner._complete(request)
+        return SimpleNamespace(id=f"resp_fake_{self._owner.calls}", output_text=text, usage=usage)
+
+    def parse(self, *, text_format: Any = None, **request: Any) -> SimpleNamespace:
+        text, usage = self._owner._complete(request)
+        parsed = None
+        if text_format is not None:
+            # Fill every string field with a slice of the generated text (subject, body, ...).
+            fields = getattr(text_format, "model_fields", {})
+            lines = text.splitlines() or [text]
+            values = {
+                name: (lines[0].lstrip("# ") if index == 0 else text)
+                for index, name in enumerate(fields)
+            }
+            parsed = text_format(**values)
+        return SimpleNamespace(
+            id=f"resp_fake_{self._owner.calls}",
+            output_text=text,
+            output_parsed=parsed,
+            usage=usage,
+        )
+
+
+class _FakeFiles:
+    """In-memory ``client.files``: batch input uploads and output/error downloads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._files: Dict[str, bytes] = {}
+
+    def create(self, *, file: Any, purpose: str) -> SimpleNamespace:
+        if isinstance(file, (bytes, bytearray)):
+            data = bytes(file)
+        elif hasattr(file, "read"):
+            data = file.read()
+        else:
+            with open(file, "rb") as handle:
+                data = handle.read()
+        return SimpleNamespace(id=self._store(data), object="file", bytes=len(data), purpose=purpose)
+
+    def _store(self, data: bytes) -> str:
+        with self._lock:
+            file_id = f"file-fake-{len(self._files) + 1}"
+            self._files[file_id] = data
+        return file_id
+
+    def content(self, file_id: str) -> SimpleNamespace:
+        with self._lock:
+            data = self._files[file_id]
+        return SimpleNamespace(content=data, text=data.decode("utf-8"), read=lambda: data)
+
+
+class _FakeBatches:
+    """``client.batches`` backed by the owning ``FakeOpenAI``; one worker thread per job."""
+
+    def __init__(self, owner: "FakeOpenAI"):
+        self._owner = owner
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, SimpleNamespace] = {}
+
+    def create(
+        self,
+        *,
+        input_file_id: str,
+        endpoint: str,
+        completion_window: str,
+        metadata: Dict[str, str] | None = None,
+    ) -> SimpleNamespace:
+        with self._lock:
+            job = SimpleNamespace(
+                id=f"batch_fake_{len(self._jobs) + 1}",
+                object="batch",
+                endpoint=endpoint,
+                input_file_id=input_file_id,
+                completion_window=completion_window,
+                status="validating",
+                output_file_id=None,
+                error_file_id=None,
+                created_at=int(time.time()),
+                completed_at=None,
+                request_counts=SimpleNamespace(total=0, completed=0, failed=0),
+                metadata=dict(metadata or {}),
+            )
+            self._jobs[job.id] = job
+        threading.Thread(target=self._work, args=(job,), name=job.id, daemon=True).start()
+        return self.retrieve(job.id)
+
+    def retrieve(self, batch_id: str) -> SimpleNamespace:
+        with self._lock:
+            job = self._jobs[batch_id]
+            return SimpleNamespace(**{**vars(job), "request_counts": SimpleNamespace(**vars(job.request_counts))})
+
+    def cancel(self, batch_id: str) -> SimpleNamespace:
+        with self._lock:
+            job = self._jobs[batch_id]
+            if job.status in {"validating", "in_progress"}:
+                job.status = "cancelling"
+        return self.retrieve(batch_id)
+
+    def _work(self, job: SimpleNamespace) -> None:
+        lines = [
+            json.loads(line)
+            for line in self._owner.files.content(job.input_file_id).text.splitlines()
+            if line.strip()
+        ]
+        with self._lock:
+            job.request_counts.total = len(lines)
+            job.status = "in_progress"
+        outputs: List[str] = []
+        errors: List[str] = []
+        for index, line in enumerate(lines, start=1):
+            with self._lock:
+                if job.status == "cancelling":
+                    break
+            record: Dict[str, Any] = {"id": f"batch_req_{index}", "custom_id": line.get("custom_id"), "error": None}
+            body = line.get("body") or {}
+            try:
+                if line.get("url") != job.endpoint:
+                    raise FakeAPIError(400)
+                text, usage = self._owner._complete(body)
+            except FakeAPIError as exc:
+                record["response"] = {
+                    "status_code": exc.status_code,
+                    "request_id": f"req_fake_{index}",
+                    "body": {"error": {"message": str(exc), "type": "fake_error"}},
+                }
+                errors.append(json.dumps(record))
+                with self._lock:
+                    job.request_counts.failed += 1
+                continue
+            record["response"] = {
+                "status_code": 200,
+                "request_id": f"req_fake_{index}",
+                "body": {
+                    "id": f"resp_fake_batch_{index}",
+                    "object": "response",
+                    "status": "completed",
+                    "model": body.get("model"),
+                    "output": [
+                        {
+                            "type": "message",
+                            "role": "assistant",
+                            "content": [{"type": "output_text", "text": text, "annotations": []}],
+                        }
+                    ],
+                    "usage": {
+                        "input_tokens": usage.input_tokens,
+                        "input_tokens_details": {"cached_tokens": 0},
+                        "output_tokens": usage.output_tokens,
+                        "output_tokens_details": {"reasoning_tokens": 0},
+                        "total_tokens": usage.total_tokens,
+                    },
+                },
+            }
+            outputs.append(json.dumps(record))
+            with self._lock:
+                job.request_counts.completed += 1
+        files = self._owner.files
+        output_id = files._store(("\n".join(outputs) + "\n").encode("utf-8")) if outputs else None
+        error_id = files._store(("\n".join(errors) + "\n").encode("utf-8")) if errors else None
+        with self._lock:
+            job.output_file_id, job.error_file_id = output_id, error_id
+            job.status = "cancelled" if job.status == "cancelling" else "completed"
+            job.completed_at = int(time.time())
+
+
+class FakeOpenAI:
+    """Thread-safe fake of the OpenAI client's Responses and Batch API surface."""
+
+    def __init__(self, config: FakeLLMConfig | None = None, **overrides: Any):
+        self.config = replace(config or FakeLLMConfig(), **overrides)
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.closed = False
+        self.responses = _FakeResponses(self)
+        self.files = _FakeFiles()
+        self.batches = _FakeBatches(self)
+
+    @classmethod
+    def from_env(cls) -> "FakeOpenAI":
+        return cls(FakeLLMConfig.from_env())
+
+    def with_options(self, **_: Any) -> "FakeOpenAI":
+        return self
+
+    def close(self) -> None:
+        self.closed = True
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self._random.gauss(self.config.latency, self.config.jitter))
+            failed = self._random.random() < self.config.error_rate
+            if failed:
+                self.errors += 1
+            return delay, failed
+
+    def _text(self, request: Dict[str, Any], output_tokens: int) -> str:
+        # Same request -> same text, so runs are comparable and caches behave as with a real model.
+        digest = hashlib.sha256(f"{request.get('model')}:{_request_text(request)}".encode()).digest()
+        words = random.Random(int.from_bytes(digest[:8], "big"))
+        lines = ["# Generated draft", ""]
+        length = len(lines[0])
+        while length < output_tokens * 4:
+            line = " ".join(words.choice(_WORDS) for _ in range(12)).capitalize() + "."
+            lines.append(f"- {line}" if words.random() < 0.3 else line)
+            length += len(line) + 1
+        return "\n".join(lines)
+
+    def _complete(self, request: Dict[str, Any]) -> tuple[str, SimpleNamespace]:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        if failed:
+            raise FakeAPIError(self.config.error_status, retry_after=self.config.retry_after)
+        max_tokens = int(request.get("max_output_tokens") or self.config.output_tokens)
+        output_tokens = min(self.config.output_tokens, max_tokens)
+        text = self._text(request, output_tokens)
+        return text, _usage(estimate_tokens(_request_text(request)), output_tokens)
+
+
+class FakeSlackServer:
+    """Threaded HTTP stand-in for ``slack.com/api`` and incoming webhooks.
+
+    ``chat.postMessage`` / ``chat.update`` return ``ok`` with a fresh ``ts``; any other
+    POST (a webhook URL) answers ``ok``. ``latency`` delays every response,
+    ``rate_limit_every=N`` answers every Nth request with 429 + ``Retry-After``, and
+    ``calls`` counts requests per path (``requests`` keeps the JSON bodies).
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: int = 1,
+    ):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests: list[tuple[str, str]] = []
+        self.throttled = 0
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/api/"
+
+    @property
+    def webhook_url(self) -> str:
+        return f"{self.url}/webhook"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with server._lock:
+                    server.calls[self.path] += 1
+                    count = sum(server.calls.values())
+                    throttle = bool(server.rate_limit_every) and count % server.rate_limit_every == 0
+                    if throttle:
+                        server.throttled += 1
+                    else:
+                        server.requests.append((self.path, raw.decode("utf-8", "replace")))
+                if server.latency:
+                    time.sleep(server.latency)
+                if throttle:
+                    self.send_response(429)
+                    self.send_header("Retry-After", str(server.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if self.path.startswith("/api/"):
+                    body = json.dumps({"ok": True, "channel": "CFAKE", "ts": f"{time.time():.6f}{count}"})
+                    content_type = "application/json"
+                else:
+                    body, content_type = "ok", "text/plain"
+                payload = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args: Any) -> None:
+                return
+
+        return Handler
+
+    def start(self) -> "FakeSlackServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-slack", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeSlackServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+class FakeSMTPServer:
+    """Threaded SMTP sink that records delivered messages in ``messages``.
+
+    Accepts any ``AUTH PLAIN``/``AUTH LOGIN`` credentials (no TLS, so senders must use
+    ``plain=True``). ``reject`` lists recipients answered with 550, ``fail_first=N``
+    answers the first N ``DATA`` commands with 451, and ``max_messages_per_connection``
+    drops the connection with 421 once that many messages went over it, like many
+    hosted relays do.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        reject: Iterable[str] = (),
+        fail_first: int = 0,
+        max_messages_per_connection: int = 0,
+    ):
+        self.latency = latency
+        self.reject = {address.lower() for address in reject}
+        self.fail_first = fail_first
+        self.max_messages_per_connection = max_messages_per_connection
+        self.messages: List[Dict[str, Any]] = []
+        self.connections = 0
+        self.logins = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _handler(self) -> type[socketserver.StreamRequestHandler]:
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def handle(self) -> None:
+                with server._lock:
+                    server.connections += 1
+                sent_here = 0
+                sender, recipients = None, []
+                self.reply("220 fake-smtp ready")
+                while True:
+                    raw = self.rfile.readline()
+                    if not raw:
+                        return
+                    line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                    verb = line.split(" ", 1)[0].upper()
+                    if verb == "EHLO":
+                        self.wfile.write(b"250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                    elif verb == "HELO":
+                        self.reply("250 fake-smtp")
+                    elif verb == "AUTH":
+                        if line.upper().startswith("AUTH LOGIN"):
+                            self.reply("334 VXNlcm5hbWU6")
+                            self.rfile.readline()
+                            self.reply("334 UGFzc3dvcmQ6")
+                            self.rfile.readline()
+                        with server._lock:
+                            server.logins += 1
+                        self.reply("235 2.7.0 Authentication successful")
+                    elif verb == "MAIL":
+                        sender, recipients = line.split(":", 1)[1].strip().strip("<>"), []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        address = line.split(":", 1)[1].strip().split(" ")[0].strip("<>")
+                        if address.lower() in server.reject:
+                            self.reply("550 5.1.1 No such user")
+                        else:
+                            recipients.append(address)
+                            self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        lines = []
+                        while True:
+                            data = self.rfile.readline()
+                            if not data or data in (b".\r\n", b".\n"):
+                                break
+                            lines.append(data[1:] if data.startswith(b"..") else data)
+                        if server.latency:
+                            time.sleep(server.latency)
+                        with server._lock:
+                            failing = server.fail_first > 0
+                            if failing:
+                                server.fail_first -= 1
+                            else:
+                                server.messages.append(
+                                    {"from": sender, "to": list(recipients), "data": b"".join(lines).decode("utf-8", "replace")}
+                                )
+                        if failing:
+                            self.reply("451 4.3.0 Temporary failure, try again")
+                            continue
+                        sent_here += 1
+                        self.reply("250 OK queued")
+                        if server.max_messages_per_connection and sent_here >= server.max_messages_per_connection:
+                            self.reply("421 4.7.0 Too many messages on this connection")
+                            return
+                    elif verb == "RSET":
+                        sender, recipients = None, []
+                        self.reply("250 OK")
+                    elif verb == "NOOP":
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        return Handler
+
+    def start(self) -> "FakeSMTPServer":
+        threading.Thread(target=self._server.serve_forever, name="fake-smtp", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeSMTPServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+__all__ = ["FakeAPIError", "FakeLLMConfig", "FakeOpenAI", "FakeSMTPServer", "FakeSlackServer"]
@@ -5,9 +5,11 @@ import argparse
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Optional, Tuple
 from textwrap import dedent
 
+from brief import BRIEF_SECTIONS, project_brief
+
 AUDIENCE_BRIEF = dedent(
     """
     Audience:
@@ -18,12 +20,36 @@ AUDIENCE_BRIEF = dedent(
 ).strip()
 
 
+@dataclass(frozen=True)
+class SpecLimits:
+    """Hard limits stated in a spec's prose, checked locally by ``spec_checks``.
+
+    Ranges are inclusive ``(min, max)``; ``None`` means the spec sets no limit.
+    """
+
+    words: Optional[Tuple[int, int]] = None
+    hashtags: Optional[Tuple[int, int]] = None
+    max_links: Optional[int] = None
+    subject_chars: Optional[int] = None
+    preview_chars: Optional[int] = None
+    title_chars: Optional[int] = None
+    meta_description_chars: Optional[Tuple[int, int]] = None
+
+
 @dataclass(frozen=True)
 class ContentSpec:
+    """One channel's requirements.
+
+    ``sections`` names the ``brief.BRIEF_SECTIONS`` its prompt needs; a structured brief
+    is cut down to those (empty means the whole brief).
+    """
+
     label: str
     summary: str
     structure: str
     tone: str
+    limits: SpecLimits = SpecLimits()
+    sections: Tuple[str, ...] = ()
 
 
 CONTENT_SPECS: Dict[str, ContentSpec] = {
@@ -47,6 +73,8 @@ CONTENT_SPECS: Dict[str, ContentSpec] = {
             """
         ).strip(),
         tone="Tone: conversational, practical, zero jargon.",
+        limits=SpecLimits(words=(90, 180), hashtags=(2, 4), max_links=1),
+        sections=("executive_summary", "customer_insights", "messaging"),
     ),
     "newsletter": ContentSpec(
         label="Newsletter Email (open + click driver)",
@@ -71,6 +99,8 @@ CONTENT_SPECS: Dict[str, ContentSpec] = {
             """
         ).strip(),
         tone="Tone: reassuring, time-saving, clear hierarchy.",
+        limits=SpecLimits(words=(120, 180), subject_chars=45, preview_chars=90),
+        sections=("executive_summary", "customer_insights", "messaging"),
     ),
     "blog": ContentSpec(
         label="Blog Post (education + SEO + conversion)",
@@ -96,9 +126,13 @@ CONTENT_SPECS: Dict[str, ContentSpec] = {
             """
         ).strip(),
         tone="Tone: confident, non-technical; show outcomes, not internals.",
+        limits=SpecLimits(words=(700, 1000), title_chars=60, meta_description_chars=(150, 160)),
+        sections=("executive_summary", "customer_insights", "product_details", "messaging"),
     ),
 }
 
+VARIANT_HEADING = "=== Variant {index} ==="
+
 SYSTEM_PROMPT = dedent(
     """
     You are a senior product marketing copywriter. Translate launch research
@@ -133,12 +167,84 @@ def build_user_instructions(spec: ContentSpec, launch_brief: str) -> str:
     ).strip()
 
 
-def build_payload(content_type: str, launch_brief: str) -> Dict[str, str]:
+def build_revision_instructions(previous_draft: str, feedback: str) -> str:
+    return "\n\n".join(
+        [
+            "Revision request: a reviewer asked for changes to the previous draft below. Rewrite it "
+            "to address their feedback and keep everything the feedback does not mention.",
+            f"Reviewer feedback:\n{feedback.strip()}",
+            f"Previous draft:\n{previous_draft.strip()}",
+        ]
+    )
+
+
+def build_variant_instructions(count: int) -> str:
+    return (
+        f"Write {count} distinct variants of this asset, each complete and meeting every requirement "
+        "above on its own. Vary the hook, subject line or title and the angle; do not reword one draft. "
+        f"Start each variant with a line of the form `{VARIANT_HEADING.format(index=1)}` (numbered 1 to "
+        f"{count}) and write nothing before the first one."
+    )
+
+
+def build_payload(
+    content_type: str,
+    launch_brief: str,
+    *,
+    feedback: str | None = None,
+    previous_draft: str | None = None,
+    variants: int = 1,
+    project: bool = True,
+) -> Dict[str, str]:
+    """System/user prompt for one asset.
+
+    ``feedback`` turns it into a revision of ``previous_draft``; ``variants`` > 1 asks for
+    that many candidates in one response, split with ``variants.split_variants``. A
+    structured brief is cut to the spec's ``sections`` unless ``project`` is false.
+    """
     key = content_type.lower()
     if key not in CONTENT_SPECS:
         raise ValueError(f"Unknown content type '{content_type}'. Choose from: {', '.join(CONTENT_SPECS)}")
     spec = CONTENT_SPECS[key]
+    if project:
+        launch_brief = project_brief(launch_brief, spec.sections)
     user = build_user_instructions(spec, launch_brief)
+    if feedback and previous_draft:
+        user += "\n\n" + build_revision_instructions(previous_draft, feedback)
+    elif variants > 1:
+        user += "\n\n" + build_variant_instructions(variants)
+    return {"system": SYSTEM_PROMPT, "user": user}
+
+
+def build_multi_payload(content_types: Iterable[str], launch_brief: str, *, project: bool = True) -> Dict[str, str]:
+    """One prompt for several assets: the audience and launch brief appear once, then each spec.
+
+    The response is structured output with one string field per content type (see
+    ``pipeline.run_assets_single_call``). A structured brief keeps the sections any of
+    the specs needs.
+    """
+    keys = [content_type.lower() for content_type in content_types]
+    unknown = [key for key in keys if key not in CONTENT_SPECS]
+    if unknown:
+        raise ValueError(f"Unknown content type(s) {', '.join(unknown)}. Choose from: {', '.join(CONTENT_SPECS)}")
+    if project and all(CONTENT_SPECS[key].sections for key in keys):
+        needed = {section for key in keys for section in CONTENT_SPECS[key].sections}
+        launch_brief = project_brief(launch_brief, [section for section in BRIEF_SECTIONS if section in needed])
+    sections = [
+        f"## `{key}`: {spec.label}\n\nRequirements:\n{spec.summary}\n\n{spec.structure}\n\n{spec.tone}"
+        for key, spec in ((key, CONTENT_SPECS[key]) for key in keys)
+    ]
+    user = "\n\n".join(
+        [
+            f"Create {len(keys)} marketing assets for the following audience, one per channel below.",
+            AUDIENCE_BRIEF,
+            *sections,
+            "Ground everything in the launch brief provided below. Highlight concrete outcomes, cite proof "
+            "when available, and keep each voice channel-appropriate. Return JSON with one field per channel "
+            f"({', '.join(keys)}); each field holds that channel's finished asset as Markdown.",
+            f"Launch brief:\n{launch_brief}",
+        ]
+    )
     return {"system": SYSTEM_PROMPT, "user": user}
 
 
@@ -198,6 +304,10 @@ if __name__ == "__main__":
 __all__ = [
     "AUDIENCE_BRIEF",
     "CONTENT_SPECS",
+    "ContentSpec",
+    "SpecLimits",
+    "VARIANT_HEADING",
+    "build_multi_payload",
     "build_payload",
     "load_launch_brief",
     "print_payload",
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+"""Hedged requests: duplicate slow calls and keep whichever answer arrives first."""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterable, Optional, TypeVar
+
+from cancellation import CancelToken, RunCancelled
+
+T = TypeVar("T")
+
+# attempt(token, hedged) -> result; ``hedged`` is True for the duplicate request.
+Attempt = Callable[[CancelToken, bool], T]
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, int(round(pct / 100.0 * len(samples))) - 1))
+        return samples[rank]
+
+
+class HedgePolicy:
+    """Issue a duplicate request once a call outlives the ``percentile`` of recent latency.
+
+    ``budget`` caps hedges at that fraction of primary calls so far (0.1 = at most 10%
+    extra requests): a run of n calls hedges at most ``budget * n`` of them, so a short
+    run needs a larger budget to hedge at all. Until ``min_samples`` latencies are known,
+    ``fallback_delay`` (if set) is used as the hedge trigger instead of a percentile;
+    ``seed`` preloads latencies from earlier runs so the percentile is known up front.
+
+    The losing attempt's token is cancelled; attempts that should be aborted rather than
+    run to completion must honour it (``pipeline`` gives each attempt an isolated client).
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 95.0,
+        budget: float = 0.1,
+        min_samples: int = 10,
+        window: int = 200,
+        fallback_delay: float | None = None,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if budget < 0:
+            raise ValueError("budget must be >= 0")
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.fallback_delay = fallback_delay
+        self.latencies = LatencyTracker(window)
+        self._lock = threading.Lock()
+        self.primary_calls = 0
+        self.hedges_issued = 0
+        self.hedges_won = 0
+
+    def seed(self, latencies: Iterable[float]) -> None:
+        """Preload latencies (seconds) observed by earlier runs, e.g. from the call ledger."""
+        for seconds in latencies:
+            self.latencies.observe(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return self.fallback_delay
+        return self.latencies.percentile(self.percentile)
+
+    def _spend_hedge(self) -> bool:
+        with self._lock:
+            allowed = self.budget * self.primary_calls
+            if self.hedges_issued + 1 > allowed:
+                return False
+            self.hedges_issued += 1
+            return True
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            stats: Dict[str, float] = {
+                "primary_calls": self.primary_calls,
+                "hedges_issued": self.hedges_issued,
+                "hedges_won": self.hedges_won,
+            }
+        delay = self.hedge_delay()
+        stats["hedge_delay_seconds"] = round(delay, 3) if delay is not None else -1
+        return stats
+
+    def call(self, attempt: Attempt[T], *, cancel: CancelToken | None = None) -> T:
+        with self._lock:
+            self.primary_calls += 1
+        tokens: Dict[Future, CancelToken] = {}
+        started: Dict[Future, float] = {}
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hedge")
+
+        def launch(hedged: bool) -> Future:
+            token = cancel.child() if cancel is not None else CancelToken()
+            ctx = contextvars.copy_context()
+            future = pool.submit(ctx.run, attempt, token, hedged)
+            tokens[future] = token
+            started[future] = time.perf_counter()
+            return future
+
+        try:
+            primary = launch(False)
+            pending = {primary}
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = wait({primary}, timeout=delay)
+                if not done and self._spend_hedge():
+                    pending.add(launch(True))
+            errors = []
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    exc = future.exception()
+                    if exc is not None:
+                        errors.append(exc)
+                        continue
+                    self.latencies.observe(time.perf_counter() - started[future])
+                    if future is not primary:
+                        with self._lock:
+                            self.hedges_won += 1
+                    for loser in pending:
+                        tokens[loser].cancel("hedge lost")
+                    return future.result()
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            # Prefer the primary's error; a cancelled loser's RunCancelled is just noise.
+            real = [exc for exc in errors if not isinstance(exc, RunCancelled)]
+            raise (real or errors)[0]
+        finally:
+            pool.shutdown(wait=False)
+
+
+def policy_from_env() -> Optional[HedgePolicy]:
+    """Build the server's shared policy from HEDGE_PERCENTILE / HEDGE_BUDGET (off when unset)."""
+    raw = os.getenv("HEDGE_PERCENTILE")
+    if not raw:
+        return None
+    fallback = os.getenv("HEDGE_FALLBACK_DELAY")
+    return HedgePolicy(
+        percentile=float(raw),
+        budget=float(os.getenv("HEDGE_BUDGET", "0.1")),
+        fallback_delay=float(fallback) if fallback else None,
+    )
+
+
+__all__ = ["HedgePolicy", "LatencyTracker", "policy_from_env"]
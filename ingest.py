@@ -2,15 +2,19 @@ from __future__ import annotations
 
 """Helpers for ingesting task documents into notebook-friendly objects."""
 
+import os
 import re
 from pathlib import Path
 from typing import Dict, Iterable, List, Sequence, Tuple
 from xml.etree import ElementTree as ET
 from zipfile import ZipFile
 
-from pypdf import PdfReader
+from metrics import stage_timer
+from profiling import stage as profile_stage
+from tracing import span
 
-BASE_DIR = Path(__file__).resolve().parent / "docs_in"
+# DOCS_DIR points ingestion at another corpus (e.g. the synthetic ones bench.py generates).
+BASE_DIR = Path(os.getenv("DOCS_DIR") or Path(__file__).resolve().parent / "docs_in")
 SUPPORTED_SUFFIXES = {".docx", ".pdf"}
 WORD_NS = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
 
@@ -57,6 +61,8 @@ def read_docx(filename: str | Path, *, base_dir: Path = BASE_DIR) -> str:
 
 def read_pdf(filename: str | Path, *, base_dir: Path = BASE_DIR) -> str:
     """Return concatenated text from every page of a PDF file."""
+    from pypdf import PdfReader
+
     reader = PdfReader(_resolve(filename, base_dir))
     pages: List[str] = []
     for page in reader.pages:
@@ -65,30 +71,36 @@ def read_pdf(filename: str | Path, *, base_dir: Path = BASE_DIR) -> str:
     return "\n".join(pages).strip()
 
 
+def _extract_text(path: Path) -> str:
+    size = path.stat().st_size
+    if path.suffix.lower() == ".pdf":
+        with span("ingest.read_pdf", file=path.name, bytes=size):
+            return read_pdf(path, base_dir=path.parent)
+    with span("ingest.read_docx", file=path.name, bytes=size):
+        return read_docx(path, base_dir=path.parent)
+
+
 def ingest_documents(
     *,
     base_dir: Path = BASE_DIR,
     files: Iterable[Path | str] | None = None,
 ) -> Tuple[List[Dict[str, str]], Dict[str, str]]:
     """Build both the docs list and a dict keyed by name for notebook use."""
-    if files is None:
-        file_paths: Sequence[Path | str] = _discover_files(base_dir)
-    else:
-        file_paths = list(files)
-
-    docs: List[Dict[str, str]] = []
-    text_lookup: Dict[str, str] = {}
-
-    for entry in file_paths:
-        path = _resolve(entry, base_dir)
-        suffix = path.suffix.lower()
-        if suffix == ".pdf":
-            text = read_pdf(path, base_dir=path.parent)
+    with stage_timer("ingest"), span("ingest"), profile_stage("ingest"):
+        if files is None:
+            file_paths: Sequence[Path | str] = _discover_files(base_dir)
         else:
-            text = read_docx(path, base_dir=path.parent)
-        name = _humanize_name(path)
-        text_lookup[name] = text
-        docs.append({"name": name, "text": text})
+            file_paths = list(files)
+
+        docs: List[Dict[str, str]] = []
+        text_lookup: Dict[str, str] = {}
+
+        for entry in file_paths:
+            path = _resolve(entry, base_dir)
+            text = _extract_text(path)
+            name = _humanize_name(path)
+            text_lookup[name] = text
+            docs.append({"name": name, "text": text})
 
     return docs, text_lookup
 
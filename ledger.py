@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+"""SQLite ledger of every LLM call: tokens, latency, and estimated cost."""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    stage TEXT NOT NULL,
+    content_type TEXT,
+    model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms REAL NOT NULL,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+)
+"""
+
+# USD per 1M tokens: (input, cached input, output). Dated snapshots match by prefix.
+PRICING: Dict[str, tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "o4-mini": (1.10, 0.275, 4.40),
+}
+
+# Batch API jobs are billed at this fraction of the interactive price.
+BATCH_DISCOUNT = 0.5
+
+GROUP_COLUMNS = {
+    "day": "date(created_at, 'unixepoch', 'localtime')",
+    "model": "model",
+    "stage": "stage",
+    "content_type": "COALESCE(content_type, '-')",
+    "run_id": "COALESCE(run_id, '-')",
+}
+
+
+def _pricing_for(model: str) -> Optional[tuple[float, float, float]]:
+    for name in sorted(PRICING, key=len, reverse=True):
+        if model == name or model.startswith(f"{name}-"):
+            return PRICING[name]
+    return None
+
+
+def estimate_cost(
+    model: str,
+    *,
+    input_tokens: int,
+    output_tokens: int,
+    cached_tokens: int = 0,
+    batch: bool = False,
+) -> float:
+    """Estimated USD cost; unknown models cost 0 so they still show up in reports."""
+    prices = _pricing_for(model)
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    uncached = max(input_tokens - cached_tokens, 0)
+    cost = (uncached * input_price + cached_tokens * cached_price + output_tokens * output_price) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+def usage_counts(response: Any) -> Dict[str, int]:
+    """Pull input/output/cached token counts from a Responses API ``usage`` block."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "input_tokens_details", None)
+    return {
+        "input_tokens": int(getattr(usage, "input_tokens", 0) or 0),
+        "output_tokens": int(getattr(usage, "output_tokens", 0) or 0),
+        "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0),
+    }
+
+
+class CallLedger:
+    def __init__(self, db_path: Path | str):
+        raw_path = Path(db_path)
+        self.path = raw_path.expanduser()
+        parent = self.path.parent if self.path.parent != Path("") else Path(".")
+        parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            return sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        except sqlite3.OperationalError as exc:
+            raise sqlite3.OperationalError(f"{exc} (path={self.path})") from exc
+
+    def _ensure_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+
+    def record(
+        self,
+        *,
+        run_id: str | None,
+        stage: str,
+        content_type: str | None,
+        model: str,
+        status: str,
+        latency_ms: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cached_tokens: int = 0,
+        batch: bool = False,
+    ) -> None:
+        cost = estimate_cost(
+            model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_tokens=cached_tokens,
+            batch=batch,
+        )
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO llm_calls (
+                    run_id, stage, content_type, model, status,
+                    input_tokens, output_tokens, cached_tokens, latency_ms, cost_usd, created_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run_id,
+                    stage,
+                    content_type,
+                    model,
+                    status,
+                    input_tokens,
+                    output_tokens,
+                    cached_tokens,
+                    latency_ms,
+                    cost,
+                    time.time(),
+                ),
+            )
+
+    def recent_latencies(self, *, stage: str, model: str | None = None, limit: int = 200) -> List[float]:
+        """Seconds taken by the latest ``limit`` successful ``stage`` calls, oldest first."""
+        where = "stage = ? AND status = 'ok'" + (" AND model = ?" if model else "")
+        params: List[Any] = [stage] + ([model] if model else []) + [limit]
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT latency_ms FROM llm_calls WHERE {where} ORDER BY id DESC LIMIT ?",
+                params,
+            ).fetchall()
+        return [row[0] / 1000.0 for row in reversed(rows)]
+
+    def report(
+        self,
+        *,
+        group_by: Sequence[str] = ("day", "model", "stage"),
+        since: float | None = None,
+        run_id: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        unknown = [key for key in group_by if key not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown group column(s): {', '.join(unknown)}. Choose from: {', '.join(GROUP_COLUMNS)}")
+        keys = list(group_by)
+        select_keys = [f"{GROUP_COLUMNS[key]} AS {key}" for key in keys]
+        where: List[str] = []
+        params: List[Any] = []
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        if run_id:
+            where.append("run_id = ?")
+            params.append(run_id)
+        sql = f"""
+            SELECT {', '.join(select_keys + [
+                "COUNT(*) AS calls",
+                "SUM(CASE WHEN status != 'ok' THEN 1 ELSE 0 END) AS failed",
+                "SUM(input_tokens) AS input_tokens",
+                "SUM(output_tokens) AS output_tokens",
+                "SUM(cached_tokens) AS cached_tokens",
+                "AVG(latency_ms) AS avg_latency_ms",
+                "MAX(latency_ms) AS max_latency_ms",
+                "SUM(cost_usd) AS cost_usd",
+            ])}
+            FROM llm_calls
+            {"WHERE " + " AND ".join(where) if where else ""}
+            {"GROUP BY " + ", ".join(keys) if keys else ""}
+            {"ORDER BY " + ", ".join(keys) if keys else ""}
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+
+_ledger: Optional[CallLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def configure_ledger(db_path: Path | str | None) -> Optional[CallLedger]:
+    """Point the process-wide ledger at ``db_path`` (None disables recording)."""
+    global _ledger
+    ledger = CallLedger(db_path) if db_path else None
+    with _ledger_lock:
+        _ledger = ledger
+    return ledger
+
+
+def get_ledger() -> Optional[CallLedger]:
+    with _ledger_lock:
+        return _ledger
+
+
+def record_call(
+    *,
+    run_id: str | None,
+    stage: str,
+    content_type: str | None,
+    model: str,
+    status: str,
+    latency_ms: float,
+    response: Any = None,
+    batch: bool = False,
+) -> None:
+    """Record a call on the configured ledger; ledger failures never break a run.
+
+    ``batch`` marks Batch API results, which are costed at ``BATCH_DISCOUNT``.
+    """
+    ledger = get_ledger()
+    if ledger is None:
+        return
+    counts = usage_counts(response) if response is not None else {}
+    try:
+        ledger.record(
+            run_id=run_id,
+            stage=stage,
+            content_type=content_type,
+            model=model,
+            status=status,
+            latency_ms=latency_ms,
+            batch=batch,
+            **counts,
+        )
+    except sqlite3.Error as exc:  # pragma: no cover - best-effort bookkeeping
+        print(f"Warning: failed to record LLM call in ledger ({exc}).")
+
+
+def default_ledger_path(base_dir: Path) -> Path:
+    return Path(os.getenv("LEDGER_DB") or base_dir / "ledger.db")
+
+
+def format_report(rows: Sequence[Dict[str, Any]], group_by: Sequence[str]) -> str:
+    headers = list(group_by) + ["calls", "failed", "input", "output", "cached", "avg_ms", "max_ms", "cost_usd"]
+    table = [headers]
+    totals = {"calls": 0, "failed": 0, "input": 0, "output": 0, "cached": 0, "cost": 0.0}
+    for row in rows:
+        table.append(
+            [str(row[key]) for key in group_by]
+            + [
+                str(row["calls"]),
+                str(row["failed"]),
+                str(row["input_tokens"] or 0),
+                str(row["output_tokens"] or 0),
+                str(row["cached_tokens"] or 0),
+                f"{row['avg_latency_ms'] or 0:.0f}",
+                f"{row['max_latency_ms'] or 0:.0f}",
+                f"{row['cost_usd'] or 0:.4f}",
+            ]
+        )
+        totals["calls"] += row["calls"]
+        totals["failed"] += row["failed"] or 0
+        totals["input"] += row["input_tokens"] or 0
+        totals["output"] += row["output_tokens"] or 0
+        totals["cached"] += row["cached_tokens"] or 0
+        totals["cost"] += row["cost_usd"] or 0.0
+    table.append(
+        (["TOTAL"] + [""] * (len(group_by) - 1) if group_by else [])
+        + [
+            str(totals["calls"]),
+            str(totals["failed"]),
+            str(totals["input"]),
+            str(totals["output"]),
+            str(totals["cached"]),
+            "",
+            "",
+            f"{totals['cost']:.4f}",
+        ]
+    )
+    widths = [max(len(line[idx]) for line in table) for idx in range(len(headers))]
+    lines = ["  ".join(cell.ljust(widths[idx]) for idx, cell in enumerate(line)).rstrip() for line in table]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+__all__ = [
+    "BATCH_DISCOUNT",
+    "CallLedger",
+    "PRICING",
+    "configure_ledger",
+    "default_ledger_path",
+    "estimate_cost",
+    "format_report",
+    "get_ledger",
+    "record_call",
+]
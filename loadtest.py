@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+"""Local HTTP load test for the FastAPI server with fake LLM and Slack backends.
+
+For every worker count, a fresh server is started from ``fake_api_app`` (``api.app``
+with ``fakes.FakeOpenAI`` as its client) and ``SLACK_API_URL`` pointed at an
+in-process :class:`fakes.FakeSlackServer`. Then
+``--concurrency`` closed-loop clients drive the chosen endpoints for ``--duration``
+seconds. Latency percentiles, error rates and throughput are printed per worker
+count and saved as JSON so runs can be compared.
+
+    python loadtest.py --workers 1,2,4 --concurrency 16 --duration 30
+    python loadtest.py --endpoints slack,assets --latency 0.5 --compare outputs/loadtest/loadtest-....json
+"""
+
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import requests
+
+from approvals import ApprovalStore
+from bench import corpus_for, use_fake_llm
+from fakes import FakeSlackServer
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT_DIR = BASE_DIR / "outputs" / "loadtest"
+ENDPOINTS = ("summary", "assets", "pipeline", "slack")
+SIGNING_SECRET = "loadtest-signing-secret"
+LAUNCH_BRIEF = (
+    "# Launch brief\n\nExecutive summary: the export workflow ships to all teams next week.\n"
+    "- Faster onboarding\n- Lower support load\n- Enterprise rollout first\n"
+)
+SEEDED_APPROVALS = 500
+PERCENTILES = (50, 90, 95, 99)
+
+# (method, path, body, headers) for one request.
+RequestSpec = Tuple[str, str, bytes, Dict[str, str]]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def slack_action_request(run_id: str, item_id: str, *, decision: str = "approve") -> RequestSpec:
+    """A signed Slack interactivity callback, as Slack would send it for a button press."""
+    payload = {
+        "type": "block_actions",
+        "user": {"id": "ULOAD", "name": "load-tester"},
+        "channel": {"id": "CFAKE"},
+        "message": {"ts": "1700000000.000100"},
+        "actions": [{"value": json.dumps({"action": decision, "run_id": run_id, "item_id": item_id})}],
+    }
+    body = urllib.parse.urlencode({"payload": json.dumps(payload)}).encode()
+    timestamp = str(int(time.time()))
+    digest = hmac.new(SIGNING_SECRET.encode(), f"v0:{timestamp}:{body.decode()}".encode(), hashlib.sha256)
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest.hexdigest()}",
+    }
+    return "POST", "/slack/actions", body, headers
+
+
+def _json_request(path: str, payload: Dict[str, Any]) -> Callable[[], RequestSpec]:
+    body = json.dumps(payload).encode()
+    return lambda: ("POST", path, body, {"Content-Type": "application/json"})
+
+
+def request_factories(run_id: str) -> Dict[str, Callable[[], RequestSpec]]:
+    items = itertools.cycle(range(SEEDED_APPROVALS))
+    lock = threading.Lock()
+
+    def slack() -> RequestSpec:
+        with lock:
+            index = next(items)
+        return slack_action_request(run_id, f"item-{index}")
+
+    return {
+        "summary": _json_request("/summary", {}),
+        "assets": _json_request("/assets", {"launch_brief": LAUNCH_BRIEF}),
+        "pipeline": _json_request("/pipeline", {}),
+        "slack": slack,
+    }
+
+
+def fake_api_app() -> Any:
+    """``api.app`` with the fake LLM client; uvicorn calls this in each worker (``--factory``)."""
+    use_fake_llm()
+    from api import app
+
+    return app
+
+
+class ServerProcess:
+    """``uvicorn loadtest:fake_api_app --factory --workers N`` on a free port with fake upstreams."""
+
+    def __init__(self, *, workers: int, env: Dict[str, str], work_dir: Path):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._log = (work_dir / f"uvicorn-{workers}.log").open("w")
+        self._proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "loadtest:fake_api_app",
+                "--factory",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(workers),
+                "--log-level",
+                "warning",
+            ],
+            cwd=BASE_DIR,
+            env=env,
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+
+    def wait_ready(self, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited early; see {self._log.name}")
+            try:
+                if requests.get(f"{self.url}/health", timeout=1).ok:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"uvicorn did not become ready in {timeout:.0f}s; see {self._log.name}")
+
+    def stop(self) -> None:
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._log.close()
+
+
+def drive(
+    base_url: str,
+    *,
+    endpoints: List[str],
+    factories: Dict[str, Callable[[], RequestSpec]],
+    concurrency: int,
+    duration: float,
+    timeout: float,
+) -> Tuple[List[Tuple[str, int, float]], float]:
+    """Closed-loop load: each client sends its next request as soon as the last returns."""
+    samples: List[Tuple[str, int, float]] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(index: int) -> None:
+        session = requests.Session()
+        # Stagger clients across endpoints so every mix is exercised from the start.
+        order = itertools.islice(itertools.cycle(endpoints), index % len(endpoints), None)
+        local: List[Tuple[str, int, float]] = []
+        for endpoint in order:
+            if time.monotonic() >= deadline:
+                break
+            method, path, body, headers = factories[endpoint]()
+            started = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, data=body, headers=headers, timeout=timeout)
+                status = response.status_code
+            except requests.RequestException:
+                status = 0
+            local.append((endpoint, status, time.perf_counter() - started))
+        session.close()
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as pool:
+        list(pool.map(client, range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def summarise(samples: List[Tuple[str, int, float]], elapsed: float) -> Dict[str, Any]:
+    groups: Dict[str, List[Tuple[int, float]]] = {}
+    for endpoint, status, latency in samples:
+        groups.setdefault(endpoint, []).append((status, latency))
+        groups.setdefault("all", []).append((status, latency))
+    summary: Dict[str, Any] = {}
+    for endpoint, entries in sorted(groups.items()):
+        latencies = sorted(latency for _, latency in entries)
+        errors = sum(1 for status, _ in entries if status == 0 or status >= 400)
+        statuses: Dict[str, int] = {}
+        for status, _ in entries:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        summary[endpoint] = {
+            "requests": len(entries),
+            "errors": errors,
+            "error_rate": round(errors / len(entries), 4),
+            "rps": round(len(entries) / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                **{f"p{pct}": round(_percentile(latencies, pct) * 1000, 1) for pct in PERCENTILES},
+                "max": round(latencies[-1] * 1000, 1),
+            },
+            "status_codes": statuses,
+        }
+    return summary
+
+
+def format_report(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any] | None = None) -> str:
+    base = (baseline or {}).get("results", {})
+    header = f"{'workers':>7} {'endpoint':<9} {'reqs':>6} {'rps':>8} {'err%':>6}" + "".join(
+        f" {f'p{pct}_ms':>8}" for pct in PERCENTILES
+    )
+    lines = [header]
+    for workers, endpoints in results.items():
+        for endpoint, stats in endpoints.items():
+            latency = stats["latency_ms"]
+            line = (
+                f"{workers:>7} {endpoint:<9} {stats['requests']:6d} {stats['rps']:8.2f} "
+                f"{stats['error_rate'] * 100:6.1f}" + "".join(f" {latency[f'p{pct}']:8.1f}" for pct in PERCENTILES)
+            )
+            previous = base.get(workers, {}).get(endpoint)
+            if previous and previous["rps"]:
+                change = (stats["rps"] - previous["rps"]) / previous["rps"] * 100
+                line += f"  rps {change:+.1f}%"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the FastAPI server against fake upstreams.")
+    parser.add_argument("--workers", default="1,2", help="Comma-separated uvicorn worker counts to compare")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent closed-loop clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load per worker count")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unrecorded load before measuring")
+    parser.add_argument(
+        "--endpoints",
+        default=",".join(ENDPOINTS),
+        help=f"Comma-separated endpoints to mix ({', '.join(ENDPOINTS)})",
+    )
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request client timeout in seconds")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean fake LLM latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake LLM calls failing with 429")
+    parser.add_argument("--slack-latency", type=float, default=0.05, help="Fake Slack API latency in seconds")
+    parser.add_argument("--corpus", default="small", help="Synthetic corpus size from bench.py")
+    parser.add_argument("--output", type=Path, help="Report path (default outputs/loadtest/loadtest-<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier report to diff throughput against")
+    return parser.parse_args(list(argv) if argv is not None else None)
+
+
+def main(argv: Iterable[str] | None = None) -> None:
+    args = parse_args(argv)
+    workers_list = [int(value) for value in args.workers.split(",") if value.strip()]
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"Unknown endpoint(s): {', '.join(unknown)}")
+    corpus = corpus_for(args.corpus, BASE_DIR / "outputs" / "bench" / "corpora")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with FakeSlackServer(latency=args.slack_latency) as slack, tempfile.TemporaryDirectory(prefix="loadtest-") as tmp:
+        work_dir = Path(tmp)
+        for workers in workers_list:
+            run_id = f"loadtest-{workers}"
+            approvals_db = work_dir / f"approvals-{workers}.db"
+            store = ApprovalStore(approvals_db)
+            for index in range(SEEDED_APPROVALS):
+                store.upsert_item(run_id=run_id, item_id=f"item-{index}", title="Draft", body=LAUNCH_BRIEF)
+            env = dict(os.environ)
+            env.update(
+                {
+                    "FAKE_LLM_LATENCY": str(args.latency),
+                    "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+                    "DOCS_DIR": str(corpus),
+                    "SLACK_API_URL": slack.api_url,
+                    "SLACK_BOT_TOKEN": "xoxb-loadtest",
+                    "SLACK_SIGNING_SECRET": SIGNING_SECRET,
+                    "APPROVALS_DB": str(approvals_db),
+                    "LEDGER_DB": str(work_dir / f"ledger-{workers}.db"),
+                    "TRACE_FILE": "off",
+                }
+            )
+            server = ServerProcess(workers=workers, env=env, work_dir=work_dir)
+            try:
+                server.wait_ready()
+                factories = request_factories(run_id)
+                drive_args = dict(
+                    endpoints=endpoints,
+                    factories=factories,
+                    concurrency=args.concurrency,
+                    timeout=args.timeout,
+                )
+                if args.warmup:
+                    drive(server.url, duration=args.warmup, **drive_args)
+                print(f"Loading {workers} worker(s) for {args.duration:.0f}s...", file=sys.stderr)
+                samples, elapsed = drive(server.url, duration=args.duration, **drive_args)
+            finally:
+                server.stop()
+            results[str(workers)] = summarise(samples, elapsed)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in {"output", "compare"}},
+        "results": results,
+    }
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print(format_report(results, baseline))
+    output = args.output or DEFAULT_OUTPUT_DIR / f"loadtest-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Saved load-test report to {output}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["ServerProcess", "drive", "fake_api_app", "slack_action_request", "summarise"]
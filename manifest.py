@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+"""Atomic, incremental output writes tracked in a content-hash manifest.
+
+``outputs/manifest.json`` records the SHA-256, size and mtime of every file written
+through ``OutputManifest``. A write whose content hash matches the manifest (and whose
+file is untouched on disk) is skipped, so unchanged artifacts keep their mtime and sync
+tools do not re-upload them. Every write goes to a temp file in the same directory and
+is renamed into place, so readers never see a half-written file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+
+def default_manifest_path(base_dir: Path) -> Path:
+    return Path(os.getenv("OUTPUT_MANIFEST") or base_dir / "manifest.json")
+
+
+@contextmanager
+def atomic_path(path: Path | str) -> Iterator[Path]:
+    """Yield a temp path next to ``path``; it replaces ``path`` only if the block succeeds."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    os.close(fd)
+    try:
+        yield Path(tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def write_atomic(path: Path | str, data: bytes) -> None:
+    with atomic_path(path) as tmp:
+        with open(tmp, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class OutputManifest:
+    """Content hashes of files under one output directory.
+
+    Entries are keyed by path relative to the manifest's directory. The manifest is
+    rewritten atomically after each change; concurrent processes sharing one manifest
+    only risk a redundant rewrite, never a corrupt file.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path).expanduser()
+        self.root = self.path.parent
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8")).get("files", {})
+            except (OSError, ValueError) as exc:
+                print(f"Warning: ignoring unreadable output manifest {self.path} ({exc}).")
+        self.stats: Dict[str, int] = {"written": 0, "unchanged": 0}
+
+    def _key(self, path: Path | str) -> str:
+        resolved = Path(path).resolve()
+        try:
+            return resolved.relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return str(resolved)
+
+    def _save(self) -> None:
+        payload = {"version": 1, "files": self._entries}
+        write_atomic(self.path, json.dumps(payload, indent=2, sort_keys=True).encode("utf-8"))
+
+    def entry(self, path: Path | str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+            return dict(entry) if entry else None
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: dict(value) for key, value in self._entries.items()}
+
+    def is_current(self, path: Path | str, digest: str) -> bool:
+        """True when ``path`` on disk is exactly what the manifest recorded with ``digest``."""
+        entry = self._entries.get(self._key(path))
+        if not entry or entry.get("sha256") != digest:
+            return False
+        try:
+            stat = Path(path).stat()
+        except FileNotFoundError:
+            return False
+        return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns")
+
+    def write_bytes(self, path: Path | str, data: bytes, **metadata: Any) -> bool:
+        """Write ``data`` unless the file already holds it; returns whether it was written."""
+        digest = sha256_hex(data)
+        with self._lock:
+            if self.is_current(path, digest):
+                self.stats["unchanged"] += 1
+                return False
+            write_atomic(path, data)
+            stat = Path(path).stat()
+            self._entries[self._key(path)] = {
+                "sha256": digest,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "updated_at": time.time(),
+                **{key: value for key, value in metadata.items() if value is not None},
+            }
+            self._save()
+            self.stats["written"] += 1
+            return True
+
+    def write_text(self, path: Path | str, text: str, **metadata: Any) -> bool:
+        return self.write_bytes(path, text.encode("utf-8"), **metadata)
+
+    def fingerprint(self, paths: Mapping[str, Path | str]) -> Optional[Dict[str, str]]:
+        """Recorded hashes for ``paths`` (name -> path) if all are current on disk, else None."""
+        hashes: Dict[str, str] = {}
+        with self._lock:
+            for name, path in paths.items():
+                entry = self._entries.get(self._key(path))
+                if not entry or not self.is_current(path, entry["sha256"]):
+                    return None
+                hashes[name] = entry["sha256"]
+        return hashes
+
+
+__all__ = [
+    "OutputManifest",
+    "atomic_path",
+    "default_manifest_path",
+    "sha256_hex",
+    "write_atomic",
+]
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+"""Markdown → HTML and plain text from one python-markdown parse.
+
+``render`` runs python-markdown once (tables, fenced code, sane lists), keeps the
+ElementTree it builds, and derives both outputs from it: the HTML is python-markdown's
+own serialisation, the plain text a walk of the same tree. The result is memoised by
+content hash, so repeated sends of the same draft cost a dict lookup.
+
+Models often start a list straight after a paragraph line (``Benefits:\\n- ...``),
+which python-markdown would otherwise fold into the paragraph; a preprocessor inserts
+the blank line a reader would assume.
+"""
+
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional
+from xml.etree.ElementTree import Element
+
+from metrics import record_cache
+
+CACHE_SIZE = 256
+EXTENSIONS = ["tables", "fenced_code", "sane_lists"]
+
+
+@dataclass(frozen=True)
+class Rendered:
+    html: str
+    text: str
+
+
+_LIST_ITEM_RE = re.compile(r"^ {0,3}(?:[-*+]|\d{1,9}[.)])[ \t]+\S")
+_BLOCK_TAGS = {"p", "ul", "ol", "pre", "blockquote", "table", "hr", "div", "h1", "h2", "h3", "h4", "h5", "h6"}
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _markdown_class() -> Any:
+    """A ``markdown.Markdown`` subclass that keeps its tree (imports python-markdown lazily)."""
+    import markdown
+    from markdown.preprocessors import Preprocessor
+    from markdown.treeprocessors import Treeprocessor
+
+    class ListSpacing(Preprocessor):
+        def run(self, lines: List[str]) -> List[str]:
+            out: List[str] = []
+            for line in lines:
+                previous = out[-1] if out else ""
+                if (
+                    _LIST_ITEM_RE.match(line)
+                    and previous.strip()
+                    and not _LIST_ITEM_RE.match(previous)
+                    and not previous.startswith((" ", "\t"))
+                ):
+                    out.append("")
+                out.append(line)
+            return out
+
+    class KeepTree(Treeprocessor):
+        def run(self, root: Element) -> None:
+            self.md.tree = root
+
+    class TreeMarkdown(markdown.Markdown):
+        tree: Optional[Element] = None
+
+        def build_parser(self) -> "TreeMarkdown":
+            super().build_parser()
+            # After fenced code is stashed, so code blocks are left alone.
+            self.preprocessors.register(ListSpacing(self), "list_spacing", 15)
+            # Last, once inline patterns and unescaping have run.
+            self.treeprocessors.register(KeepTree(self), "keep_tree", -1)
+            return self
+
+    return TreeMarkdown
+
+
+_local = threading.local()
+
+
+def _converter() -> Any:
+    # Markdown instances are not thread-safe; each thread reuses its own.
+    converter = getattr(_local, "converter", None)
+    if converter is None:
+        converter = _local.converter = _markdown_class()(extensions=EXTENSIONS)
+    return converter
+
+
+# --- Plain-text rendering ------------------------------------------------------
+
+
+class _TextRenderer:
+    """Walks the tree python-markdown built; raw HTML comes back from its stash."""
+
+    def __init__(self, converter: Any):
+        from markdown import util
+
+        self._stash = list(converter.htmlStash.rawHtmlBlocks)
+        self._placeholder = re.compile(re.escape(util.STX) + r"wzxhzdk:(\d+)" + re.escape(util.ETX))
+        self._amp = util.AMP_SUBSTITUTE
+
+    def _raw(self, match: "re.Match[str]") -> str:
+        index = int(match.group(1))
+        block = str(self._stash[index]) if index < len(self._stash) else ""
+        return _TAG_RE.sub("", block)
+
+    def _clean(self, text: str | None) -> str:
+        if not text:
+            return ""
+        return html.unescape(self._placeholder.sub(self._raw, text).replace(self._amp, "&"))
+
+    def inline(self, element: Element) -> str:
+        parts = [self._clean(element.text)]
+        for child in element:
+            if child.tag == "br":
+                parts.append("\n")
+            elif child.tag == "img":
+                parts.append(child.get("alt") or "")
+            elif child.tag == "a":
+                label = self.inline(child)
+                href = child.get("href") or ""
+                parts.append(label if not href or label == href or href.startswith("#") else f"{label} ({href})")
+            elif child.tag in _BLOCK_TAGS:
+                parts.append("\n" + "\n\n".join(self.blocks(child)) + "\n")
+            else:
+                parts.append(self.inline(child))
+            parts.append(self._clean(child.tail))
+        # Soft line breaks inside a paragraph become spaces, like an email client would show them.
+        return re.sub(r"[ \t]*(?<!\n)\n(?!\n)[ \t]*", " ", "".join(parts)).strip()
+
+    def blocks(self, element: Element) -> List[str]:
+        out: List[str] = []
+        for child in element:
+            block = self.block(child)
+            if block:
+                out.append(block)
+        return out
+
+    def block(self, element: Element) -> str:
+        tag = element.tag
+        if tag == "p":
+            text = element.text or ""
+            stashed = self._placeholder.fullmatch(text.strip())
+            if stashed and not len(element):
+                return self._stashed_block(int(stashed.group(1)))
+            return self.inline(element)
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            return self.inline(element)
+        if tag == "hr":
+            return "-" * 20
+        if tag == "pre":
+            code = element.find("code")
+            return _indent(self._clean((code if code is not None else element).text).rstrip("\n"), "    ")
+        if tag == "blockquote":
+            return _indent("\n\n".join(self.blocks(element)), "> ")
+        if tag in ("ul", "ol"):
+            items: List[str] = []
+            start = int(element.get("start") or 1)
+            for index, item in enumerate(element.findall("li"), start=start):
+                marker = f"{index}. " if tag == "ol" else "- "
+                items.append(_indent(self.list_item(item), " " * len(marker), marker))
+            return "\n".join(items)
+        if tag == "table":
+            rows = element.iter("tr")
+            return "\n".join(" | ".join(self.inline(cell) for cell in row) for row in rows)
+        if any(child.tag in _BLOCK_TAGS for child in element):
+            return "\n\n".join(self.blocks(element))
+        return self.inline(element)
+
+    def list_item(self, item: Element) -> str:
+        if not any(child.tag in _BLOCK_TAGS for child in item):
+            return self.inline(item)
+        parts = [self._clean(item.text).strip()] if (item.text or "").strip() else []
+        loose = any(child.tag == "p" for child in item)
+        for child in item:
+            parts.append(self.block(child) if child.tag in _BLOCK_TAGS else self.inline(child))
+        return ("\n\n" if loose else "\n").join(part for part in parts if part)
+
+    def _stashed_block(self, index: int) -> str:
+        raw = str(self._stash[index]) if index < len(self._stash) else ""
+        text = html.unescape(_TAG_RE.sub("", raw)).strip("\n")
+        return _indent(text, "    ") if raw.lstrip().startswith("<pre") else text.strip()
+
+
+def _indent(text: str, prefix: str, first: Optional[str] = None) -> str:
+    lines = text.split("\n")
+    head = first if first is not None else prefix
+    return "\n".join([head + lines[0]] + [(prefix + line) if line else line for line in lines[1:]])
+
+
+def _render(markdown: str) -> Rendered:
+    converter = _converter()
+    converter.reset()
+    converter.tree = None
+    html_out = converter.convert(markdown)
+    tree = converter.tree
+    text = "\n\n".join(_TextRenderer(converter).blocks(tree)) if tree is not None else ""
+    return Rendered(html=html_out, text=text)
+
+
+# --- Memoised entry points -----------------------------------------------------
+
+_cache: "OrderedDict[str, Rendered]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def render(markdown: str) -> Rendered:
+    """HTML and plain text for ``markdown``, memoised by SHA-256 of the content."""
+    key = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    record_cache("markdown", cached is not None)
+    if cached is not None:
+        return cached
+    rendered = _render(markdown)
+    with _cache_lock:
+        _cache[key] = rendered
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return rendered
+
+
+def markdown_to_html(markdown: str) -> str:
+    return render(markdown).html
+
+
+def markdown_to_text(markdown: str) -> str:
+    return render(markdown).text
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+__all__ = [
+    "EXTENSIONS",
+    "Rendered",
+    "clear_cache",
+    "markdown_to_html",
+    "markdown_to_text",
+    "render",
+]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+"""Shared wrapper around OpenAI Responses API calls (rate limits, retries, cancellation)."""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from cancellation import CANCELLATION_STATS, CancelToken, RunCancelled, estimate_tokens
+from ledger import record_call, usage_counts
+from metrics import OPENAI_TOKENS
+from rate_limit import RateLimiter, get_default_limiter
+from tracing import span
+
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """Rough input + max output token estimate used to reserve TPM budget."""
+    text = str(request.get("instructions") or "")
+    for message in request.get("input") or []:
+        if isinstance(message, dict):
+            text += str(message.get("content") or "")
+    return estimate_tokens(text) + int(request.get("max_output_tokens") or 0)
+
+
+def usage_total_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+def call_openai(
+    client: Any,
+    *,
+    stage: str,
+    content_type: str | None = None,
+    run_id: str | None = None,
+    method: str = "create",
+    cancel: CancelToken | None = None,
+    limiter: RateLimiter | None = None,
+    **request: Any,
+) -> Any:
+    """Run ``client.responses.<method>(**request)`` through the shared rate limiter.
+
+    Aborts caused by ``cancel`` (e.g. the HTTP client being closed under us) surface
+    as :class:`RunCancelled` instead of the underlying transport error. Every call is
+    recorded on the configured ledger under ``run_id``/``stage``/``content_type``.
+    """
+    limiter = limiter or get_default_limiter()
+    endpoint = getattr(client.responses, method)
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    started = time.perf_counter()
+    status = "error"
+    response = None
+    try:
+        with span(
+            f"openai.responses.{method}",
+            stage=stage,
+            content_type=content_type or "",
+            model=str(request.get("model", "")),
+        ) as call_span:
+            response = limiter.call(
+                lambda: endpoint(**request),
+                estimated_tokens=estimate_request_tokens(request),
+                cancel=cancel,
+                used_tokens=usage_total_tokens,
+            )
+            if call_span is not None:
+                call_span.set(**usage_counts(response))
+        status = "ok"
+    except RunCancelled:
+        status = "cancelled"
+        raise
+    except Exception as exc:
+        if cancel is not None and cancel.cancelled:
+            status = "cancelled"
+            if cancel.parent is None or cancel.parent.cancelled:
+                CANCELLATION_STATS.record_aborted(elapsed=time.perf_counter() - started)
+            raise RunCancelled(f"Job {cancel.job_id} cancelled ({cancel.reason})") from exc
+        raise
+    finally:
+        record_call(
+            run_id=run_id,
+            stage=stage,
+            content_type=content_type,
+            model=str(request.get("model", "")),
+            status=status,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            response=response,
+        )
+    for kind, count in usage_counts(response).items():
+        if count:
+            OPENAI_TOKENS.inc(count, stage=stage, kind=kind.replace("_tokens", ""))
+    if cancel is not None:
+        CANCELLATION_STATS.record_call(time.perf_counter() - started)
+    return response
+
+
+@contextmanager
+def isolated_client(client: Any, cancel: CancelToken) -> Iterator[Any]:
+    """Yield a copy of ``client`` on its own connection pool that ``cancel`` can abort.
+
+    Closing a dedicated pool aborts only that request, leaving the shared client alone.
+    Clients without ``with_options`` (test doubles) are yielded unchanged.
+    """
+    if not hasattr(client, "with_options"):
+        yield client
+        return
+    from openai import DefaultHttpxClient
+
+    http_client = DefaultHttpxClient()
+    cancel.on_cancel(http_client.close)
+    try:
+        yield client.with_options(http_client=http_client)
+    finally:
+        http_client.close()
+
+
+__all__ = ["call_openai", "estimate_request_tokens", "isolated_client"]
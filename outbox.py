@@ -0,0 +1,499 @@
+from __future__ import annotations
+
+"""Persistent outbox for newsletter email, drained independently of the pipeline.
+
+Approved newsletters are enqueued with their rendered subject/body and SMTP settings
+(never the password). ``OutboxWorker`` claims due messages, sends them, and reschedules
+transient failures with exponential backoff, so an SMTP outage never fails a run.
+
+    python outbox.py status            # counts plus recent messages
+    python outbox.py drain             # send everything due, then exit
+    python outbox.py work              # keep polling (run alongside the API/cron)
+    python outbox.py retry 12          # requeue a failed message
+"""
+
+import argparse
+import functools
+import json
+import os
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from email_helpers import is_transient_smtp_error, send_batch, send_email
+from tracing import span
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    text_body TEXT,
+    sender TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    transport TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (run_id, item_id)
+)
+"""
+
+STATUSES = ("pending", "sending", "sent", "failed")
+
+# SMTP settings persisted with each message; credentials come from the worker's env.
+TRANSPORT_KEYS = (
+    "host",
+    "port",
+    "username",
+    "use_tls",
+    "plain",
+    "batch",
+    "pool_size",
+    "max_messages_per_connection",
+)
+
+# Key in the undelivered map for recipients the server refused permanently (5xx).
+PERMANENT_KEY = "*rejected*"
+
+_COLUMNS = [
+    "id",
+    "run_id",
+    "item_id",
+    "subject",
+    "body",
+    "text_body",
+    "sender",
+    "recipients",
+    "transport",
+    "status",
+    "attempts",
+    "next_attempt_at",
+    "last_error",
+    "created_at",
+    "updated_at",
+]
+
+
+def default_outbox_path(base_dir: Path) -> Path:
+    return Path(os.getenv("OUTBOX_DB") or base_dir / "outbox.db")
+
+
+def _decode(row: Iterable[Any]) -> Dict[str, Any]:
+    record = dict(zip(_COLUMNS, row))
+    record["recipients"] = json.loads(record["recipients"])
+    record["transport"] = json.loads(record["transport"])
+    return record
+
+
+def _personalise(record: Dict[str, Any], recipient: str) -> tuple[str, str, str | None]:
+    """Subject, HTML and text of ``record`` with ``{{email}}`` filled in for ``recipient``."""
+    text_body = record["text_body"]
+    text = text_body.replace("{{email}}", recipient) if text_body is not None else None
+    return record["subject"], record["body"].replace("{{email}}", recipient), text
+
+
+def _undelivered(failed: Dict[str, str], retryable: Iterable[str]) -> Dict[str, str]:
+    """Retryable recipients mapped to their error, plus the permanent rejections under ``PERMANENT_KEY``."""
+    retry = set(retryable)
+    undelivered = {recipient: error for recipient, error in failed.items() if recipient in retry}
+    rejected = sorted(set(failed) - retry)
+    if rejected:
+        undelivered[PERMANENT_KEY] = "rejected " + ", ".join(f"{recipient} ({failed[recipient]})" for recipient in rejected)
+    return undelivered
+
+
+class EmailOutbox:
+    def __init__(self, db_path: Path | str):
+        raw_path = Path(db_path)
+        self.path = raw_path.expanduser()
+        parent = self.path.parent if self.path.parent != Path("") else Path(".")
+        parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            return sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        except sqlite3.OperationalError as exc:
+            raise sqlite3.OperationalError(f"{exc} (path={self.path})") from exc
+
+    def _ensure_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+            if "text_body" not in columns:  # outboxes created before plain-text bodies were stored
+                conn.execute("ALTER TABLE outbox ADD COLUMN text_body TEXT")
+
+    def enqueue(
+        self,
+        *,
+        run_id: str,
+        item_id: str,
+        subject: str,
+        body: str,
+        sender: str,
+        recipients: Iterable[str],
+        transport: Dict[str, Any],
+        text_body: str | None = None,
+    ) -> int:
+        """Queue a message; re-enqueueing the same run/item keeps the existing row."""
+        now = time.time()
+        settings = {key: transport.get(key) for key in TRANSPORT_KEYS}
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO outbox (run_id, item_id, subject, body, text_body, sender, recipients, transport,
+                                    status, next_attempt_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?, ?, ?)
+                ON CONFLICT(run_id, item_id) DO NOTHING
+                """,
+                (
+                    run_id,
+                    item_id,
+                    subject,
+                    body,
+                    text_body,
+                    sender,
+                    json.dumps(list(recipients)),
+                    json.dumps(settings),
+                    now,
+                    now,
+                    now,
+                ),
+            )
+            row = conn.execute("SELECT id FROM outbox WHERE run_id=? AND item_id=?", (run_id, item_id)).fetchone()
+        return row[0]
+
+    def claim_due(
+        self, *, limit: int = 10, lease: float = 300.0, message_id: int | None = None
+    ) -> List[Dict[str, Any]]:
+        """Mark due messages (or just ``message_id``, if due) as ``sending`` and return them.
+
+        A claim is a lease: messages stuck in ``sending`` (a crashed worker) become due
+        again once it expires, so two workers never send the same message concurrently.
+        """
+        now = time.time()
+        only = "AND id = ?" if message_id is not None else ""
+        params = (now, message_id, limit) if message_id is not None else (now, limit)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"""
+                SELECT {", ".join(_COLUMNS)} FROM outbox
+                WHERE status IN ('pending', 'sending') AND next_attempt_at <= ? {only}
+                ORDER BY next_attempt_at LIMIT ?
+                """,
+                params,
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE outbox SET status='sending', attempts=attempts + 1, next_attempt_at=?, updated_at=?
+                WHERE id=?
+                """,
+                [(now + lease, now, row[0]) for row in rows],
+            )
+        records = [_decode(row) for row in rows]
+        for record in records:
+            record["status"] = "sending"
+            record["attempts"] += 1
+        return records
+
+    def mark_sent(self, message_id: int, *, note: str | None = None) -> None:
+        """``note`` keeps a record of recipients the server rejected permanently."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status='sent', last_error=?, updated_at=? WHERE id=?",
+                (note, time.time(), message_id),
+            )
+
+    def mark_retry(
+        self,
+        message_id: int,
+        *,
+        error: str,
+        delay: float,
+        recipients: Optional[List[str]] = None,
+    ) -> None:
+        """Reschedule after ``delay`` seconds, optionally narrowing to the undelivered recipients."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE outbox SET status='pending', last_error=?, next_attempt_at=?, updated_at=?,
+                                  recipients=COALESCE(?, recipients)
+                WHERE id=?
+                """,
+                (error, now + delay, now, json.dumps(recipients) if recipients is not None else None, message_id),
+            )
+
+    def mark_failed(self, message_id: int, *, error: str, recipients: Optional[List[str]] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE outbox SET status='failed', last_error=?, updated_at=?, recipients=COALESCE(?, recipients)
+                WHERE id=?
+                """,
+                (error, time.time(), json.dumps(recipients) if recipients is not None else None, message_id),
+            )
+
+    def requeue(self, message_id: int) -> bool:
+        """Give a failed message a fresh set of attempts."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE outbox SET status='pending', attempts=0, next_attempt_at=?, updated_at=?
+                WHERE id=? AND status='failed'
+                """,
+                (now, now, message_id),
+            )
+        return cursor.rowcount > 0
+
+    def get(self, message_id: int) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM outbox WHERE id=?", (message_id,)).fetchone()
+        return _decode(row) if row else None
+
+    def list_messages(self, *, status: str | None = None, limit: int = 20) -> List[Dict[str, Any]]:
+        query = f"SELECT {', '.join(_COLUMNS)} FROM outbox"
+        params: list = []
+        if status:
+            query += " WHERE status=?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [_decode(row) for row in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+class OutboxWorker:
+    """Sends due outbox messages, retrying transient SMTP failures with backoff.
+
+    Permanent failures (5xx, bad credentials) and messages that exhaust
+    ``max_attempts`` are marked ``failed`` and left for ``python outbox.py retry``.
+    """
+
+    def __init__(
+        self,
+        outbox: EmailOutbox,
+        *,
+        password: str | None = None,
+        max_attempts: int = 5,
+        base_delay: float = 30.0,
+        max_delay: float = 3600.0,
+    ):
+        self.outbox = outbox
+        self.password = password
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats: Dict[str, int] = {"sent": 0, "retried": 0, "failed": 0}
+
+    def backoff_delay(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.base_delay * (2 ** max(attempt - 1, 0)))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def run_once(self, *, limit: int = 10) -> int:
+        """Send every message due now; returns how many were attempted."""
+        records = self.outbox.claim_due(limit=limit)
+        for record in records:
+            self.process(record)
+        return len(records)
+
+    def drain(self, *, limit: int = 10) -> int:
+        """Keep sending until nothing is due (retries scheduled later are left queued)."""
+        total = 0
+        while True:
+            attempted = self.run_once(limit=limit)
+            if not attempted:
+                return total
+            total += attempted
+
+    def send_now(self, message_id: int) -> bool:
+        """Attempt ``message_id`` alone if it is due; other queued messages are left to the worker."""
+        records = self.outbox.claim_due(limit=1, message_id=message_id)
+        for record in records:
+            self.process(record)
+        return bool(records)
+
+    def work(self, *, poll_interval: float = 5.0, limit: int = 10) -> None:
+        while True:
+            if not self.run_once(limit=limit):
+                time.sleep(poll_interval)
+
+    def process(self, record: Dict[str, Any]) -> None:
+        message_id = record["id"]
+        with span("outbox.send", message_id=message_id, attempt=record["attempts"]) as send_span:
+            try:
+                undelivered = self._send(record)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                transient = is_transient_smtp_error(exc)
+                self._reschedule(record, error=error, transient=transient)
+                if send_span is not None:
+                    send_span.set(outcome="error", transient=transient)
+                return
+            rejected = undelivered.pop(PERMANENT_KEY, None)
+            if undelivered:
+                errors = "; ".join(f"{recipient}: {error}" for recipient, error in sorted(undelivered.items()))
+                if rejected:
+                    errors += f"; {rejected}"
+                self._reschedule(record, error=errors, transient=True, recipients=sorted(undelivered))
+                if send_span is not None:
+                    send_span.set(outcome="partial", undelivered=len(undelivered))
+                return
+            self.outbox.mark_sent(message_id, note=rejected)
+            self.stats["sent"] += 1
+            if send_span is not None:
+                send_span.set(outcome="sent")
+
+    def _reschedule(
+        self,
+        record: Dict[str, Any],
+        *,
+        error: str,
+        transient: bool,
+        recipients: Optional[List[str]] = None,
+    ) -> None:
+        if not transient or record["attempts"] >= self.max_attempts:
+            self.outbox.mark_failed(record["id"], error=error, recipients=recipients)
+            self.stats["failed"] += 1
+            print(f"Warning: outbox message {record['id']} failed permanently ({error}).")
+            return
+        delay = self.backoff_delay(record["attempts"])
+        self.outbox.mark_retry(record["id"], error=error, delay=delay, recipients=recipients)
+        self.stats["retried"] += 1
+        print(f"Warning: outbox message {record['id']} not sent ({error}); retrying in {delay:.0f}s.")
+
+    def _send(self, record: Dict[str, Any]) -> Dict[str, str]:
+        """Deliver one message; returns undelivered recipients mapped to their error.
+
+        Recipients rejected outright are reported under ``PERMANENT_KEY`` so they are
+        not retried.
+        """
+        transport = record["transport"]
+        connection = {
+            "smtp_host": transport["host"],
+            "smtp_port": transport["port"],
+            "username": transport.get("username"),
+            "password": self.password,
+            "use_tls": bool(transport.get("use_tls")),
+            "plain": bool(transport.get("plain")),
+        }
+        message = {
+            "subject": record["subject"],
+            "body": record["body"],
+            "text_body": record["text_body"],
+            "sender": record["sender"],
+            "recipients": record["recipients"],
+        }
+        if not transport.get("batch"):
+            refused = send_email(**connection, **message)
+            failed = {recipient: f"{code} {reply.decode('utf-8', 'replace')}" for recipient, (code, reply) in refused.items()}
+            return _undelivered(failed, [recipient for recipient, (code, _) in refused.items() if 400 <= code < 500])
+
+        personalise = functools.partial(_personalise, record) if "{{email}}" in record["body"] else None
+        report = send_batch(
+            **connection,
+            **message,
+            personalise=personalise,
+            pool_size=transport.get("pool_size") or 4,
+            max_messages_per_connection=transport.get("max_messages_per_connection") or 100,
+        )
+        print(report.summary())
+        return _undelivered(report.failed, report.retryable)
+
+
+def format_status(counts: Dict[str, int], messages: List[Dict[str, Any]]) -> str:
+    lines = ["Outbox: " + ", ".join(f"{status} {counts.get(status, 0)}" for status in STATUSES)]
+    for record in messages:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["updated_at"]))
+        line = (
+            f"#{record['id']:<5} {record['status']:<8} attempts={record['attempts']} "
+            f"{when}  run={record['run_id'][:8]} to={len(record['recipients'])}  {record['subject'][:50]}"
+        )
+        if record["status"] == "pending" and record["attempts"]:
+            line += f"  next in {max(record['next_attempt_at'] - time.time(), 0):.0f}s"
+        if record["last_error"]:
+            line += f"\n        {record['last_error'][:200]}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Iterable[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect and drain the newsletter email outbox.")
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=default_outbox_path(Path("outputs")),
+        help="Outbox database (default outputs/outbox.db or OUTBOX_DB)",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    status = sub.add_parser("status", help="Show counts and recent messages")
+    status.add_argument("--status", choices=STATUSES, help="Only list messages in this state")
+    status.add_argument("--limit", type=int, default=20)
+    status.add_argument("--json", action="store_true", help="Print counts and messages as JSON")
+    for name, help_text in (("drain", "Send everything due, then exit"), ("work", "Poll and send until interrupted")):
+        command = sub.add_parser(name, help=help_text)
+        command.add_argument("--smtp-password", help="SMTP password (default SMTP_PASSWORD env)")
+        command.add_argument("--max-attempts", type=int, default=5, help="Attempts before a message is marked failed")
+        command.add_argument("--base-delay", type=float, default=30.0, help="First retry delay in seconds (doubles each attempt)")
+        command.add_argument("--max-delay", type=float, default=3600.0, help="Upper bound on the retry delay")
+        if name == "work":
+            command.add_argument("--poll-interval", type=float, default=5.0)
+    retry = sub.add_parser("retry", help="Requeue failed messages")
+    retry.add_argument("ids", type=int, nargs="+")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    outbox = EmailOutbox(args.db)
+    if args.command == "status":
+        counts = outbox.count_by_status()
+        messages = outbox.list_messages(status=args.status, limit=args.limit)
+        if args.json:
+            print(json.dumps({"counts": counts, "messages": messages}, indent=2, default=str))
+        else:
+            print(format_status(counts, messages))
+        return
+    if args.command == "retry":
+        for message_id in args.ids:
+            print(f"#{message_id}: {'requeued' if outbox.requeue(message_id) else 'not in failed state'}")
+        return
+
+    from pipeline import load_env
+
+    load_env()
+    worker = OutboxWorker(
+        outbox,
+        password=args.smtp_password or os.getenv("SMTP_PASSWORD"),
+        max_attempts=args.max_attempts,
+        base_delay=args.base_delay,
+        max_delay=args.max_delay,
+    )
+    if args.command == "work":
+        try:
+            worker.work(poll_interval=args.poll_interval)
+        except KeyboardInterrupt:
+            pass
+    else:
+        worker.drain()
+    print(f"Sent {worker.stats['sent']}, retrying {worker.stats['retried']}, failed {worker.stats['failed']}.")
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["EmailOutbox", "OutboxWorker", "default_outbox_path", "format_status"]
@@ -1,47 +1,129 @@
 from __future__ import annotations
 
-from dotenv import load_dotenv
+"""Run the full marketing asset pipeline from the command line.
 
-"""Run the full marketing asset pipeline from the command line."""
+Heavy dependencies (openai, requests, markdown, python-dotenv) and the modules only
+some runs need (email sending, the outbox, variant ranking) are
+imported where they are used, so ``--dry-run`` and ``--help`` start quickly;
+``tests/test_startup.py`` holds them to a budget.
+"""
 
 import argparse
+import json
 import os
+import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Mapping, Optional
 from uuid import uuid4
-import markdown as md
 
-import requests
-from dotenv import load_dotenv
-
-from generate import CONTENT_SPECS, build_payload
+from cancellation import CANCELLATION_STATS, CancelToken, RunCancelled, estimate_tokens
+from brief import brief_from_json, brief_model, brief_schema, parse_brief, render_brief
+from generate import CONTENT_SPECS, build_multi_payload, build_payload
+from spec_checks import SPEC_STATS, SpecReport, check_draft, count_words, violation_feedback
+from hedging import HedgePolicy
+from ledger import CallLedger, configure_ledger, default_ledger_path, format_report, get_ledger
+from metrics import stage_timer
+from profiling import activate as activate_profiling, stage as profile_stage
+from tracing import span, start_run, tracing_from_env
+from openai_helpers import call_openai, isolated_client
+from rate_limit import configure_default_limiter
 from summarise import build_prompt
 from approvals import ApprovalStore
 from slack_helpers import SlackNotifier
-from email_helpers import send_email, markdown_to_text, prep_email_with_openai
-
-load_dotenv()
+from slack_queue import SlackQueue
+from manifest import OutputManifest, default_manifest_path, sha256_hex, write_atomic
+from artifacts import ArtifactNotFound, ArtifactStore, default_artifact_path
 
-import dotenv
-load_dotenv()
-
-try:
+if TYPE_CHECKING:
     from openai import OpenAI
-except ImportError:
-    OpenAI = None
+
+    from variants import ScoredVariant
 
 
 DEFAULT_TYPES: List[str] = list(CONTENT_SPECS.keys())
+MAX_VARIANTS = 5
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load ``.env`` once, on first use rather than at import time."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:  # pragma: no cover - .env support is optional
+        return
+    load_dotenv()
+
+
+_client_factory: Optional[Callable[[Optional[str]], "OpenAI"]] = None
+
+
+def configure_client_factory(factory: Optional[Callable[[Optional[str]], "OpenAI"]]) -> None:
+    """Build clients with ``factory(api_key)`` instead of ``openai.OpenAI`` (None restores it).
+
+    Harnesses install their stand-ins here (``bench.use_fake_llm``); the CLI and API never do.
+    """
+    global _client_factory
+    _client_factory = factory
 
 
 def create_client(api_key: str | None) -> OpenAI:
-    if OpenAI is None:
-        raise RuntimeError("openai package is not installed. Run `python -m pip install openai`. ")
+    load_env()
+    if _client_factory is not None:
+        return _client_factory(api_key)
+    try:
+        from openai import OpenAI
+    except ImportError as exc:
+        raise RuntimeError("openai package is not installed. Run `python -m pip install openai`. ") from exc
     key = api_key or os.getenv("OPENAI_API_KEY")
     if not key:
         raise RuntimeError("Set OPENAI_API_KEY or pass --api-key to run the pipeline.")
-    return OpenAI(api_key=key)
+    # Retries are handled by the shared limiter in rate_limit.py so they respect the RPM/TPM budget.
+    return OpenAI(api_key=key, max_retries=0)
+
+
+def record_skipped_assets(
+    content_types: Iterable[str],
+    *,
+    launch_brief: str,
+    max_tokens: int,
+) -> None:
+    """Credit the asset calls a cancelled run never made to the cancellation stats."""
+    calls = 0
+    tokens = 0
+    for content_type in content_types:
+        payload = build_payload(content_type, launch_brief)
+        tokens += estimate_tokens(payload["system"] + payload["user"]) + max_tokens
+        calls += 1
+    if calls:
+        CANCELLATION_STATS.record_skipped(calls=calls, tokens=tokens)
+
+
+def _hedge_attempt(client: OpenAI, token: CancelToken, hedged: bool, request: Dict[str, object]):
+    # Both attempts get their own connection pool so whichever loses can be aborted,
+    # including a slow primary overtaken by its hedge.
+    with isolated_client(client, token) as attempt_client:
+        return call_openai(attempt_client, cancel=token, **request)
+
+
+def response_request(payload: Dict[str, str], *, model: str, temperature: float, max_tokens: int) -> Dict[str, object]:
+    """Responses API body for a system/user ``payload``; shared by live calls and batch files."""
+    return {
+        "model": model,
+        "instructions": payload["system"],
+        "input": [{"role": "user", "content": payload["user"]}],
+        "temperature": temperature,
+        "max_output_tokens": max_tokens,
+    }
 
 
 def run_summary(
@@ -50,18 +132,122 @@ def run_summary(
     model: str,
     temperature: float,
     max_tokens: int,
+    cancel: CancelToken | None = None,
+    run_id: str | None = None,
+    base_dir: Path | None = None,
+    structured: bool = False,
 ) -> str:
-    payload = build_prompt()
-    response = client.responses.create(
-        model=model,
-        instructions=payload["system"],
-        input=[{"role": "user", "content": payload["user"]}],
-        temperature=temperature,
-        max_output_tokens=max_tokens,
-    )
+    """The launch brief as Markdown.
+
+    ``structured`` asks for one JSON field per brief section and renders them with
+    ``brief.render_brief``, so asset prompts can carry only the sections they need. A
+    response that cannot be parsed is retried once as a plain Markdown summary.
+    """
+    payload = build_prompt(base_dir=base_dir, structured=structured)
+    if cancel is not None and cancel.cancelled:
+        CANCELLATION_STATS.record_skipped(
+            calls=1,
+            tokens=estimate_tokens(payload["system"] + payload["user"]) + max_tokens,
+        )
+        cancel.raise_if_cancelled()
+    if structured:
+        try:
+            with stage_timer("summary"), span("summary", model=model, structured=True), profile_stage("summary"):
+                response = call_openai(
+                    client,
+                    stage="summary",
+                    run_id=run_id,
+                    cancel=cancel,
+                    method="parse",
+                    text_format=brief_model(),
+                    **response_request(payload, model=model, temperature=temperature, max_tokens=max_tokens),
+                )
+            return render_brief(response.output_parsed.model_dump())
+        except RunCancelled:
+            raise
+        except Exception as exc:  # invalid JSON, schema mismatch, truncation, refusal
+            print(f"Warning: structured launch brief unusable ({exc}); requesting a Markdown brief instead.")
+            payload = build_prompt(base_dir=base_dir)
+    with stage_timer("summary"), span("summary", model=model), profile_stage("summary"):
+        response = call_openai(
+            client,
+            stage="summary",
+            run_id=run_id,
+            cancel=cancel,
+            **response_request(payload, model=model, temperature=temperature, max_tokens=max_tokens),
+        )
+    return response.output_text.strip()
+
+
+def revise_asset(
+    client: OpenAI,
+    *,
+    content_type: str,
+    launch_brief: str,
+    previous_draft: str,
+    feedback: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    run_id: str | None = None,
+    stage: str = "revision",
+) -> str:
+    """Regenerate one rejected asset from the same brief with the reviewer's feedback."""
+    payload = build_payload(content_type, launch_brief, feedback=feedback, previous_draft=previous_draft)
+    with stage_timer(stage, content_type), span(stage, content_type=content_type, model=model):
+        response = call_openai(
+            client,
+            stage=stage,
+            content_type=content_type,
+            run_id=run_id,
+            **response_request(payload, model=model, temperature=temperature, max_tokens=max_tokens),
+        )
     return response.output_text.strip()
 
 
+def enforce_specs(
+    client: OpenAI,
+    assets: Dict[str, str],
+    *,
+    launch_brief: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    retries: int,
+    run_id: str | None = None,
+) -> Dict[str, SpecReport]:
+    """Check each draft against its spec and regenerate only failing ones, ``retries`` times each.
+
+    ``assets`` is updated in place with the draft that has the fewest violations. Returns
+    the final report per content type.
+    """
+    reports: Dict[str, SpecReport] = {}
+    for content_type, text in assets.items():
+        report = check_draft(content_type, text)
+        SPEC_STATS.record(report)
+        attempt = 0
+        while not report.ok and attempt < retries:
+            attempt += 1
+            candidate = revise_asset(
+                client,
+                content_type=content_type,
+                launch_brief=launch_brief,
+                previous_draft=assets[content_type],
+                feedback=violation_feedback(report),
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                run_id=run_id,
+                stage="spec_retry",
+            )
+            candidate_report = check_draft(content_type, candidate)
+            SPEC_STATS.record(candidate_report, retry=True)
+            if len(candidate_report.violations) <= len(report.violations):
+                assets[content_type], report = candidate, candidate_report
+        reports[content_type] = report
+    return reports
+
+
 def run_assets(
     client: OpenAI,
     *,
@@ -70,35 +256,318 @@ def run_assets(
     model: str,
     temperature: float,
     max_tokens: int,
+    cancel: CancelToken | None = None,
+    hedge: HedgePolicy | None = None,
+    run_id: str | None = None,
+    variants: Mapping[str, int] | None = None,
 ) -> Dict[str, str]:
+    """One asset call per content type; ``variants`` asks for N candidates in that one call.
+
+    Multi-variant responses are returned whole; ``review_assets`` splits and ranks them.
+    """
     outputs: Dict[str, str] = {}
-    for content_type in content_types:
-        payload = build_payload(content_type, launch_brief)
-        response = client.responses.create(
-            model=model,
-            instructions=payload["system"],
-            input=[{"role": "user", "content": payload["user"]}],
-            temperature=temperature,
-            max_output_tokens=max_tokens,
+    pending = list(content_types)
+    for index, content_type in enumerate(pending):
+        if cancel is not None and cancel.cancelled:
+            record_skipped_assets(pending[index:], launch_brief=launch_brief, max_tokens=max_tokens)
+            cancel.raise_if_cancelled()
+        count = (variants or {}).get(content_type, 1)
+        payload = build_payload(content_type, launch_brief, variants=count)
+        request = dict(
+            stage="asset",
+            content_type=content_type,
+            run_id=run_id,
+            **response_request(payload, model=model, temperature=temperature, max_tokens=max_tokens * count),
         )
+        try:
+            with (
+                stage_timer("asset", content_type),
+                span("asset", content_type=content_type, model=model),
+                profile_stage(f"asset:{content_type}"),
+            ):
+                if hedge is None:
+                    response = call_openai(client, cancel=cancel, **request)
+                else:
+                    response = hedge.call(
+                        lambda token, hedged: _hedge_attempt(client, token, hedged, request),
+                        cancel=cancel,
+                    )
+        except RunCancelled:
+            record_skipped_assets(pending[index + 1 :], launch_brief=launch_brief, max_tokens=max_tokens)
+            raise
         outputs[content_type] = response.output_text.strip()
     return outputs
 
 
-def save_text(path: Path, text: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(text.strip() + "\n", encoding="utf-8")
+@dataclass
+class SingleCallReport:
+    """Outcome of one ``--single-call`` asset request, with input tokens against per-type calls."""
 
+    content_types: List[str]
+    fallbacks: Dict[str, str]
+    input_tokens: int
+    per_type_tokens: int
+    skipped: bool = False
 
-def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument(
-        "types",
-        metavar="TYPE",
-        nargs="*",
-        default=DEFAULT_TYPES,
-        help=f"Content types to generate ({', '.join(DEFAULT_TYPES)}).",
+    def format(self) -> str:
+        if self.skipped:
+            return (
+                f"Single-call assets skipped: one prompt for {', '.join(self.content_types)} would be "
+                f"≈{self.input_tokens:,} input tokens vs ≈{self.per_type_tokens:,} per-type; "
+                "using per-type calls."
+            )
+        saved = self.per_type_tokens - self.input_tokens
+        share = saved / self.per_type_tokens if self.per_type_tokens else 0.0
+        fallback = (
+            f" + {len(self.fallbacks)} per-type fallback(s) ({', '.join(f'{k}: {v}' for k, v in self.fallbacks.items())})"
+            if self.fallbacks
+            else ""
+        )
+        # Fallback calls can cost more than the single call saved; say so rather than print a negative saving.
+        outcome = f"{saved:,} saved, {share:.0%}" if saved >= 0 else f"{-saved:,} more after fallbacks"
+        return (
+            f"Single-call assets: 1 call for {', '.join(self.content_types)}{fallback}; "
+            f"≈{self.input_tokens:,} input tokens vs ≈{self.per_type_tokens:,} per-type ({outcome})."
+        )
+
+
+def _asset_field_error(content_type: str, value: object) -> Optional[str]:
+    """Why a structured-output field is unusable as ``content_type``'s draft, or None."""
+    if not isinstance(value, str) or not value.strip():
+        return "missing"
+    words = CONTENT_SPECS[content_type].limits.words
+    count = count_words(value)
+    # A field far below the spec's minimum is a stub or a truncated answer, not a draft to review.
+    if words is not None and count < words[0] // 2:
+        return f"only {count} words"
+    return None
+
+
+def run_assets_single_call(
+    client: OpenAI,
+    *,
+    content_types: Iterable[str],
+    launch_brief: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    cancel: CancelToken | None = None,
+    hedge: HedgePolicy | None = None,
+    run_id: str | None = None,
+) -> tuple[Dict[str, str], SingleCallReport]:
+    """Generate every channel in one structured-output call, one schema field per type.
+
+    The brief's input tokens are paid once instead of once per type. Fields that fail
+    validation (missing, empty or a fraction of the spec's length) are regenerated with
+    ordinary per-type calls through ``run_assets``, as is everything if the structured
+    response cannot be parsed.
+
+    When the projected brief sections differ enough between channels that the shared
+    prompt would not be smaller than the per-type prompts combined, no single call is
+    made and every type goes through ``run_assets``.
+    """
+    from pydantic import create_model
+
+    types = list(content_types)
+    payload = build_multi_payload(types, launch_brief)
+    single_tokens = estimate_tokens("".join(payload.values()))
+    per_type = {
+        content_type: estimate_tokens("".join(build_payload(content_type, launch_brief).values()))
+        for content_type in types
+    }
+    if single_tokens >= sum(per_type.values()):
+        outputs = run_assets(
+            client,
+            content_types=types,
+            launch_brief=launch_brief,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cancel=cancel,
+            hedge=hedge,
+            run_id=run_id,
+        )
+        report = SingleCallReport(
+            content_types=types,
+            fallbacks={},
+            input_tokens=single_tokens,
+            per_type_tokens=sum(per_type.values()),
+            skipped=True,
+        )
+        return outputs, report
+    schema = create_model(
+        "LaunchAssets",
+        **{content_type: (str, ...) for content_type in types},
+    )
+    outputs: Dict[str, str] = {}
+    fallbacks: Dict[str, str] = {}
+    with (
+        stage_timer("asset_multi"),
+        span("asset_multi", content_types=",".join(types), model=model),
+        profile_stage("asset:multi"),
+    ):
+        try:
+            response = call_openai(
+                client,
+                stage="asset_multi",
+                run_id=run_id,
+                cancel=cancel,
+                method="parse",
+                text_format=schema,
+                **response_request(payload, model=model, temperature=temperature, max_tokens=max_tokens * len(types)),
+            )
+            parsed = response.output_parsed
+        except RunCancelled:
+            raise
+        except Exception as exc:  # invalid JSON, schema mismatch, truncation, refusal
+            print(f"Warning: single-call asset response unusable ({exc}); falling back to per-type calls.")
+            parsed = None
+    for content_type in types:
+        value = getattr(parsed, content_type, None) if parsed is not None else None
+        error = "no structured response" if parsed is None else _asset_field_error(content_type, value)
+        if error:
+            fallbacks[content_type] = error
+        else:
+            outputs[content_type] = value.strip()
+    if fallbacks:
+        outputs.update(
+            run_assets(
+                client,
+                content_types=list(fallbacks),
+                launch_brief=launch_brief,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                cancel=cancel,
+                hedge=hedge,
+                run_id=run_id,
+            )
+        )
+    fallback_tokens = sum(per_type[content_type] for content_type in fallbacks)
+    report = SingleCallReport(
+        content_types=types,
+        fallbacks=fallbacks,
+        input_tokens=single_tokens + fallback_tokens,
+        per_type_tokens=sum(per_type.values()),
+    )
+    return {content_type: outputs[content_type] for content_type in types}, report
+
+
+def format_projection(content_types: Iterable[str], launch_brief: str) -> Optional[str]:
+    """Asset prompt size with the brief cut to each spec's sections vs the whole brief, if structured."""
+    if parse_brief(launch_brief) is None:
+        return None
+    rows = []
+    for content_type in content_types:
+        projected = estimate_tokens("".join(build_payload(content_type, launch_brief).values()))
+        full = estimate_tokens("".join(build_payload(content_type, launch_brief, project=False).values()))
+        rows.append((content_type, projected, full))
+    projected_total = sum(row[1] for row in rows)
+    full_total = sum(row[2] for row in rows)
+    share = 1 - projected_total / full_total if full_total else 0.0
+    detail = ", ".join(f"{content_type} {projected:,}/{full:,}" for content_type, projected, full in rows)
+    return (
+        f"Structured brief: asset prompts ≈{projected_total:,} input tokens vs ≈{full_total:,} "
+        f"with the full brief ({share:.0%} smaller; {detail})."
     )
+
+
+def save_text(path: Path, text: str, *, manifest: OutputManifest | None = None, **metadata: object) -> bool:
+    """Atomically write ``text``; with a manifest, skip files whose content is unchanged.
+
+    Returns whether the file was written.
+    """
+    data = text.strip() + "\n"
+    if manifest is None:
+        write_atomic(path, data.encode("utf-8"))
+        return True
+    return manifest.write_text(path, data, **metadata)
+
+
+def load_summary_input(ref: str, store: ArtifactStore) -> tuple[str, Dict[str, object]]:
+    """Read ``--summary-input``: a file path, or an artifact id / hash prefix / ``latest``."""
+    path = Path(ref).expanduser()
+    if path.is_file():
+        return path.read_text(encoding="utf-8").strip(), {"source": str(path)}
+    try:
+        record = store.resolve(ref, content_type="launch_brief")
+    except ArtifactNotFound as exc:
+        raise SystemExit(f"--summary-input {ref!r} is neither a file nor a stored launch brief: {exc}") from exc
+    if record["content_type"] != "launch_brief":
+        print(f"Warning: artifact #{record['id']} is a {record['content_type']}, not a launch brief.")
+    print(f"Using stored launch brief #{record['id']} ({record['sha256'][:12]}, {record['status']}, run {record['run_id'][:8]}).")
+    return store.read_text(record), {"source": f"artifact:{record['id']}", "source_sha256": record["sha256"]}
+
+
+def record_artifact(
+    store: ArtifactStore,
+    content_type: str,
+    text: str,
+    *,
+    run_id: str,
+    approved: bool,
+    inputs: Dict[str, object],
+) -> None:
+    """Version ``text`` in the artifact store; a failure here never fails the run."""
+    try:
+        store.put(content_type, text, run_id=run_id, status="approved" if approved else "rejected", inputs=inputs)
+    except (OSError, sqlite3.Error) as exc:
+        print(f"Warning: could not record {content_type} in the artifact store ({exc}).")
+
+
+def variant_option(value: str) -> tuple[str, int]:
+    """``TYPE=N`` for ``--variants``."""
+    content_type, _, count = value.partition("=")
+    content_type = content_type.strip().lower()
+    if content_type not in CONTENT_SPECS:
+        raise argparse.ArgumentTypeError(f"unknown content type {content_type!r} (choose from {', '.join(CONTENT_SPECS)})")
+    try:
+        number = int(count or 2)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"expected TYPE=N, got {value!r}") from exc
+    if not 1 <= number <= MAX_VARIANTS:
+        raise argparse.ArgumentTypeError(f"variants must be between 1 and {MAX_VARIANTS}, got {number}")
+    return content_type, number
+
+
+def build_parser(*, batch: bool = False) -> argparse.ArgumentParser:
+    """Options shared by single runs and ``pipeline.py batch``.
+
+    In batch mode the positionals are source directories and content types move to
+    ``--types``.
+    """
+    if batch:
+        parser = argparse.ArgumentParser(
+            prog="pipeline.py batch",
+            description="Run several launches (one source folder each) concurrently with shared clients.",
+        )
+        parser.add_argument("sources", metavar="DIR", nargs="*", type=Path, help="Source folder per launch")
+        parser.add_argument(
+            "--launches",
+            type=Path,
+            help="File listing one source folder per line (optionally `name = folder`; # comments)",
+        )
+        parser.add_argument(
+            "--types",
+            nargs="+",
+            default=DEFAULT_TYPES,
+            help=f"Content types to generate for every launch ({', '.join(DEFAULT_TYPES)}).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=3,
+            help="Launches processed at once (default 3)",
+        )
+    else:
+        parser = argparse.ArgumentParser(description=__doc__)
+        parser.add_argument(
+            "types",
+            metavar="TYPE",
+            nargs="*",
+            default=DEFAULT_TYPES,
+            help=f"Content types to generate ({', '.join(DEFAULT_TYPES)}).",
+        )
     parser.add_argument("--api-key", help="OpenAI API key (defaults to OPENAI_API_KEY env)")
     parser.add_argument("--summary-model", default="gpt-4o-mini", help="Model for the launch brief step")
     parser.add_argument("--asset-model", default="gpt-4o-mini", help="Model for asset generation")
@@ -106,15 +575,128 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--asset-temperature", type=float, default=0.5)
     parser.add_argument("--summary-max-tokens", type=int, default=2000)
     parser.add_argument("--asset-max-tokens", type=int, default=1400)
+    parser.add_argument("--openai-rpm", type=float, help="Client-side requests/minute budget (env OPENAI_RPM)")
+    parser.add_argument("--openai-tpm", type=float, help="Client-side tokens/minute budget (env OPENAI_TPM)")
+    parser.add_argument(
+        "--openai-max-retries",
+        type=int,
+        help="Retries for 429/5xx responses before giving up (env OPENAI_MAX_RETRIES)",
+    )
+    parser.add_argument(
+        "--structured-brief",
+        action="store_true",
+        help=(
+            "Have the summary call return the brief's sections as JSON (rendered to Markdown for "
+            "review); asset prompts then carry only the sections each channel's spec needs"
+        ),
+    )
+    parser.add_argument(
+        "--single-call",
+        action="store_true",
+        help=(
+            "Generate all requested channels in one structured-output call (one JSON field per type) "
+            "so the brief is sent once; channels whose field fails validation fall back to their own call"
+        ),
+    )
+    parser.add_argument(
+        "--variants",
+        metavar="TYPE=N",
+        type=variant_option,
+        action="append",
+        default=[],
+        help=(
+            f"Ask for N candidates of TYPE in its one asset call (up to {MAX_VARIANTS}; repeatable, e.g. "
+            "--variants newsletter=2 --variants linkedin=3). Candidates are ranked locally and the "
+            "ranked set is sent for approval; the top one is saved"
+        ),
+    )
+    parser.add_argument(
+        "--spec-retries",
+        type=int,
+        default=1,
+        help=(
+            "Regenerate a draft that breaks its spec's hard limits (word count, hashtags, subject/"
+            "title/meta lengths) up to N times before review (default 1, 0 only reports)"
+        ),
+    )
+    parser.add_argument(
+        "--max-revisions",
+        type=int,
+        default=2,
+        help=(
+            "Regenerate a draft rejected with feedback (Slack modal or terminal prompt) and ask "
+            "again, up to N times per asset (default 2, 0 disables)"
+        ),
+    )
     parser.add_argument(
-        "--summary-input",
+        "--batch-api",
+        action="store_true",
+        help=(
+            "Generate through the provider's Batch API instead of live calls: one job for the "
+            "brief(s), one for the assets. Half price, but results can take up to 24h"
+        ),
+    )
+    parser.add_argument(
+        "--batch-poll-interval",
+        type=float,
+        default=30.0,
+        help="Longest wait between Batch API status polls in seconds (default 30)",
+    )
+    parser.add_argument(
+        "--batch-timeout",
+        type=float,
+        default=86400.0,
+        help="Give up waiting on a batch job after this many seconds (default 24h)",
+    )
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        help="Hedge asset calls slower than this percentile of recent latency (e.g. 95; off by default)",
+    )
+    parser.add_argument(
+        "--hedge-budget",
+        type=float,
+        default=0.1,
+        help="Max fraction of extra requests hedging may add (default 0.1)",
+    )
+    parser.add_argument(
+        "--hedge-fallback-delay",
+        type=float,
+        help="Seconds before hedging while too few latencies have been observed",
+    )
+    parser.add_argument(
+        "--ledger-db",
+        type=Path,
+        help="SQLite ledger of LLM calls (default outputs/ledger.db or LEDGER_DB env)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each stage with cProfile, dump .prof files, and print the hottest functions",
+    )
+    parser.add_argument(
+        "--profile-dir",
         type=Path,
-        help="Path to an existing launch brief (skip summary generation)",
+        help="Where to write stage profiles (default <assets-dir>/profiles/<run id>)",
     )
+    parser.add_argument("--profile-top", type=int, default=15, help="Hot functions to print per stage")
+    if not batch:
+        parser.add_argument(
+            "--summary-input",
+            help=(
+                "Existing launch brief to reuse (skip summary generation): a file path, an artifact "
+                "version id or hash prefix, or 'latest' for the latest approved brief"
+            ),
+        )
+        parser.add_argument(
+            "--summary-output",
+            type=Path,
+            help="Where to save the generated launch brief (default outputs/launch_brief.md)",
+        )
     parser.add_argument(
-        "--summary-output",
+        "--artifact-store",
         type=Path,
-        help="Where to save the generated launch brief (default outputs/launch_brief.md)",
+        help="Versioned artifact store (default <assets-dir>/artifacts or ARTIFACT_STORE)",
     )
     parser.add_argument(
         "--assets-dir",
@@ -122,6 +704,11 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         default=Path("outputs"),
         help="Directory for generated asset files (default: outputs/)",
     )
+    parser.add_argument(
+        "--combined-report",
+        action="store_true",
+        help="Also refresh <assets-dir>/GenieAI_Marketing_Outputs.md from the output manifest",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -143,6 +730,12 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         "--slack-webhook-url",
         help="Slack incoming webhook URL (falls back to SLACK_WEBHOOK_URL env)",
     )
+    parser.add_argument(
+        "--slack-batch-window",
+        type=float,
+        default=1.0,
+        help="Seconds to collect webhook previews into one Slack message (sent in the background)",
+    )
     parser.add_argument(
         "--slack-approvals",
         action="store_true",
@@ -196,17 +789,83 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Use STARTTLS (set false to use implicit SSL)",
     )
+    parser.add_argument(
+        "--smtp-plain",
+        action="store_true",
+        help="Unencrypted SMTP for local relays and test servers (or set SMTP_PLAIN)",
+    )
+    parser.add_argument(
+        "--email-to-file",
+        type=Path,
+        help="File of recipient addresses (one per line, # comments); added to --email-to",
+    )
+    parser.add_argument(
+        "--email-batch",
+        action="store_true",
+        help="Send one message per recipient over pooled SMTP connections instead of a single To: list",
+    )
+    parser.add_argument(
+        "--email-pool-size",
+        type=int,
+        default=4,
+        help="Concurrent SMTP connections for --email-batch",
+    )
+    parser.add_argument(
+        "--email-max-per-connection",
+        type=int,
+        default=100,
+        help="Messages sent on one SMTP connection before reconnecting (--email-batch)",
+    )
+    parser.add_argument(
+        "--outbox-db",
+        type=Path,
+        help="Email outbox database (default <assets-dir>/outbox.db or OUTBOX_DB)",
+    )
+    parser.add_argument(
+        "--email-send-now",
+        action="store_true",
+        help="After queueing the newsletter, try delivering it once from this run (other queued mail is left to the worker)",
+    )
     parser.add_argument(
         "--email-openai-model",
         default="gpt-4o-mini",
         help="Model to use when extracting subject/body from newsletter Markdown",
     )
+    parser.add_argument(
+        "--email-prep",
+        choices=["auto", "local", "llm"],
+        default="auto",
+        help="How to split the newsletter into subject/preview/body: parse locally and fall back to the LLM"
+        " (auto), local parser only, or always the LLM",
+    )
     parser.add_argument(
         "--email-system-prompt",
         default="You turn newsletter Markdown into a clean email",
         help="System prompt passed to OpenAI when preparing the email",
     )
-    return parser.parse_args(list(argv) if argv is not None else None)
+    return parser
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+    return build_parser().parse_args(list(argv) if argv is not None else None)
+
+
+@dataclass(frozen=True)
+class Decision:
+    """A reviewer's verdict on one draft; ``reason`` is their "Request changes" feedback."""
+
+    approved: bool
+    reason: Optional[str] = None
+    reviewer: Optional[str] = None
+
+
+def ask_feedback(label: str) -> Optional[str]:
+    """Terminal counterpart of the Slack feedback modal; blank or EOF means no revision."""
+    try:
+        reason = input(f"What should change in the {label}? (blank to skip): ").strip()
+    except EOFError:
+        return None
+    return reason or None
 
 
 def request_approval(
@@ -231,48 +890,25 @@ def request_approval(
         print("Please respond with 'y' or 'n'.")
 
 
-def print_prompts(types: Iterable[str]) -> None:
-    summary_payload = build_prompt()
+def print_prompts(
+    types: Iterable[str], *, variants: Mapping[str, int] | None = None, structured: bool = False
+) -> None:
+    summary_payload = build_prompt(structured=structured)
     print("# SUMMARY PROMPT")
     print(f"system = \"\"\"{summary_payload['system']}\"\"\"")
     print(f"user = \"\"\"{summary_payload['user']}\"\"\"\n")
     dummy_brief = "(launch brief goes here)"
     for content_type in types:
-        payload = build_payload(content_type, dummy_brief)
+        payload = build_payload(content_type, dummy_brief, variants=(variants or {}).get(content_type, 1))
         print(f"# {content_type.upper()} PROMPT")
         print(f"system = \"\"\"{payload['system']}\"\"\"")
         print(f"user = \"\"\"{payload['user']}\"\"\"\n")
 
 
-
-
 def get_slack_webhook(arg_value: Optional[str]) -> Optional[str]:
     return arg_value or os.getenv("SLACK_WEBHOOK_URL")
 
 
-def notify_slack(
-    webhook_url: Optional[str],
-    *,
-    title: str,
-    body: str,
-    preview_chars: int,
-) -> None:
-    if not webhook_url:
-        return
-    preview = body[:preview_chars].strip()
-    if len(body) > preview_chars:
-        preview += "…"
-    safe_preview = preview.replace("```", "`​``")
-    payload = {
-        "text": f"*{title}*\n```{safe_preview}```",
-    }
-    try:
-        response = requests.post(webhook_url, json=payload, timeout=10)
-        response.raise_for_status()
-    except Exception as exc:  # pragma: no cover
-        print(f"Warning: failed to notify Slack ({exc}). Continuing without Slack alert.")
-
-
 def setup_slack_approvals(
     *,
     enabled: bool,
@@ -289,7 +925,7 @@ def setup_slack_approvals(
         raise RuntimeError("Slack approvals requested but bot token or channel ID missing")
     store_path = db_path or (assets_dir / "approvals.db")
     store = ApprovalStore(store_path)
-    notifier = SlackNotifier(token, channel)
+    notifier = SlackNotifier(token, channel, thread_runs=True)
     return store, notifier, str(uuid4())
 
 
@@ -306,17 +942,17 @@ def request_slack_decision(
     poll_interval: float,
     auto_fallback: bool,
     auto_approve: bool,
-) -> bool:
+    slack_queue: SlackQueue | None = None,
+) -> Decision:
     if auto_approve:
-        return True
+        return Decision(True)
     store.upsert_item(run_id=run_id, item_id=item_id, title=label, body=text)
-    ts = notifier.post_draft(
-        run_id=run_id,
-        item_id=item_id,
-        title=label,
-        body=text,
-        preview_chars=preview_chars,
-    )
+    post = dict(run_id=run_id, item_id=item_id, title=label, body=text, preview_chars=preview_chars)
+    if slack_queue is not None:
+        # Goes through the queue's per-channel pacing; we need the ts before waiting anyway.
+        ts = slack_queue.submit(notifier.post_draft, pace_key=notifier.channel or "", **post).result()
+    else:
+        ts = notifier.post_draft(**post)
     store.attach_slack_refs(run_id=run_id, item_id=item_id, slack_ts=ts, channel=notifier.channel or "")
     record = store.wait_for_status(
         run_id=run_id,
@@ -325,19 +961,22 @@ def request_slack_decision(
         poll_interval=poll_interval,
     )
     status = (record or {}).get("status")
+    approver = (record or {}).get("approver_name") or (record or {}).get("approver_id")
     if status == "approved":
-        return True
+        return Decision(True, reviewer=approver)
     if status == "rejected":
-        approver = (record or {}).get("approver_name") or (record or {}).get("approver_id") or "reviewer"
-        print(f"{label} rejected by {approver}. Regenerate and rerun.")
-        return False
+        reason = (record or {}).get("reason")
+        print(f"{label} rejected by {approver or 'reviewer'}" + (f": {reason}" if reason else "."))
+        return Decision(False, reason=reason, reviewer=approver)
     if auto_fallback:
         print("Slack approval timed out; falling back to local prompt.")
-        return request_approval(
-            label=label,
-            text=text,
-            auto_approve=auto_approve,
-            preview_chars=preview_chars,
+        return Decision(
+            request_approval(
+                label=label,
+                text=text,
+                auto_approve=auto_approve,
+                preview_chars=preview_chars,
+            )
         )
     raise RuntimeError(
         f"Timed out waiting for Slack approval of {item_id}. Rerun with --approval-timeout-fallback to prompt locally."
@@ -350,6 +989,15 @@ def parse_recipients(raw: str | None) -> list[str]:
     return [addr.strip() for addr in raw.split(",") if addr.strip()]
 
 
+def read_recipients_file(path: Path) -> list[str]:
+    recipients = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            recipients.extend(parse_recipients(line))
+    return recipients
+
+
 def resolve_email_settings(args: argparse.Namespace) -> Optional[dict[str, object]]:
     if not args.send_newsletter_email:
         return None
@@ -359,6 +1007,9 @@ def resolve_email_settings(args: argparse.Namespace) -> Optional[dict[str, objec
     sender = args.email_from or os.getenv("EMAIL_FROM")
     raw_recipients = args.email_to or os.getenv("EMAIL_TO")
     recipients = parse_recipients(raw_recipients)
+    if args.email_to_file:
+        recipients.extend(read_recipients_file(args.email_to_file))
+    recipients = list(dict.fromkeys(recipients))
     if not (host and sender and recipients):
         raise RuntimeError(
             "Newsletter email requested but SMTP_HOST, EMAIL_FROM, or recipients missing."
@@ -373,18 +1024,131 @@ def resolve_email_settings(args: argparse.Namespace) -> Optional[dict[str, objec
         "username": username or os.getenv("SMTP_USERNAME"),
         "password": password or os.getenv("SMTP_PASSWORD"),
         "use_tls": use_tls,
+        "plain": args.smtp_plain or os.getenv("SMTP_PLAIN", "").lower() in {"1", "true", "yes"},
         "sender": sender,
         "recipients": recipients,
     }
 
 
-def main(argv: Iterable[str] | None = None) -> None:
-    args = parse_args(argv)
+def preheader_html(preview: str) -> str:
+    """Hidden preheader so inboxes show the spec's preview text next to the subject."""
+    if not preview:
+        return ""
+    from html import escape
 
-    if args.dry_run:
-        print_prompts(args.types)
+    return (
+        '<div style="display:none;max-height:0;overflow:hidden;mso-hide:all">'
+        f"{escape(preview)}</div>\n"
+    )
+
+
+def queue_newsletter_email(
+    settings: dict[str, object],
+    args: argparse.Namespace,
+    *,
+    run_id: str,
+    subject: str,
+    html_body: str,
+    text_body: str | None = None,
+) -> None:
+    """Hand the newsletter to the outbox; ``python outbox.py drain|work`` delivers it.
+
+    With ``--email-send-now`` this run also tries that one message immediately. SMTP
+    failures never fail the run: the message stays queued and the worker retries it
+    with backoff.
+    """
+    from outbox import EmailOutbox, OutboxWorker, default_outbox_path
+
+    outbox = EmailOutbox(args.outbox_db or default_outbox_path(args.assets_dir))
+    message_id = outbox.enqueue(
+        run_id=run_id,
+        item_id="newsletter",
+        subject=subject,
+        body=html_body,
+        text_body=text_body,
+        sender=settings["sender"],
+        recipients=settings["recipients"],
+        transport={
+            **settings,
+            "batch": args.email_batch,
+            "pool_size": args.email_pool_size,
+            "max_messages_per_connection": args.email_max_per_connection,
+        },
+    )
+    if not args.email_send_now:
+        print(f"Newsletter queued in {outbox.path} (#{message_id}); run `python outbox.py drain` to send.")
         return
+    OutboxWorker(outbox, password=settings["password"]).send_now(message_id)
+    record = outbox.get(message_id)
+    if record and record["status"] == "sent":
+        print("Newsletter emailed to", ", ".join(settings["recipients"]))
+    else:
+        print(f"Newsletter email #{message_id} is {record['status'] if record else 'missing'}; see `python outbox.py status`.")
+
+
+def parse_report_args(argv: Iterable[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pipeline.py report",
+        description="Aggregate the LLM call ledger (tokens, latency, estimated cost).",
+    )
+    parser.add_argument(
+        "--ledger-db",
+        type=Path,
+        help="Ledger to read (default outputs/ledger.db or LEDGER_DB env)",
+    )
+    parser.add_argument(
+        "--by",
+        nargs="+",
+        default=["day", "model", "stage"],
+        help="Grouping columns: day, model, stage, content_type, run_id (default: day model stage)",
+    )
+    parser.add_argument("--days", type=int, help="Only include calls from the last N days")
+    parser.add_argument("--run-id", help="Only include calls from one pipeline run")
+    return parser.parse_args(list(argv))
+
+
+def report_main(argv: Iterable[str]) -> None:
+    args = parse_report_args(argv)
+    path = args.ledger_db or default_ledger_path(Path("outputs"))
+    if not Path(path).exists():
+        raise SystemExit(f"No ledger found at {path}. Run the pipeline first or pass --ledger-db.")
+    since = time.time() - args.days * 86400 if args.days else None
+    try:
+        rows = CallLedger(path).report(group_by=args.by, since=since, run_id=args.run_id)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    print(format_report(rows, args.by))
+
+
+@dataclass
+class LaunchContext:
+    """Clients, stores and approval hooks shared by every launch in one invocation."""
 
+    args: argparse.Namespace
+    client: OpenAI
+    manifest: OutputManifest
+    artifacts: ArtifactStore
+    email_settings: Optional[dict[str, object]]
+    hedge: Optional[HedgePolicy]
+    approve: Callable[[str, str, str], Decision]
+    slack_preview: Callable[..., None]
+
+
+def prepare_run(args: argparse.Namespace) -> tuple[LaunchContext, Optional[str], Optional[SlackQueue]]:
+    """Configure the process-wide ledger, tracing and rate limits, then build shared clients.
+
+    Returns the context, the Slack approval thread id (if Slack approvals are on) and the
+    Slack queue, which the caller runs as a context manager.
+    """
+    load_env()
+
+    configure_ledger(args.ledger_db or default_ledger_path(args.assets_dir))
+    tracing_from_env(args.assets_dir)
+    configure_default_limiter(
+        requests_per_minute=args.openai_rpm,
+        tokens_per_minute=args.openai_tpm,
+        max_retries=args.openai_max_retries,
+    )
     client = create_client(args.api_key)
     slack_webhook = get_slack_webhook(args.slack_webhook_url)
     slack_store, slack_notifier, slack_run_id = setup_slack_approvals(
@@ -394,21 +1158,41 @@ def main(argv: Iterable[str] | None = None) -> None:
         bot_token=args.slack_bot_token,
         channel_id=args.slack_channel_id,
     )
-    email_settings = resolve_email_settings(args)
+    hedge = None
+    if args.hedge_percentile:
+        hedge = HedgePolicy(
+            percentile=args.hedge_percentile,
+            budget=args.hedge_budget,
+            fallback_delay=args.hedge_fallback_delay,
+        )
+        ledger = get_ledger()
+        if ledger is not None:
+            # Earlier runs' asset latencies give the percentile trigger from the first call.
+            hedge.seed(ledger.recent_latencies(stage="asset", model=args.asset_model))
+
+    slack_queue = (
+        SlackQueue(slack_webhook, batch_window=args.slack_batch_window)
+        if slack_webhook or slack_notifier
+        else None
+    )
+    # Terminal prompts from concurrent batch launches must not interleave.
+    prompt_lock = threading.Lock()
 
     def slack_preview(title: str, body: str, *, full: bool = False) -> None:
-        if slack_webhook:
+        if slack_queue is not None and slack_webhook:
             preview_chars = len(body) if full else args.preview_chars
-            notify_slack(
-                slack_webhook,
-                title=title,
-                body=body,
-                preview_chars=preview_chars,
-            )
+            slack_queue.enqueue_preview(title, body, preview_chars=preview_chars)
 
-    def approve(label: str, item_id: str, text: str) -> bool:
+    def approve(label: str, item_id: str, text: str) -> Decision:
         if args.auto_approve:
-            return True
+            return Decision(True)
+        with span("approval", item_id=item_id) as approval_span:
+            decision = _approve(label, item_id, text)
+            if approval_span is not None:
+                approval_span.set(approved=decision.approved)
+            return decision
+
+    def _approve(label: str, item_id: str, text: str) -> Decision:
         if slack_store and slack_notifier and slack_run_id:
             return request_slack_decision(
                 store=slack_store,
@@ -422,76 +1206,748 @@ def main(argv: Iterable[str] | None = None) -> None:
                 poll_interval=args.approval_poll_interval,
                 auto_fallback=args.approval_timeout_fallback,
                 auto_approve=args.auto_approve,
+                slack_queue=slack_queue,
+            )
+        with prompt_lock:
+            approved = request_approval(
+                label=label,
+                text=text,
+                auto_approve=args.auto_approve,
+                preview_chars=args.preview_chars,
+            )
+            reason = None if approved or not args.max_revisions else ask_feedback(label)
+            return Decision(approved, reason=reason)
+
+    context = LaunchContext(
+        args=args,
+        client=client,
+        manifest=OutputManifest(default_manifest_path(args.assets_dir)),
+        artifacts=ArtifactStore(args.artifact_store or default_artifact_path(args.assets_dir)),
+        email_settings=resolve_email_settings(args),
+        hedge=hedge,
+        approve=approve,
+        slack_preview=slack_preview,
+    )
+    return context, slack_run_id, slack_queue
+
+
+def review_brief(
+    context: LaunchContext,
+    launch_brief: str,
+    *,
+    run_id: str,
+    assets_dir: Path,
+    inputs: Dict[str, object],
+    existing: bool = False,
+    summary_output: Path | None = None,
+    name: str | None = None,
+) -> bool:
+    """Preview, approve and version the brief; a new, approved brief is also saved."""
+    args = context.args
+    tag = f"[{name}] " if name else ""
+    item_prefix = f"{name}/" if name else ""
+    title = "Launch brief (existing)" if existing else "Launch brief draft"
+    context.slack_preview(f"{tag}{title}", launch_brief, full=args.preview_chars == -1)
+    label = "launch brief (existing)" if existing else "launch brief"
+    decision = context.approve(f"{tag}{label}", f"{item_prefix}launch-brief", launch_brief)
+    if decision.reason:
+        inputs = {**inputs, "feedback": decision.reason}
+    record_artifact(
+        context.artifacts, "launch_brief", launch_brief, run_id=run_id, approved=decision.approved, inputs=inputs
+    )
+    if not decision.approved:
+        print(f"{tag}Launch brief not approved. Exiting without saving drafts.")
+        return False
+    if not existing:
+        summary_path = summary_output or assets_dir / "launch_brief.md"
+        written = save_text(summary_path, launch_brief, manifest=context.manifest, run_id=run_id, kind="launch_brief")
+        print(f"{tag}Saved launch brief to {summary_path}" + ("" if written else " (unchanged)"))
+        sections = parse_brief(launch_brief) if args.structured_brief else None
+        if sections is not None:
+            save_text(
+                summary_path.with_suffix(".json"),
+                json.dumps(sections, indent=2, ensure_ascii=False) + "\n",
+                manifest=context.manifest,
+                run_id=run_id,
+                kind="launch_brief_sections",
             )
-        return request_approval(
-            label=label,
-            text=text,
-            auto_approve=args.auto_approve,
-            preview_chars=args.preview_chars,
+    return True
+
+
+def rank_asset_variants(
+    args: argparse.Namespace, assets: Dict[str, str], *, launch_brief: str, tag: str = ""
+) -> Dict[str, List[ScoredVariant]]:
+    """Split and rank multi-variant responses (``--variants``); ``assets`` gets the top candidates."""
+    from variants import rank_variants, split_variants
+
+    rankings: Dict[str, List[ScoredVariant]] = {}
+    for content_type, count in dict(args.variants).items():
+        if count < 2 or content_type not in assets:
+            continue
+        candidates = split_variants(assets[content_type])
+        if len(candidates) < count:
+            print(f"{tag}Warning: asked for {count} {content_type} variants, got {len(candidates)}.")
+        rankings[content_type] = rank_variants(content_type, candidates, launch_brief=launch_brief)
+        assets[content_type] = rankings[content_type][0].text
+    return rankings
+
+
+def review_assets(
+    context: LaunchContext,
+    assets: Dict[str, str],
+    *,
+    run_id: str,
+    assets_dir: Path,
+    launch_brief: str,
+    name: str | None = None,
+    rankings: Dict[str, List[ScoredVariant]] | None = None,
+    reports: Dict[str, SpecReport] | None = None,
+) -> Dict[str, List[str]]:
+    """Spec-check, preview, approve, version and save each asset (emailing an approved newsletter).
+
+    Multi-variant responses (``--variants``) are split and ranked first; the top candidate
+    stands in for the asset and reviewers approve the ranked set. Drafts that break their
+    spec's hard limits are regenerated next (``--spec-retries``), so reviewers only see
+    out-of-spec drafts once the budget is spent. A draft rejected with feedback is
+    regenerated from the same brief with that feedback and re-posted for approval, up to
+    ``--max-revisions`` times; other assets are untouched.
+
+    ``rankings`` and ``reports`` are passed when the caller already ranked the variants
+    and enforced the specs (``--batch-api`` runs do both through batch jobs).
+    """
+    from variants import format_ranked, format_scores, rank_variants
+
+    args = context.args
+    tag = f"[{name}] " if name else ""
+    item_prefix = f"{name}/" if name else ""
+    outcome: Dict[str, List[str]] = {"saved": [], "rejected": []}
+    brief_digest = sha256_hex((launch_brief.strip() + "\n").encode("utf-8"))
+    assets = dict(assets)
+    if rankings is None:
+        rankings = rank_asset_variants(args, assets, launch_brief=launch_brief, tag=tag)
+    if reports is None:
+        reports = enforce_specs(
+            context.client,
+            assets,
+            launch_brief=launch_brief,
+            model=args.asset_model,
+            temperature=args.asset_temperature,
+            max_tokens=args.asset_max_tokens,
+            retries=args.spec_retries,
+            run_id=run_id,
         )
+    for content_type, text in assets.items():
+        report = reports[content_type]
+        if not report.ok:
+            print(f"{tag}Warning: {content_type} draft is still out of spec: {report.summary()}.")
+        inputs: Dict[str, object] = {
+            "model": args.asset_model,
+            "temperature": args.asset_temperature,
+            "max_tokens": args.asset_max_tokens,
+            "launch_brief_sha256": brief_digest,
+            "spec": report.summary(),
+        }
+        ranked = rankings.get(content_type)
+        if ranked:
+            if ranked[0].text != text:
+                # The top candidate was regenerated by the spec retry; rank the new draft in its place.
+                ranked = rank_variants(content_type, [text] + [v.text for v in ranked[1:]], launch_brief=launch_brief)
+                text = ranked[0].text
+            inputs["variants"] = format_scores(ranked)
+        revision = 0
+        while True:
+            suffix = f" (revision {revision})" if revision else ""
+            shown = format_ranked(content_type, ranked) if ranked and not revision else text
+            title = f"{content_type} variants (ranked)" if ranked and not revision else f"{content_type} draft{suffix}"
+            context.slack_preview(f"{tag}{title[0].upper()}{title[1:]}", shown, full=args.preview_chars == -1)
+            decision = context.approve(
+                f"{tag}{title}",
+                f"{item_prefix}{content_type}" + (f"#{revision + 1}" if revision else ""),
+                shown,
+            )
+            record_artifact(
+                context.artifacts,
+                content_type,
+                text,
+                run_id=run_id,
+                approved=decision.approved,
+                inputs={**inputs, "feedback": decision.reason} if decision.reason else inputs,
+            )
+            if decision.approved or not decision.reason or revision >= args.max_revisions:
+                break
+            revision += 1
+            print(f"{tag}Regenerating {content_type} with reviewer feedback (revision {revision} of {args.max_revisions}).")
+            # Revise the draft that was recorded (the top-ranked candidate), not the scored list reviewers saw.
+            previous = text
+            text = revise_asset(
+                context.client,
+                content_type=content_type,
+                launch_brief=launch_brief,
+                previous_draft=previous,
+                feedback=decision.reason,
+                model=args.asset_model,
+                temperature=args.asset_temperature,
+                max_tokens=args.asset_max_tokens,
+                run_id=run_id,
+            )
+            inputs = {
+                **inputs,
+                "revision": revision,
+                "revises_sha256": sha256_hex((previous.strip() + "\n").encode("utf-8")),
+            }
+        if not decision.approved:
+            print(f"{tag}{content_type} draft not approved. Skipping save.")
+            outcome["rejected"].append(content_type)
+            continue
+        path = assets_dir / f"{content_type}.md"
+        written = save_text(path, text, manifest=context.manifest, run_id=run_id, kind=content_type)
+        print(f"{tag}Saved {content_type} asset to {path}" + ("" if written else " (unchanged)"))
+        if ranked and not revision:
+            variants_path = assets_dir / f"{content_type}_variants.md"
+            save_text(
+                variants_path,
+                format_ranked(content_type, ranked),
+                manifest=context.manifest,
+                run_id=run_id,
+                kind=f"{content_type}_variants",
+            )
+            print(f"{tag}Saved ranked {content_type} variants to {variants_path}")
+        outcome["saved"].append(content_type)
+        if content_type == "newsletter" and context.email_settings:
+            send_newsletter(context, text, run_id=run_id, tag=tag)
 
-    if args.summary_input:
-        launch_brief = args.summary_input.read_text(encoding="utf-8").strip()
-        slack_preview("Launch brief (existing)", launch_brief, full=args.preview_chars == -1)
-        if not approve("launch brief (existing)", "launch-brief", launch_brief):
-            print("Launch brief not approved. Exiting without saving drafts.")
-            return
+    if args.combined_report:
+        from export import build_combined_report
+
+        build_combined_report(assets_dir, manifest=context.manifest)
+    return outcome
+
+
+def summary_inputs(args: argparse.Namespace, base_dir: Path | None) -> Dict[str, object]:
+    inputs: Dict[str, object] = {
+        "model": args.summary_model,
+        "temperature": args.summary_temperature,
+        "max_tokens": args.summary_max_tokens,
+    }
+    if args.structured_brief:
+        inputs["structured"] = True
+    if base_dir is not None:
+        inputs["sources"] = str(base_dir)
+    return inputs
+
+
+def run_launch(
+    context: LaunchContext,
+    *,
+    run_id: str,
+    assets_dir: Path,
+    base_dir: Path | None = None,
+    summary_input: str | None = None,
+    summary_output: Path | None = None,
+    name: str | None = None,
+) -> Dict[str, object]:
+    """Summary → approval → assets → approval → save (and email) for one launch.
+
+    ``name`` labels console lines and approval items when several launches share a run.
+    Returns the launch status plus the content types saved and rejected.
+    """
+    args = context.args
+    if summary_input:
+        launch_brief, brief_inputs = load_summary_input(summary_input, context.artifacts)
     else:
         launch_brief = run_summary(
-            client,
+            context.client,
             model=args.summary_model,
             temperature=args.summary_temperature,
             max_tokens=args.summary_max_tokens,
+            run_id=run_id,
+            base_dir=base_dir,
+            structured=args.structured_brief,
         )
-        slack_preview("Launch brief draft", launch_brief, full=args.preview_chars == -1)
-        if not approve("launch brief", "launch-brief", launch_brief):
-            print("Launch brief not approved. Exiting without saving drafts.")
-            return
-        summary_path = args.summary_output or args.assets_dir / "launch_brief.md"
-        save_text(summary_path, launch_brief)
-        print(f"Saved launch brief to {summary_path}")
+        brief_inputs = summary_inputs(args, base_dir)
+    if not review_brief(
+        context,
+        launch_brief,
+        run_id=run_id,
+        assets_dir=assets_dir,
+        inputs=brief_inputs,
+        existing=bool(summary_input),
+        summary_output=summary_output,
+        name=name,
+    ):
+        return {"status": "brief_rejected", "saved": [], "rejected": []}
 
     if not launch_brief:
         raise RuntimeError("Launch brief is empty. Provide --summary-input or allow summary generation.")
 
-    assets = run_assets(
-        client,
-        content_types=args.types,
-        launch_brief=launch_brief,
-        model=args.asset_model,
-        temperature=args.asset_temperature,
-        max_tokens=args.asset_max_tokens,
+    projection = format_projection(args.types, launch_brief)
+    if projection:
+        print(f"[{name}] {projection}" if name else projection)
+    variants = dict(args.variants)
+    # Multi-variant types keep their own call; everything else can share one structured call.
+    combined = [t for t in args.types if variants.get(t, 1) == 1] if args.single_call else []
+    if len(combined) < 2:
+        combined = []
+    assets: Dict[str, str] = {}
+    if combined:
+        assets, single_call = run_assets_single_call(
+            context.client,
+            content_types=combined,
+            launch_brief=launch_brief,
+            model=args.asset_model,
+            temperature=args.asset_temperature,
+            max_tokens=args.asset_max_tokens,
+            hedge=context.hedge,
+            run_id=run_id,
+        )
+        print(f"[{name}] {single_call.format()}" if name else single_call.format())
+    assets.update(
+        run_assets(
+            context.client,
+            content_types=[t for t in args.types if t not in combined],
+            launch_brief=launch_brief,
+            model=args.asset_model,
+            temperature=args.asset_temperature,
+            max_tokens=args.asset_max_tokens,
+            hedge=context.hedge,
+            run_id=run_id,
+            variants=variants,
+        )
+    )
+    assets = {content_type: assets[content_type] for content_type in args.types}
+    if context.hedge is not None and not name:
+        stats = context.hedge.snapshot()
+        print(f"Hedged {stats['hedges_issued']} of {stats['primary_calls']} asset calls ({stats['hedges_won']} won).")
+    outcome = review_assets(
+        context, assets, run_id=run_id, assets_dir=assets_dir, launch_brief=launch_brief, name=name
     )
+    return {"status": "complete", **outcome}
 
-    for content_type, text in assets.items():
-        slack_preview(f"{content_type.title()} draft", text, full=args.preview_chars == -1)
-        approved = approve(f"{content_type} draft", content_type, text)
-        if approved:
-            path = args.assets_dir / f"{content_type}.md"
-            save_text(path, text)
-            print(f"Saved {content_type} asset to {path}")
-            if content_type == "newsletter" and email_settings:
-                subject, prepared_body = prep_email_with_openai(
-                    client=client,
-                    model=args.email_openai_model,
-                    system_prompt=args.email_system_prompt,
-                    newsletter_markdown=text,
+
+def _launch_tag(launch: Dict[str, object]) -> str:
+    return f"[{launch['name']}] " if launch.get("name") else ""
+
+
+def run_launches_offline(context: LaunchContext, launches: List[Dict[str, object]]) -> None:
+    """Generate every launch through two Batch API jobs: all briefs, then all assets.
+
+    ``launches`` are dicts with ``name``, ``run_id``, ``assets_dir`` and optionally
+    ``base_dir`` / ``summary_input`` / ``summary_output``; each is updated in place with
+    ``status``, ``saved``, ``rejected`` and ``error``. Approvals happen between the jobs
+    exactly as in interactive runs.
+    """
+    from batch_jobs import BatchRequest, run_batch
+
+    args = context.args
+    if args.single_call:
+        print("Warning: --single-call applies to live runs; --batch-api sends one asset request per channel.")
+    batch_dir = args.assets_dir / "batches"
+    job_id = time.strftime("%Y%m%d-%H%M%S")
+    options = {"poll_interval": args.batch_poll_interval, "timeout": args.batch_timeout}
+
+    briefs: Dict[str, tuple[str, Dict[str, object]]] = {}
+    summary_requests: List[BatchRequest] = []
+    for launch in launches:
+        launch.update(status="pending", saved=[], rejected=[])
+        if launch.get("summary_input"):
+            briefs[launch["run_id"]] = load_summary_input(launch["summary_input"], context.artifacts)
+            continue
+        payload = build_prompt(base_dir=launch.get("base_dir"), structured=args.structured_brief)
+        body = response_request(
+            payload, model=args.summary_model, temperature=args.summary_temperature, max_tokens=args.summary_max_tokens
+        )
+        if args.structured_brief:
+            body["text"] = {
+                "format": {"type": "json_schema", "name": "launch_brief", "schema": brief_schema(), "strict": True}
+            }
+        summary_requests.append(BatchRequest(launch["run_id"], "summary", body))
+    summaries = run_batch(
+        context.client, summary_requests, path=batch_dir / f"{job_id}-summary.jsonl", metadata={"stage": "summary"}, **options
+    )
+
+    asset_requests: List[BatchRequest] = []
+    approved: List[Dict[str, object]] = []
+    for launch in launches:
+        run_id = launch["run_id"]
+        existing = run_id in briefs
+        if not existing:
+            result = summaries[BatchRequest(run_id, "summary", {}).custom_id]
+            if not result.ok or not result.text:
+                launch.update(status="failed", error=f"summary {result.error or 'was empty'}")
+                print(f"{_launch_tag(launch)}Launch brief failed in batch: {launch['error']}")
+                continue
+            text = result.text
+            if args.structured_brief:
+                text = brief_from_json(result.text) or result.text
+                if text is result.text:
+                    print(f"{_launch_tag(launch)}Warning: batch brief is not structured JSON; using it as Markdown.")
+            briefs[run_id] = (text, summary_inputs(args, launch.get("base_dir")))
+        launch_brief, brief_inputs = briefs[run_id]
+        if not review_brief(
+            context,
+            launch_brief,
+            run_id=run_id,
+            assets_dir=launch["assets_dir"],
+            inputs=brief_inputs,
+            existing=existing,
+            summary_output=launch.get("summary_output"),
+            name=launch["name"],
+        ):
+            launch["status"] = "brief_rejected"
+            continue
+        approved.append(launch)
+        projection = format_projection(args.types, launch_brief)
+        if projection:
+            print(f"{_launch_tag(launch)}{projection}")
+        variants = dict(args.variants)
+        for content_type in args.types:
+            count = variants.get(content_type, 1)
+            payload = build_payload(content_type, launch_brief, variants=count)
+            body = response_request(
+                payload,
+                model=args.asset_model,
+                temperature=args.asset_temperature,
+                max_tokens=args.asset_max_tokens * count,
+            )
+            asset_requests.append(BatchRequest(run_id, "asset", body, content_type))
+    results = run_batch(
+        context.client, asset_requests, path=batch_dir / f"{job_id}-assets.jsonl", metadata={"stage": "asset"}, **options
+    )
+
+    drafts: Dict[str, tuple[Dict[str, str], str]] = {}
+    rankings: Dict[str, Dict[str, List[ScoredVariant]]] = {}
+    failures: Dict[str, List[str]] = {}
+    for launch in approved:
+        run_id = launch["run_id"]
+        assets: Dict[str, str] = {}
+        failures[run_id] = []
+        for content_type in args.types:
+            result = results[BatchRequest(run_id, "asset", {}, content_type).custom_id]
+            if result.ok and result.text:
+                assets[content_type] = result.text
+            else:
+                failures[run_id].append(content_type)
+                print(f"{_launch_tag(launch)}{content_type} failed in batch: {result.error or 'empty output'}")
+        launch_brief = briefs[run_id][0]
+        rankings[run_id] = rank_asset_variants(args, assets, launch_brief=launch_brief, tag=_launch_tag(launch))
+        drafts[run_id] = (assets, launch_brief)
+    reports = enforce_specs_offline(
+        context, drafts, path=lambda round_: batch_dir / f"{job_id}-spec-retry-{round_}.jsonl", **options
+    )
+
+    for launch in approved:
+        run_id = launch["run_id"]
+        assets, launch_brief = drafts[run_id]
+        outcome = review_assets(
+            context,
+            assets,
+            run_id=run_id,
+            assets_dir=launch["assets_dir"],
+            launch_brief=launch_brief,
+            name=launch["name"],
+            rankings=rankings[run_id],
+            reports=reports[run_id],
+        )
+        failed = failures[run_id]
+        launch.update(outcome, status="failed" if failed else "complete")
+        if failed:
+            launch["error"] = f"asset(s) failed in batch: {', '.join(failed)}"
+
+
+def enforce_specs_offline(
+    context: LaunchContext,
+    drafts: Dict[str, tuple[Dict[str, str], str]],
+    *,
+    path: Callable[[int], Path],
+    poll_interval: float,
+    timeout: float | None,
+) -> Dict[str, Dict[str, SpecReport]]:
+    """``enforce_specs`` for ``--batch-api`` runs: each retry round is one batch job for every launch.
+
+    ``drafts`` maps run id to (assets, launch brief); assets are updated in place with
+    the draft that has the fewest violations. Returns the final reports per run id.
+    """
+    from batch_jobs import BatchRequest, run_batch
+
+    args = context.args
+    reports: Dict[str, Dict[str, SpecReport]] = {}
+    for run_id, (assets, _) in drafts.items():
+        reports[run_id] = {}
+        for content_type, text in assets.items():
+            report = reports[run_id][content_type] = check_draft(content_type, text)
+            SPEC_STATS.record(report)
+    for round_ in range(1, args.spec_retries + 1):
+        requests = []
+        for run_id, (assets, launch_brief) in drafts.items():
+            for content_type, report in reports[run_id].items():
+                if report.ok:
+                    continue
+                payload = build_payload(
+                    content_type,
+                    launch_brief,
+                    feedback=violation_feedback(report),
+                    previous_draft=assets[content_type],
                 )
-                html_body = md.markdown(prepared_body)
-                send_email(
-                    smtp_host=email_settings["host"],
-                    smtp_port=email_settings["port"],
-                    username=email_settings["username"],
-                    password=email_settings["password"],
-                    use_tls=email_settings["use_tls"],
-                    subject=subject,
-                    body=html_body,
-                    sender=email_settings["sender"],
-                    recipients=email_settings["recipients"],
+                body = response_request(
+                    payload, model=args.asset_model, temperature=args.asset_temperature, max_tokens=args.asset_max_tokens
+                )
+                requests.append(BatchRequest(run_id, "spec_retry", body, content_type))
+        if not requests:
+            break
+        results = run_batch(
+            context.client,
+            requests,
+            path=path(round_),
+            poll_interval=poll_interval,
+            timeout=timeout,
+            metadata={"stage": "spec_retry"},
+        )
+        for request in requests:
+            result = results[request.custom_id]
+            if not result.ok or not result.text:
+                continue
+            candidate = check_draft(request.content_type, result.text)
+            SPEC_STATS.record(candidate, retry=True)
+            current = reports[request.run_id][request.content_type]
+            if len(candidate.violations) <= len(current.violations):
+                drafts[request.run_id][0][request.content_type] = result.text
+                reports[request.run_id][request.content_type] = candidate
+    return reports
+
+
+def send_newsletter(context: LaunchContext, newsletter_markdown: str, *, run_id: str, tag: str = "") -> None:
+    from email_helpers import EMAIL_PREP_STATS, prep_email_with_openai, prepare_email
+
+    args = context.args
+    if args.email_prep == "llm":
+        subject, prepared_body = prep_email_with_openai(
+            client=context.client,
+            model=args.email_openai_model,
+            system_prompt=args.email_system_prompt,
+            newsletter_markdown=newsletter_markdown,
+            run_id=run_id,
+        )
+        preview = ""
+    else:
+        try:
+            parts = prepare_email(
+                client=context.client,
+                model=args.email_openai_model,
+                system_prompt=args.email_system_prompt,
+                newsletter_markdown=newsletter_markdown,
+                run_id=run_id,
+                use_llm=args.email_prep == "auto",
+            )
+        except ValueError as exc:
+            # The newsletter is already saved and approved; losing the send must not lose the run.
+            print(f"{tag}Warning: newsletter email not sent ({exc}). Fix the draft or use --email-prep auto.")
+            return
+        subject, prepared_body, preview = parts.subject, parts.body, parts.preview
+        stats = EMAIL_PREP_STATS.snapshot()
+        print(
+            f"{tag}Email subject/body {'parsed locally' if parts.source == 'local' else 'extracted by the LLM'}"
+            f" ({stats['local']} of {stats['local'] + stats['llm']} LLM calls avoided)."
+        )
+    with profile_stage("email_send"):
+        from markdown_render import render as render_markdown
+
+        rendered = render_markdown(prepared_body)
+        html_body = preheader_html(preview) + rendered.html
+    queue_newsletter_email(
+        context.email_settings,
+        args,
+        run_id=run_id,
+        subject=subject,
+        html_body=html_body,
+        text_body=rendered.text,
+    )
+
+
+def read_launches(sources: Iterable[Path], launches_file: Path | None) -> List[tuple[str, Path]]:
+    """(name, source dir) per launch; names default to the folder name and are made unique."""
+    entries: List[tuple[Optional[str], Path]] = [(None, Path(source)) for source in sources]
+    if launches_file is not None:
+        for raw in launches_file.read_text(encoding="utf-8").splitlines():
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            name, _, folder = line.rpartition("=") if "=" in line else ("", "", line)
+            path = Path(folder.strip()).expanduser()
+            if not path.is_absolute():
+                path = launches_file.parent / path
+            entries.append((name.strip() or None, path))
+    missing = [str(path) for _, path in entries if not path.is_dir()]
+    if missing:
+        raise SystemExit(f"Launch source folder(s) not found: {', '.join(missing)}")
+    launches: List[tuple[str, Path]] = []
+    seen: Dict[str, int] = {}
+    for name, path in entries:
+        base = name or path.resolve().name
+        seen[base] = seen.get(base, 0) + 1
+        launches.append((base if seen[base] == 1 else f"{base}-{seen[base]}", path))
+    return launches
+
+
+def format_batch_summary(launches: List[Dict[str, object]], *, seconds: float) -> str:
+    headers = ["launch", "status", "saved", "rejected", "calls", "tokens", "cost_usd", "seconds"]
+    table = [headers]
+    for launch in launches:
+        table.append(
+            [
+                str(launch["name"]),
+                str(launch["status"]),
+                ",".join(launch.get("saved", [])) or "-",
+                ",".join(launch.get("rejected", [])) or "-",
+                str(launch.get("calls", 0)),
+                str(launch.get("tokens", 0)),
+                f"{launch.get('cost_usd', 0.0):.4f}",
+                f"{launch['seconds']:.1f}",
+            ]
+        )
+    widths = [max(len(row[col]) for row in table) for col in range(len(headers))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in table]
+    complete = sum(1 for launch in launches if launch["status"] == "complete")
+    lines.append(f"{complete} of {len(launches)} launch(es) complete in {seconds:.1f}s.")
+    return "\n".join(lines)
+
+
+def batch_main(argv: Iterable[str]) -> None:
+    args = build_parser(batch=True).parse_args(list(argv))
+    launches = read_launches(args.sources, args.launches)
+    if not launches:
+        raise SystemExit("No launches given. Pass source folders or --launches FILE.")
+    if args.dry_run:
+        for name, source in launches:
+            print(f"{name}: {source} -> {args.assets_dir / name}")
+        print_prompts(args.types, variants=dict(args.variants), structured=args.structured_brief)
+        return
+    if args.profile:
+        print("Warning: --profile is not supported in batch mode (cProfile is per-thread); ignoring it.")
+
+    context, slack_run_id, slack_queue = prepare_run(args)
+    batch_id = slack_run_id or str(uuid4())
+    started = time.time()
+
+    def process(launch: tuple[str, Path]) -> Dict[str, object]:
+        name, source = launch
+        run_id = str(uuid4())
+        record: Dict[str, object] = {
+            "name": name,
+            "source": str(source),
+            "outputs": str(args.assets_dir / name),
+            "run_id": run_id,
+        }
+        launch_started = time.perf_counter()
+        try:
+            with start_run(run_id):
+                record.update(
+                    run_launch(context, run_id=run_id, assets_dir=args.assets_dir / name, base_dir=source, name=name)
                 )
-                print("Newsletter emailed to", ", ".join(email_settings["recipients"]))
+        except Exception as exc:
+            print(f"[{name}] Launch failed: {exc}")
+            record.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+        record["seconds"] = round(time.perf_counter() - launch_started, 3)
+        return record
+
+    if args.batch_api:
+        results: List[Dict[str, object]] = [
+            {
+                "name": name,
+                "source": str(source),
+                "outputs": str(args.assets_dir / name),
+                "run_id": str(uuid4()),
+                "base_dir": source,
+                "assets_dir": args.assets_dir / name,
+            }
+            for name, source in launches
+        ]
+        with start_run(batch_id), slack_queue or nullcontext():
+            run_launches_offline(context, results)
+        for record in results:
+            record.pop("base_dir")
+            record.pop("assets_dir")
+            record["seconds"] = round(time.time() - started, 3)
+    else:
+        workers = max(1, min(args.concurrency, len(launches)))
+        with slack_queue or nullcontext(), ThreadPoolExecutor(max_workers=workers, thread_name_prefix="launch") as pool:
+            results = list(pool.map(process, launches))
+    elapsed = time.time() - started
+
+    ledger = get_ledger()
+    if ledger is not None:
+        usage = {row["run_id"]: row for row in ledger.report(group_by=["run_id"], since=started)}
+        for record in results:
+            row = usage.get(record["run_id"])
+            if row:
+                record["calls"] = row["calls"]
+                record["tokens"] = (row["input_tokens"] or 0) + (row["output_tokens"] or 0)
+                record["cost_usd"] = round(row["cost_usd"] or 0.0, 6)
+
+    summary_path = args.assets_dir / "batch_summary.json"
+    summary = {
+        "batch_id": batch_id,
+        "started_at": started,
+        "seconds": round(elapsed, 3),
+        "types": list(args.types),
+        "launches": results,
+    }
+    save_text(summary_path, json.dumps(summary, indent=2), manifest=context.manifest, run_id=batch_id, kind="batch_summary")
+    if context.hedge is not None:
+        stats = context.hedge.snapshot()
+        print(f"Hedged {stats['hedges_issued']} of {stats['primary_calls']} asset calls ({stats['hedges_won']} won).")
+    print(SPEC_STATS.format())
+    print(format_batch_summary(results, seconds=elapsed))
+    print(f"Batch summary saved to {summary_path}")
+
+
+def main(argv: Iterable[str] | None = None) -> None:
+    argv = list(argv) if argv is not None else sys.argv[1:]
+    if argv and argv[0] == "report":
+        report_main(argv[1:])
+        return
+    if argv and argv[0] == "batch":
+        batch_main(argv[1:])
+        return
+    args = parse_args(argv)
+
+    if args.dry_run:
+        print_prompts(args.types, variants=dict(args.variants), structured=args.structured_brief)
+        return
+
+    context, slack_run_id, slack_queue = prepare_run(args)
+    run_id = slack_run_id or str(uuid4())
+    profile_ctx = (
+        activate_profiling(
+            args.profile_dir or args.assets_dir / "profiles" / run_id,
+            top=args.profile_top,
+            print_report=True,
+        )
+        if args.profile
+        else nullcontext()
+    )
+    with start_run(run_id), profile_ctx, slack_queue or nullcontext():
+        if args.batch_api:
+            launch: Dict[str, object] = {
+                "name": None,
+                "run_id": run_id,
+                "assets_dir": args.assets_dir,
+                "summary_input": args.summary_input,
+                "summary_output": args.summary_output,
+            }
+            run_launches_offline(context, [launch])
+            if launch.get("error"):
+                print(f"Batch generation incomplete: {launch['error']}")
         else:
-            print(f"{content_type} draft not approved. Skipping save.")
+            run_launch(
+                context,
+                run_id=run_id,
+                assets_dir=args.assets_dir,
+                summary_input=args.summary_input,
+                summary_output=args.summary_output,
+            )
+        print(SPEC_STATS.format())
+        if context.manifest.stats["unchanged"]:
+            print(f"{context.manifest.stats['unchanged']} output(s) unchanged and left untouched.")
 
 
 if __name__ == "__main__":
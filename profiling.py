@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+"""Opt-in cProfile hooks that capture one profile per pipeline stage.
+
+Stages nest: entering ``stage("ingest")`` inside ``stage("summary")`` pauses the
+summary profile, so each dump holds only the time spent in that stage itself.
+Profiling is process-wide in CPython, so only one profiled run may be active at a
+time; :func:`activate` returns ``None`` when another run already holds it.
+"""
+
+import contextvars
+import cProfile
+import io
+import pstats
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+_PROFILE_LOCK = threading.Lock()
+_active: contextvars.ContextVar[Optional["StageProfiler"]] = contextvars.ContextVar("stage_profiler", default=None)
+
+
+class StageProfiler:
+    def __init__(self, output_dir: Path | str, *, top: int = 15):
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self._order: List[str] = []
+        self._stack: List[cProfile.Profile] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = cProfile.Profile()
+            self._order.append(name)
+        parent = self._stack[-1] if self._stack else None
+        if parent is not None:
+            parent.disable()
+        self._stack.append(profile)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._stack.pop()
+            if parent is not None:
+                parent.enable()
+
+    def dump(self) -> List[Path]:
+        """Write one ``.prof`` file per stage (open with ``python -m pstats`` or snakeviz)."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        paths: List[Path] = []
+        for index, name in enumerate(self._order, start=1):
+            safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+            path = self.output_dir / f"{index:02d}-{safe}.prof"
+            self.profiles[name].dump_stats(str(path))
+            paths.append(path)
+        return paths
+
+    def hot_functions(self, name: str) -> List[Dict[str, object]]:
+        stats = pstats.Stats(self.profiles[name], stream=io.StringIO())
+        rows = []
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items():  # type: ignore[attr-defined]
+            rows.append(
+                {
+                    "function": f"{Path(filename).name}:{line}({func})",
+                    "calls": calls,
+                    "self_seconds": tottime,
+                    "cum_seconds": cumtime,
+                }
+            )
+        rows.sort(key=lambda row: row["self_seconds"], reverse=True)
+        return rows[: self.top]
+
+    def report(self) -> str:
+        lines: List[str] = []
+        for name in self._order:
+            rows = self.hot_functions(name)
+            total = sum(row["self_seconds"] for row in rows)
+            lines.append(f"== {name} (top {len(rows)} by self time, {total:.3f}s) ==")
+            lines.append(f"{'self_s':>8} {'cum_s':>8} {'calls':>8}  function")
+            for row in rows:
+                lines.append(
+                    f"{row['self_seconds']:8.4f} {row['cum_seconds']:8.4f} {row['calls']:8d}  {row['function']}"
+                )
+            lines.append("")
+        return "\n".join(lines).rstrip()
+
+
+@contextmanager
+def activate(
+    output_dir: Path | str,
+    *,
+    top: int = 15,
+    print_report: bool = False,
+) -> Iterator[Optional[StageProfiler]]:
+    """Profile stages entered inside the block; dumps profiles to ``output_dir`` on exit."""
+    if not _PROFILE_LOCK.acquire(blocking=False):
+        print("Warning: another profiled run is active; continuing without profiling.")
+        yield None
+        return
+    profiler = StageProfiler(output_dir, top=top)
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+        try:
+            paths = profiler.dump()
+            if print_report and paths:
+                print(profiler.report())
+                print(f"Saved {len(paths)} stage profiles to {profiler.output_dir}")
+        finally:
+            _PROFILE_LOCK.release()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Profile ``name`` when a profiler is active in this context; otherwise a no-op."""
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+__all__ = ["StageProfiler", "activate", "stage"]
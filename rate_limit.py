@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+"""Client-side rate limiting, retries, and adaptive concurrency for OpenAI calls."""
+
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+from cancellation import CancelToken
+from metrics import OPENAI_ERRORS, OPENAI_RETRIES
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError"}
+
+
+class RetriesExhausted(RuntimeError):
+    """Raised when a call keeps failing with retryable errors."""
+
+    def __init__(self, message: str, *, status_code: int | None, retry_after: float | None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Continuous-refill bucket; ``capacity`` units become available per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` units and return how long the caller must wait before using them."""
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill()
+            self._level -= amount
+            if self._level >= 0:
+                return 0.0
+            return -self._level / self.rate
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level + amount)
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit: grows slowly on success, halves on throttling."""
+
+    def __init__(self, max_limit: int, *, min_limit: int = 1):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, cancel: CancelToken | None = None) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                self._cond.wait(timeout=0.5)
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            self.limit = max(self.min_limit, self.limit / 2)
+
+
+def status_code_of(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = status_code_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if type(exc).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read ``retry-after-ms`` / ``retry-after`` (seconds or HTTP date) from an error response."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    raw_ms = headers.get("retry-after-ms")
+    if raw_ms:
+        try:
+            return max(float(raw_ms) / 1000.0, 0.0)
+        except ValueError:
+            pass
+    raw = headers.get("retry-after")
+    if not raw:
+        return None
+    try:
+        return max(float(raw), 0.0)
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(raw)
+        if parsed is None:
+            return None
+        return max(parsed.timestamp() - time.time(), 0.0)
+
+
+class RateLimiter:
+    """Shared limiter enforcing RPM/TPM budgets with jittered exponential backoff."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.stats: Dict[str, int] = {"calls": 0, "retries": 0, "throttled": 0, "errors": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _sleep(self, seconds: float, cancel: CancelToken | None) -> None:
+        if seconds <= 0:
+            return
+        if cancel is None:
+            time.sleep(seconds)
+            return
+        cancel.wait(seconds)
+        cancel.raise_if_cancelled()
+
+    def _pause(self, seconds: float) -> None:
+        """Hold every caller back after the server tells us to (e.g. 429 retry-after)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff for ``attempt`` (0-based) with jitter over the upper half."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        *,
+        estimated_tokens: int = 0,
+        cancel: CancelToken | None = None,
+        used_tokens: Callable[[T], Optional[int]] | None = None,
+    ) -> T:
+        attempt = 0
+        while True:
+            with self._lock:
+                paused = self._paused_until - time.monotonic()
+            self._sleep(paused, cancel)
+            self._sleep(self.requests.reserve(1), cancel)
+            self._sleep(self.tokens.reserve(estimated_tokens), cancel)
+            self.concurrency.acquire(cancel)
+            self._count("calls")
+            try:
+                result = fn()
+            except Exception as exc:
+                if (cancel is not None and cancel.cancelled) or not is_retryable(exc):
+                    self._count("errors")
+                    if not (cancel is not None and cancel.cancelled):
+                        OPENAI_ERRORS.inc(status=str(status_code_of(exc) or type(exc).__name__))
+                    raise
+                failure = exc
+            else:
+                failure = None
+            finally:
+                self.concurrency.release()
+
+            if failure is None:
+                self.concurrency.on_success()
+                if used_tokens is not None and estimated_tokens:
+                    actual = used_tokens(result)
+                    if actual is not None and actual < estimated_tokens:
+                        self.tokens.refund(estimated_tokens - actual)
+                return result
+
+            status = status_code_of(failure)
+            retry_after = retry_after_seconds(failure)
+            if status == 429:
+                self._count("throttled")
+                self.concurrency.on_throttle()
+            status_label = str(status or type(failure).__name__)
+            if attempt >= self.max_retries:
+                self._count("errors")
+                OPENAI_ERRORS.inc(status=status_label)
+                raise RetriesExhausted(
+                    f"OpenAI call failed after {attempt + 1} attempts: {failure}",
+                    status_code=status,
+                    retry_after=retry_after,
+                ) from failure
+            delay = self.backoff_delay(attempt)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+                self._pause(retry_after)
+            self._count("retries")
+            OPENAI_RETRIES.inc(status=status_label)
+            attempt += 1
+            print(f"OpenAI call failed ({failure}); retrying in {delay:.1f}s (attempt {attempt}/{self.max_retries}).")
+            self._sleep(delay, cancel)
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def configure_default_limiter(
+    *,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+    max_concurrency: int | None = None,
+    max_retries: int | None = None,
+) -> RateLimiter:
+    """(Re)build the process-wide limiter, falling back to OPENAI_* env vars."""
+    global _default_limiter
+    limiter = RateLimiter(
+        requests_per_minute=requests_per_minute or float(os.getenv("OPENAI_RPM", "500")),
+        tokens_per_minute=tokens_per_minute or float(os.getenv("OPENAI_TPM", "200000")),
+        max_concurrency=max_concurrency or int(os.getenv("OPENAI_MAX_CONCURRENCY", "4")),
+        max_retries=max_retries if max_retries is not None else int(os.getenv("OPENAI_MAX_RETRIES", "5")),
+    )
+    with _default_lock:
+        _default_limiter = limiter
+    return limiter
+
+
+def get_default_limiter() -> RateLimiter:
+    with _default_lock:
+        limiter = _default_limiter
+    return limiter or configure_default_limiter()
+
+
+__all__ = [
+    "AdaptiveConcurrency",
+    "RateLimiter",
+    "RetriesExhausted",
+    "TokenBucket",
+    "configure_default_limiter",
+    "get_default_limiter",
+    "is_retryable",
+    "retry_after_seconds",
+]
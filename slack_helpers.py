@@ -3,16 +3,38 @@ from __future__ import annotations
 """Slack helper utilities for posting drafts and updating messages."""
 
 import json
-from typing import Optional
+import os
+import threading
+from typing import Dict, Optional
 
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+from tracing import span
+
+# ``callback_id`` of the "Request changes" modal; api.py routes its view_submission.
+FEEDBACK_CALLBACK_ID = "request_changes"
 
 
 class SlackNotifier:
-    def __init__(self, token: str, channel: str | None = None):
-        self.client = WebClient(token=token)
+    def __init__(
+        self,
+        token: str,
+        channel: str | None = None,
+        *,
+        base_url: str | None = None,
+        thread_runs: bool = False,
+        max_rate_limit_retries: int = 3,
+    ):
+        from slack_sdk import WebClient
+        from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
+
+        # SLACK_API_URL points the client at a stand-in (e.g. fakes.FakeSlackServer for load tests).
+        base_url = base_url or os.getenv("SLACK_API_URL")
+        self.client = WebClient(token=token, base_url=base_url) if base_url else WebClient(token=token)
+        # On 429, sleep for Slack's Retry-After and retry instead of failing the post.
+        self.client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=max_rate_limit_retries))
         self.channel = channel
+        self.thread_runs = thread_runs
+        self._run_threads: Dict[str, str] = {}
+        self._thread_lock = threading.Lock()
 
     def _safe_preview(self, text: str, preview_chars: int) -> str:
         preview = text[:preview_chars].strip()
@@ -20,6 +42,19 @@ class SlackNotifier:
             preview += "…"
         return preview.replace("```", "`\u200b``")
 
+    def run_thread(self, run_id: str) -> str:
+        """Post (once) the parent message that a run's drafts are threaded under."""
+        with self._thread_lock:
+            ts = self._run_threads.get(run_id)
+            if ts is None:
+                with span("slack.post_thread_parent"):
+                    response = self.client.chat_postMessage(
+                        channel=self.channel,
+                        text=f"Drafts awaiting approval for run `{run_id}`",
+                    )
+                ts = self._run_threads[run_id] = response["ts"]
+            return ts
+
     def post_draft(
         self,
         *,
@@ -28,9 +63,12 @@ class SlackNotifier:
         title: str,
         body: str,
         preview_chars: int,
+        thread_ts: str | None = None,
     ) -> str:
         if not self.channel:
             raise ValueError("SlackNotifier.channel is required for posting drafts")
+        if thread_ts is None and self.thread_runs:
+            thread_ts = self.run_thread(run_id)
         preview = self._safe_preview(body, preview_chars)
         payload = {"run_id": run_id, "item_id": item_id}
         blocks = [
@@ -56,13 +94,66 @@ class SlackNotifier:
                 ],
             },
         ]
-        response = self.client.chat_postMessage(
-            channel=self.channel,
-            text=f"{title} (approval needed)",
-            blocks=blocks,
-        )
+        with span("slack.post_draft", item_id=item_id):
+            response = self.client.chat_postMessage(
+                channel=self.channel,
+                text=f"{title} (approval needed)",
+                blocks=blocks,
+                thread_ts=thread_ts,
+            )
         return response["ts"]
 
+    def open_feedback_modal(
+        self,
+        *,
+        trigger_id: str,
+        run_id: str,
+        item_id: str,
+        channel: str | None,
+        ts: str | None,
+        title: str | None = None,
+    ) -> None:
+        """Ask the reviewer who clicked "Request changes" what should change.
+
+        The reason is optional and the modal notifies on close, so cancelling it still
+        records the rejection (without a reason) instead of leaving the run waiting.
+        """
+        metadata = {"run_id": run_id, "item_id": item_id, "channel": channel, "ts": ts}
+        blocks = []
+        if title:
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*{title}*"}})
+        blocks.append(
+            {
+                "type": "input",
+                "block_id": "reason",
+                "optional": True,
+                "label": {"type": "plain_text", "text": "What should change?"},
+                "element": {
+                    "type": "plain_text_input",
+                    "action_id": "reason",
+                    "multiline": True,
+                    "placeholder": {
+                        "type": "plain_text",
+                        "text": "The draft is regenerated with this feedback and posted again.",
+                    },
+                },
+            }
+        )
+        with span("slack.open_feedback_modal", item_id=item_id):
+            self.client.views_open(
+                trigger_id=trigger_id,
+                view={
+                    "type": "modal",
+                    "callback_id": FEEDBACK_CALLBACK_ID,
+                    "private_metadata": json.dumps(metadata),
+                    "title": {"type": "plain_text", "text": "Request changes"},
+                    "submit": {"type": "plain_text", "text": "Send feedback"},
+                    "close": {"type": "plain_text", "text": "Reject without feedback"},
+                    "notify_on_close": True,
+                    "blocks": blocks,
+                },
+            )
+
     def update_message(
         self,
         *,
@@ -70,27 +161,33 @@ class SlackNotifier:
         ts: str,
         status: str,
         approver: Optional[str] = None,
+        reason: Optional[str] = None,
     ) -> None:
         status_text = "Approved" if status == "approved" else "Changes requested"
         status_emoji = "✅" if status == "approved" else "✋"
         subtitle = f"{status_text} by {approver}" if approver else status_text
+        if reason:
+            subtitle += "\n>" + reason.strip().replace("\n", "\n>")
+        from slack_sdk.errors import SlackApiError
+
         try:
-            self.client.chat_update(
-                channel=channel,
-                ts=ts,
-                text=f"{status_text}",
-                blocks=[
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": f"{status_emoji} *{status_text}*\n{subtitle}",
-                        },
-                    }
-                ],
-            )
+            with span("slack.update_message", status=status):
+                self.client.chat_update(
+                    channel=channel,
+                    ts=ts,
+                    text=f"{status_text}",
+                    blocks=[
+                        {
+                            "type": "section",
+                            "text": {
+                                "type": "mrkdwn",
+                                "text": f"{status_emoji} *{status_text}*\n{subtitle}",
+                            },
+                        }
+                    ],
+                )
         except SlackApiError as exc:  # pragma: no cover
             print(f"Warning: failed to update Slack message: {exc}")
 
 
-__all__ = ["SlackNotifier"]
+__all__ = ["FEEDBACK_CALLBACK_ID", "SlackNotifier"]
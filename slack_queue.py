@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+"""Background queue for Slack notifications so posting never blocks generation.
+
+Webhook previews are batched into one message per ``batch_window`` and sent over a
+pooled ``requests.Session``. Bot API calls (drafts awaiting approval) go through the
+same worker, which spaces calls per channel and backs off on 429 using ``Retry-After``.
+"""
+
+import contextvars
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from rate_limit import is_retryable, retry_after_seconds, status_code_of
+from tracing import span
+
+# Slack truncates message text around 40k characters; stay well below it per batch.
+MAX_MESSAGE_CHARS = 35_000
+
+
+@dataclass
+class _Preview:
+    title: str
+    body: str
+    preview_chars: int
+    context: contextvars.Context
+
+
+@dataclass
+class _Call:
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: Dict[str, Any]
+    future: Future
+    pace_key: str
+    context: contextvars.Context
+
+
+_STOP = object()
+
+
+def format_preview(title: str, body: str, preview_chars: int) -> str:
+    preview = body[:preview_chars].strip()
+    if len(body) > preview_chars:
+        preview += "…"
+    safe_preview = preview.replace("```", "`​``")
+    return f"*{title}*\n```{safe_preview}```"
+
+
+class SlackQueue:
+    """Single worker thread that owns all Slack traffic for a run (or a server).
+
+    ``min_interval`` spaces bot API calls to the same channel (Slack allows roughly one
+    message per second per channel). Failed webhook batches are retried up to
+    ``max_retries`` times and then dropped with a warning; they are previews only.
+    """
+
+    def __init__(
+        self,
+        webhook_url: str | None = None,
+        *,
+        batch_window: float = 1.0,
+        max_batch: int = 10,
+        min_interval: float = 1.0,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        timeout: float = 10.0,
+    ):
+        self.webhook_url = webhook_url
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.stats: Dict[str, int] = {"previews": 0, "batches": 0, "calls": 0, "retries": 0, "dropped": 0}
+        self._queue: "queue.Queue[object]" = queue.Queue()
+        self._last_call: Dict[str, float] = {}
+        self._session = None
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="slack-queue", daemon=True)
+        self._worker.start()
+
+    # --- Producer API ---------------------------------------------------------
+
+    def enqueue_preview(self, title: str, body: str, *, preview_chars: int) -> None:
+        """Queue a webhook preview; returns immediately."""
+        if not self.webhook_url or self._closed:
+            return
+        # Keep the caller's context so spans land under the right run.
+        self._queue.put(_Preview(title, body, preview_chars, contextvars.copy_context()))
+
+    def submit(self, fn: Callable[..., Any], *args: Any, pace_key: str = "", **kwargs: Any) -> Future:
+        """Run a Slack API call on the worker; the future holds its result.
+
+        Calls sharing a ``pace_key`` (usually the channel id) are spaced ``min_interval`` apart.
+        """
+        future: Future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError("SlackQueue is closed"))
+            return future
+        self._queue.put(_Call(fn, args, kwargs, future, pace_key, contextvars.copy_context()))
+        return future
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything queued so far has been sent (or dropped)."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 30.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self) -> "SlackQueue":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # --- Worker ---------------------------------------------------------------
+
+    def _run(self) -> None:
+        pending: Optional[object] = None
+        while True:
+            item = pending if pending is not None else self._queue.get()
+            pending = None
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+            elif isinstance(item, _Call):
+                item.context.run(self._execute, item)
+            elif isinstance(item, _Preview):
+                batch = [item]
+                deadline = time.monotonic() + self.batch_window
+                while len(batch) < self.max_batch:
+                    try:
+                        nxt = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if not isinstance(nxt, _Preview):
+                        pending = nxt
+                        break
+                    batch.append(nxt)
+                batch[0].context.run(self._send_previews, batch)
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        hinted = retry_after_seconds(exc)
+        if hinted is not None:
+            return hinted
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def _pace(self, key: str) -> None:
+        wait = self._last_call.get(key, 0.0) + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_call[key] = time.monotonic()
+
+    def _execute(self, call: _Call) -> None:
+        if not call.future.set_running_or_notify_cancel():
+            return
+        self._pace(call.pace_key)
+        try:
+            # slack_sdk's RateLimitErrorRetryHandler (see SlackNotifier) already retries 429s.
+            result = call.fn(*call.args, **call.kwargs)
+        except Exception as exc:
+            call.future.set_exception(exc)
+        else:
+            self.stats["calls"] += 1
+            call.future.set_result(result)
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
+    def _chunks(self, batch: List[_Preview]) -> List[str]:
+        messages: List[str] = []
+        current = ""
+        for item in batch:
+            text = format_preview(item.title, item.body, item.preview_chars)[:MAX_MESSAGE_CHARS]
+            if current and len(current) + len(text) + 2 > MAX_MESSAGE_CHARS:
+                messages.append(current)
+                current = ""
+            current = f"{current}\n\n{text}" if current else text
+        if current:
+            messages.append(current)
+        return messages
+
+    def _send_previews(self, batch: List[_Preview]) -> None:
+        self.stats["previews"] += len(batch)
+        for message in self._chunks(batch):
+            self._post_webhook(message, count=len(batch))
+
+    def _post_webhook(self, text: str, *, count: int) -> None:
+        import requests
+
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            self._pace("webhook")
+            try:
+                with span("slack.webhook", previews=count):
+                    response = session.post(self.webhook_url, json={"text": text}, timeout=self.timeout)
+                    response.raise_for_status()
+                self.stats["batches"] += 1
+                return
+            except requests.RequestException as exc:
+                retryable = status_code_of(exc) is None or is_retryable(exc)
+                if not retryable or attempt == self.max_retries:
+                    self.stats["dropped"] += count
+                    print(f"Warning: failed to notify Slack ({exc}). Continuing without Slack alert.")
+                    return
+                self.stats["retries"] += 1
+                time.sleep(self._backoff(attempt, exc))
+
+
+__all__ = ["SlackQueue", "format_preview"]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+"""Local checks of generated drafts against the hard limits in ``CONTENT_SPECS``.
+
+Each ``ContentSpec.limits`` (word counts, hashtags, subject/preview/title lengths, meta
+description length) is checked with plain regexes in well under a millisecond, so
+out-of-spec drafts can be regenerated before a reviewer ever sees them. ``SPEC_STATS``
+keeps per-channel pass rates for the run; ``metrics`` exports the same counts.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from generate import CONTENT_SPECS, ContentSpec
+from metrics import SPEC_CHECKS
+
+_URL_RE = re.compile(r"https?://\S+")
+_HASHTAG_RE = re.compile(r"(?<![\w#])#[A-Za-z][\w]*")
+_LINK_TARGET_RE = re.compile(r"\]\([^)]*\)")
+_WORD_RE = re.compile(r"[^\W_][\w'’-]*")
+_LABEL_RE = re.compile(r"^\s*(?:#{1,6}\s+)?(?:[-*]\s+)?\**\s*([A-Za-z][A-Za-z -]{1,30}?)\s*(?:\([^)]*\))?\s*\**\s*:\s*\**(.*)$")
+_H1_RE = re.compile(r"^\s*#\s+(.+?)\s*#*\s*$")
+
+
+@dataclass(frozen=True)
+class Violation:
+    check: str
+    message: str
+
+
+@dataclass
+class SpecReport:
+    content_type: str
+    violations: List[Violation] = field(default_factory=list)
+    words: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def summary(self) -> str:
+        return "; ".join(violation.message for violation in self.violations) or "meets spec"
+
+
+def count_words(text: str) -> int:
+    """Words as a reader counts them: URLs, hashtags and link targets are not words."""
+    text = _LINK_TARGET_RE.sub("]", text)
+    text = _URL_RE.sub(" ", text)
+    text = _HASHTAG_RE.sub(" ", text)
+    return len(_WORD_RE.findall(text))
+
+
+def _labelled(text: str, *prefixes: str) -> Tuple[Optional[str], str]:
+    """Value of the first ``Label: value`` line whose label starts with ``prefixes``; also the text without it."""
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        match = _LABEL_RE.match(line)
+        if match and match.group(1).strip().lower().startswith(prefixes):
+            value = match.group(2).strip().strip("\"'“”*_` ")
+            if not value and index + 1 < len(lines):
+                value = lines[index + 1].strip().strip("\"'“”*_` ")
+                del lines[index + 1]
+            del lines[index]
+            return value, "\n".join(lines)
+    return None, text
+
+
+def _check_range(
+    report: SpecReport, check: str, what: str, value: int, bounds: Tuple[int, int], *, unit: str = ""
+) -> None:
+    low, high = bounds
+    if not low <= value <= high:
+        amount = f"{value} {unit}" if unit else str(value)
+        report.violations.append(Violation(check, f"{what} is {amount} (spec {low}-{high})"))
+
+
+def _check_max(report: SpecReport, check: str, what: str, value: Optional[str], limit: int) -> None:
+    if value is None:
+        report.violations.append(Violation(check, f"no {what} found (spec ≤{limit} chars)"))
+    elif len(value) > limit:
+        report.violations.append(Violation(check, f"{what} is {len(value)} chars (spec ≤{limit})"))
+
+
+def check_draft(content_type: str, text: str, spec: ContentSpec | None = None) -> SpecReport:
+    """Check ``text`` against the limits of ``content_type``'s spec."""
+    spec = spec or CONTENT_SPECS[content_type.lower()]
+    limits = spec.limits
+    report = SpecReport(content_type)
+    body = text
+
+    if limits.subject_chars is not None or limits.preview_chars is not None:
+        # email_helpers pulls in smtplib and the SMTP pool; only email specs need it.
+        from email_helpers import extract_email_parts
+
+        parts = extract_email_parts(text)
+        if parts is None:
+            subject, body = _labelled(body, "subject")
+            preview, body = _labelled(body, "preview", "preheader")
+        else:
+            subject, preview, body = parts.subject or None, parts.preview or None, parts.body
+        if limits.subject_chars is not None:
+            _check_max(report, "subject", "subject line", subject, limits.subject_chars)
+        if limits.preview_chars is not None:
+            _check_max(report, "preview", "preview text", preview, limits.preview_chars)
+
+    if limits.meta_description_chars is not None:
+        meta, body = _labelled(body, "meta description", "meta")
+        if meta is None:
+            low, high = limits.meta_description_chars
+            report.violations.append(Violation("meta_description", f"no meta description found (spec {low}-{high} chars)"))
+        else:
+            _check_range(
+                report, "meta_description", "meta description", len(meta), limits.meta_description_chars, unit="chars"
+            )
+
+    if limits.title_chars is not None:
+        title, body = _labelled(body, "title")
+        if title is None:
+            heading = next((match.group(1) for match in map(_H1_RE.match, body.splitlines()) if match), None)
+            title = heading.replace("*", "").strip() if heading else None
+        _check_max(report, "title", "title", title, limits.title_chars)
+
+    if limits.hashtags is not None:
+        _check_range(report, "hashtags", "hashtag count", len(_HASHTAG_RE.findall(body)), limits.hashtags)
+    if limits.max_links is not None:
+        links = len(_URL_RE.findall(body))
+        if links > limits.max_links:
+            report.violations.append(Violation("links", f"{links} links (spec ≤{limits.max_links})"))
+
+    report.words = count_words(body)
+    if limits.words is not None:
+        _check_range(report, "words", "word count", report.words, limits.words)
+    return report
+
+
+def violation_feedback(report: SpecReport) -> str:
+    """Reviewer-style feedback for regenerating a draft that failed ``report``."""
+    lines = [f"- {violation.message}" for violation in report.violations]
+    return "The draft breaks these hard limits from the spec; fix every one:\n" + "\n".join(lines)
+
+
+class SpecStats:
+    """Per-channel counts of drafts checked, drafts passing, and regenerations."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, report: SpecReport, *, retry: bool = False) -> None:
+        SPEC_CHECKS.inc(content_type=report.content_type, result="pass" if report.ok else "fail")
+        with self._lock:
+            counts = self._counts.setdefault(report.content_type, {"checked": 0, "passed": 0, "retries": 0})
+            counts["checked"] += 1
+            counts["passed"] += int(report.ok)
+            counts["retries"] += int(retry)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                content_type: {**counts, "pass_rate": counts["passed"] / counts["checked"]}
+                for content_type, counts in self._counts.items()
+                if counts["checked"]
+            }
+
+    def format(self) -> str:
+        rows = self.snapshot()
+        if not rows:
+            return "Spec checks: none run."
+        parts = [
+            f"{content_type} {row['pass_rate']:.0%} ({row['passed']}/{row['checked']} drafts"
+            + (f", {row['retries']} regenerated)" if row["retries"] else ")")
+            for content_type, row in sorted(rows.items())
+        ]
+        return "Spec pass rate: " + ", ".join(parts) + "."
+
+
+SPEC_STATS = SpecStats()
+
+
+__all__ = [
+    "SPEC_STATS",
+    "SpecReport",
+    "SpecStats",
+    "Violation",
+    "check_draft",
+    "count_words",
+    "violation_feedback",
+]
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 """Utilities for collating task documents and building a summary prompt."""
 
+from pathlib import Path
 from typing import Dict, List, Sequence
 from textwrap import dedent
 
-from ingest import ingest_documents
+from brief import BRIEF_SECTIONS
+from ingest import BASE_DIR, ingest_documents
+from profiling import stage as profile_stage
+from tracing import span
 
 SYSTEM_PROMPT = dedent(
     """
@@ -31,10 +35,16 @@ USER_TASK = dedent(
     """
 ).strip()
 
+STRUCTURED_TASK = (
+    "Return the brief as JSON with one field per section ("
+    + ", ".join(f"{key}: {title}" for key, (title, _) in BRIEF_SECTIONS.items())
+    + "). Each field holds that section's content as Markdown, without the section heading."
+)
 
-def collate_sources() -> List[Dict[str, str]]:
+
+def collate_sources(*, base_dir: Path | None = None) -> List[Dict[str, str]]:
     """Return docs with source identifiers for downstream notebook use."""
-    docs, _ = ingest_documents()
+    docs, _ = ingest_documents(base_dir=base_dir or BASE_DIR)
     return [
         {
             "source_id": f"Source {idx}",
@@ -45,24 +55,36 @@ def collate_sources() -> List[Dict[str, str]]:
     ]
 
 
-def format_sources(sources: Sequence[Dict[str, str]] | None = None) -> str:
+def format_sources(sources: Sequence[Dict[str, str]] | None = None, *, base_dir: Path | None = None) -> str:
     """Human-readable blob of labeled sources."""
     if sources is None:
-        sources = collate_sources()
-    chunks = []
-    for item in sources:
-        chunks.append(f"{item['source_id']}: {item['name']}\n{item['text']}\n")
-    return "\n".join(chunks).strip()
-
-
-def build_prompt(sources: Sequence[Dict[str, str]] | None = None) -> Dict[str, str]:
-    """Return the system/user strings for an OpenAI Chat Completions call."""
-    if sources is None:
-        sources = collate_sources()
-    return {
-        "system": SYSTEM_PROMPT,
-        "user": f"{USER_TASK}\n\nSources:\n{format_sources(sources)}",
-    }
+        sources = collate_sources(base_dir=base_dir)
+    with span("summarise.format_sources", sources=len(sources)), profile_stage("format_sources"):
+        chunks = []
+        for item in sources:
+            chunks.append(f"{item['source_id']}: {item['name']}\n{item['text']}\n")
+        return "\n".join(chunks).strip()
+
+
+def build_prompt(
+    sources: Sequence[Dict[str, str]] | None = None,
+    *,
+    base_dir: Path | None = None,
+    structured: bool = False,
+) -> Dict[str, str]:
+    """Return the system/user strings for an OpenAI Chat Completions call.
+
+    ``base_dir`` ingests another launch's source folder instead of ``ingest.BASE_DIR``;
+    ``structured`` asks for the sections as JSON fields (``brief.BRIEF_SECTIONS``).
+    """
+    with span("summarise.build_prompt"):
+        if sources is None:
+            sources = collate_sources(base_dir=base_dir)
+        task = f"{USER_TASK}\n\n{STRUCTURED_TASK}" if structured else USER_TASK
+        return {
+            "system": SYSTEM_PROMPT,
+            "user": f"{task}\n\nSources:\n{format_sources(sources)}",
+        }
 
 
 def main() -> None:
@@ -77,6 +99,7 @@ if __name__ == "__main__":
 
 
 __all__ = [
+    "STRUCTURED_TASK",
     "SYSTEM_PROMPT",
     "USER_TASK",
     "collate_sources",
@@ -0,0 +1,46 @@
+"""Shared fixtures; the toolkit's modules live at the repository root."""
+
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fakes import FakeSMTPServer  # noqa: E402
+
+
+@pytest.fixture
+def smtp_server():
+    with FakeSMTPServer() as server:
+        yield server
+
+
+@pytest.fixture
+def closed_port() -> int:
+    """A local port with nothing listening, so connecting is refused."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def api_module(tmp_path_factory):
+    """``api`` imported with its approvals DB, ledger and traces under a temp dir."""
+    state = tmp_path_factory.mktemp("api")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("APPROVALS_DB", str(state / "approvals.db"))
+        patch.setenv("LEDGER_DB", str(state / "ledger.db"))
+        patch.setenv("TRACE_FILE", str(state / "traces.jsonl"))
+        import api
+
+        yield api
+        api.slack_queue.close()
+
+
+@pytest.fixture
+def api_client(api_module):
+    from fastapi.testclient import TestClient
+
+    return TestClient(api_module.app)
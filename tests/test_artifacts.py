@@ -0,0 +1,48 @@
+import pytest
+
+from artifacts import ArtifactNotFound, ArtifactStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(tmp_path / "artifacts")
+
+
+def test_same_content_shares_one_blob_across_runs(store):
+    first = store.put("blog", "# Blog\n", run_id="run-1", inputs={"model": "gpt-4o-mini"})
+    second = store.put("blog", "# Blog", run_id="run-2")
+
+    assert first["id"] != second["id"] and first["sha256"] == second["sha256"]
+    assert len([path for path in store.objects.rglob("*") if path.is_file()]) == 1
+    assert store.read_text(first["id"]) == "# Blog"
+    assert store.get(first["id"])["inputs"] == {"model": "gpt-4o-mini"}
+
+
+def test_re_recording_in_one_run_updates_the_status(store):
+    pending = store.put("blog", "# Blog", run_id="run-1")
+    approved = store.put("blog", "# Blog", run_id="run-1", status="approved")
+    assert approved["id"] == pending["id"] and approved["status"] == "approved"
+    assert len(store.list_versions()) == 1
+    with pytest.raises(ValueError):
+        store.put("blog", "# Blog", run_id="run-1", status="shipped")
+
+
+def test_latest_returns_the_newest_approved_version(store):
+    old = store.put("launch_brief", "v1", run_id="run-1", status="approved")
+    store.put("launch_brief", "v2", run_id="run-2", status="rejected")
+    assert store.resolve("latest", content_type="launch_brief")["id"] == old["id"]
+
+    newest = store.put("launch_brief", "v3", run_id="run-3")
+    assert store.set_status(newest["id"], "approved")
+    assert store.read_text(store.resolve("latest", content_type="launch_brief")) == "v3"
+    with pytest.raises(ArtifactNotFound):
+        store.resolve("latest", content_type="blog")
+
+
+def test_hash_prefix_lookup(store):
+    record = store.put("blog", "# Blog", run_id="run-1")
+    assert store.get(record["sha256"][:8])["id"] == record["id"]
+    with pytest.raises(ArtifactNotFound):
+        store.get(record["sha256"][:4])
+    with pytest.raises(ArtifactNotFound):
+        store.get("ffffffffff" if not record["sha256"].startswith("ffff") else "0000000000")
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+import ledger
+import pipeline
+import tracing
+from batch_jobs import BatchRequest, parse_results, response_text, run_batch, write_requests
+from bench import write_docx
+from fakes import FakeOpenAI
+
+
+def request(content_type, model="gpt-4o-mini"):
+    body = {"model": model, "input": [{"role": "user", "content": f"Write the {content_type}"}], "max_output_tokens": 50}
+    return BatchRequest(run_id="run-1", stage="asset", content_type=content_type, body=body)
+
+
+def result_line(custom_id, *, status=200, text="", error=None):
+    body = {"error": {"message": error}} if error else {"output_text": text, "usage": {"input_tokens": 10, "output_tokens": 5}}
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": status, "body": body}, "error": None})
+
+
+def test_results_are_mapped_back_by_custom_id_in_any_order(capsys):
+    requests = {item.custom_id: item for item in (request("blog"), request("linkedin"))}
+    raw = "\n".join(
+        [
+            result_line("run-1:asset:linkedin", text=" LinkedIn post "),
+            result_line("run-0:asset:blog", text="stale"),
+            result_line("run-1:asset:blog", status=429, error="Rate limit"),
+        ]
+    )
+    results = parse_results(raw, requests)
+
+    assert results["run-1:asset:linkedin"].text == "LinkedIn post"
+    assert results["run-1:asset:linkedin"].usage["output_tokens"] == 5
+    assert results["run-1:asset:blog"].error == "HTTP 429: Rate limit"
+    assert set(results) == set(requests)
+    assert "unknown custom_id 'run-0:asset:blog'" in capsys.readouterr().out
+
+
+def test_response_text_joins_message_output_parts():
+    body = {
+        "output": [
+            {"type": "reasoning", "content": []},
+            {"type": "message", "content": [{"type": "output_text", "text": "Hello "}, {"type": "output_text", "text": "world"}]},
+        ]
+    }
+    assert response_text(body) == "Hello world"
+
+
+def test_duplicate_custom_ids_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Duplicate"):
+        write_requests(tmp_path / "batch.jsonl", [request("blog"), request("blog")])
+
+
+def test_batch_round_trip_records_discounted_cost(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger, "_ledger", None)
+    calls = ledger.configure_ledger(tmp_path / "ledger.db")
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    requests = [request("blog"), request("linkedin")]
+
+    results = run_batch(client, requests, path=tmp_path / "batch.jsonl", poll_interval=0.05, timeout=10)
+
+    assert set(results) == {"run-1:asset:blog", "run-1:asset:linkedin"}
+    assert all(result.ok and result.text.startswith("# Generated draft") for result in results.values())
+    assert (tmp_path / "batch-output.jsonl").exists()
+    (row,) = calls.report(group_by=["stage"])
+    assert row["stage"] == "asset_batch" and row["calls"] == 2
+    full_price = ledger.estimate_cost("gpt-4o-mini", input_tokens=row["input_tokens"], output_tokens=row["output_tokens"])
+    assert row["cost_usd"] == pytest.approx(full_price * ledger.BATCH_DISCOUNT)
+
+
+def test_failed_batch_requests_come_back_as_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger, "_ledger", None)
+    client = FakeOpenAI(latency=0.0, jitter=0.0, error_rate=1.0)
+
+    results = run_batch(client, [request("blog")], path=tmp_path / "batch.jsonl", poll_interval=0.05, timeout=10)
+
+    assert results["run-1:asset:blog"].error.startswith("HTTP 429")
+
+
+def test_batch_api_launches_get_their_own_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger, "_ledger", None)
+    monkeypatch.setattr(tracing, "_exporter", None)
+    monkeypatch.setenv("LEDGER_DB", str(tmp_path / "ledger.db"))
+    monkeypatch.setenv("TRACE_FILE", "off")
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    monkeypatch.setattr(pipeline, "_client_factory", lambda api_key: client)
+    for name in ("exports", "pricing"):
+        (tmp_path / "docs" / name).mkdir(parents=True)
+        write_docx(tmp_path / "docs" / name / "notes.docx", [[f"The {name} launch ships next week."]])
+    out = tmp_path / "out"
+
+    pipeline.main(
+        [
+            "batch",
+            str(tmp_path / "docs" / "exports"),
+            str(tmp_path / "docs" / "pricing"),
+            "--batch-api",
+            "--batch-poll-interval", "0.05",
+            "--types", "linkedin",
+            "--auto-approve",
+            "--spec-retries", "0",
+            "--assets-dir", str(out),
+            "--approvals-db", str(tmp_path / "approvals.db"),
+        ]
+    )
+
+    (output_file,) = (out / "batches").glob("*-assets-output.jsonl")
+    texts = {
+        record["custom_id"]: response_text(record["response"]["body"]).strip()
+        for record in map(json.loads, output_file.read_text().splitlines())
+    }
+    launches = json.loads((out / "batch_summary.json").read_text())["launches"]
+    assert [launch["status"] for launch in launches] == ["complete", "complete"]
+    saved = {launch["name"]: (out / launch["name"] / "linkedin.md").read_text() for launch in launches}
+    assert saved["exports"] != saved["pricing"]
+    for launch in launches:
+        assert texts[f"{launch['run_id']}:asset:linkedin"] in saved[launch["name"]]
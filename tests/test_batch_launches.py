@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+import ledger
+import pipeline
+import tracing
+from bench import write_docx
+from fakes import FakeOpenAI
+from pipeline import format_batch_summary, read_launches
+
+
+def test_launch_names_come_from_folders_or_the_file_and_are_made_unique(tmp_path):
+    for folder in ("exports", "other/exports", "pricing"):
+        (tmp_path / folder).mkdir(parents=True)
+    launches_file = tmp_path / "launches.txt"
+    launches_file.write_text("# one launch per line\nother/exports\nspring-pricing = pricing  # renamed\n\n")
+
+    launches = read_launches([tmp_path / "exports"], launches_file)
+    assert launches == [
+        ("exports", tmp_path / "exports"),
+        ("exports-2", tmp_path / "other" / "exports"),
+        ("spring-pricing", tmp_path / "pricing"),
+    ]
+
+
+def test_missing_launch_folders_are_reported_together(tmp_path):
+    with pytest.raises(SystemExit, match="missing-a, .*missing-b"):
+        read_launches([tmp_path / "missing-a", tmp_path / "missing-b"], None)
+
+
+def test_batch_summary_table_counts_complete_launches():
+    table = format_batch_summary(
+        [
+            {"name": "exports", "status": "complete", "saved": ["blog"], "calls": 4, "seconds": 1.0},
+            {"name": "pricing", "status": "failed", "seconds": 0.5},
+        ],
+        seconds=1.2,
+    )
+    assert table.splitlines()[-1] == "1 of 2 launch(es) complete in 1.2s."
+    assert "exports  complete" in table
+
+
+def test_batch_mode_runs_each_launch_into_its_own_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger, "_ledger", None)
+    monkeypatch.setattr(tracing, "_exporter", None)
+    monkeypatch.setenv("LEDGER_DB", str(tmp_path / "ledger.db"))
+    monkeypatch.setenv("TRACE_FILE", "off")
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    monkeypatch.setattr(pipeline, "_client_factory", lambda api_key: client)
+    for name in ("exports", "pricing"):
+        (tmp_path / "docs" / name).mkdir(parents=True)
+        write_docx(tmp_path / "docs" / name / "notes.docx", [[f"The {name} launch ships next week."]])
+
+    pipeline.main(
+        [
+            "batch",
+            str(tmp_path / "docs" / "exports"),
+            str(tmp_path / "docs" / "pricing"),
+            "--types", "linkedin",
+            "--auto-approve",
+            "--spec-retries", "0",
+            "--assets-dir", str(tmp_path / "out"),
+            "--approvals-db", str(tmp_path / "approvals.db"),
+        ]
+    )
+
+    summary = json.loads((tmp_path / "out" / "batch_summary.json").read_text())
+    assert [launch["name"] for launch in summary["launches"]] == ["exports", "pricing"]
+    assert all(launch["calls"] > 0 for launch in summary["launches"])
+    for name in ("exports", "pricing"):
+        assert (tmp_path / "out" / name / "linkedin.md").exists()
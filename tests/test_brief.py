@@ -0,0 +1,48 @@
+import json
+
+from brief import BRIEF_SECTIONS, brief_from_json, brief_model, brief_schema, parse_brief, project_brief, render_brief
+from generate import build_payload
+
+SECTIONS = {key: f"{title} text.\n\n# Stray heading\n- point" for key, (title, _) in BRIEF_SECTIONS.items()}
+
+
+def test_render_then_parse_round_trips_and_demotes_nested_headings():
+    markdown = render_brief(SECTIONS)
+    assert markdown.startswith("# Launch brief\n\n## Executive summary")
+    parsed = parse_brief(markdown)
+    assert list(parsed) == list(BRIEF_SECTIONS)
+    assert parsed["risks"] == "Launch risks / open questions text.\n\n### Stray heading\n- point"
+
+
+def test_free_form_briefs_do_not_parse_and_pass_through():
+    free_form = "# Launch brief\n\nExports ship next week.\n\n## Executive summary\n\nShort."
+    assert parse_brief(free_form) is None
+    assert project_brief(free_form, ["messaging"]) == free_form
+    assert parse_brief(render_brief(SECTIONS, ["messaging"])) is None
+
+
+def test_projection_keeps_only_the_requested_sections():
+    projected = project_brief(render_brief(SECTIONS), ["messaging", "executive_summary"])
+    assert "## Executive summary" in projected and "## Messaging pillars & proof points" in projected
+    assert "Recommended next steps" not in projected
+    assert projected.index("Executive summary") < projected.index("Messaging pillars")
+
+
+def test_asset_prompts_carry_only_their_spec_sections():
+    brief = render_brief(SECTIONS)
+    linkedin = build_payload("linkedin", brief)["user"]
+    assert "Launch risks / open questions text." not in linkedin
+    assert "Messaging pillars & proof points text." in linkedin
+    assert "Launch risks / open questions text." in build_payload("linkedin", brief, project=False)["user"]
+
+
+def test_structured_output_json_renders_as_markdown():
+    assert parse_brief(brief_from_json(json.dumps(SECTIONS))) is not None
+    assert brief_from_json("not json") is None
+    assert brief_from_json(json.dumps({"executive_summary": "only one"})) is None
+
+
+def test_schema_and_model_list_every_section():
+    schema = brief_schema()
+    assert schema["required"] == list(BRIEF_SECTIONS) and schema["additionalProperties"] is False
+    assert list(brief_model().model_fields) == list(BRIEF_SECTIONS)
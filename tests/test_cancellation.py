@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from cancellation import CANCELLATION_STATS, CancelToken, JobRegistry, RunCancelled
+from fakes import FakeOpenAI
+from pipeline import run_assets
+
+BRIEF = "# Launch brief\n\nExports ship next week."
+
+
+def test_cancel_runs_callbacks_once_and_records_reason():
+    token = CancelToken("job-1")
+    calls = []
+    token.on_cancel(lambda: calls.append("closed"))
+
+    assert token.cancel("client disconnected")
+    assert not token.cancel("again")
+    assert calls == ["closed"]
+    assert token.reason == "client disconnected"
+    with pytest.raises(RunCancelled, match="job-1 cancelled \\(client disconnected\\)"):
+        token.raise_if_cancelled()
+
+
+def test_callback_registered_after_cancel_runs_immediately():
+    token = CancelToken()
+    token.cancel()
+    calls = []
+    token.on_cancel(lambda: calls.append("closed"))
+    assert calls == ["closed"]
+
+
+def test_child_follows_parent_but_can_be_cancelled_alone():
+    parent = CancelToken()
+    loser, other = parent.child(), parent.child()
+
+    loser.cancel("hedge lost")
+    assert loser.cancelled and not parent.cancelled and not other.cancelled
+
+    parent.cancel("request cancelled")
+    assert other.cancelled and other.reason == "request cancelled"
+
+
+def test_wait_returns_early_on_cancel():
+    token = CancelToken()
+    threading.Timer(0.05, token.cancel).start()
+    assert token.wait(5.0) is True
+    assert CancelToken().wait(0.01) is False
+
+
+def test_registry_cancels_by_id_and_rejects_duplicates():
+    jobs = JobRegistry()
+    token = jobs.register("job-1")
+    with pytest.raises(ValueError):
+        jobs.register("job-1")
+
+    assert [job["job_id"] for job in jobs.active()] == ["job-1"]
+    assert jobs.cancel("job-1")
+    assert token.cancelled
+    assert not jobs.cancel("missing")
+    jobs.release("job-1")
+    assert jobs.active() == []
+
+
+def _run(client, token):
+    return run_assets(
+        client,
+        content_types=["linkedin", "newsletter", "blog"],
+        launch_brief=BRIEF,
+        model="gpt-4o-mini",
+        temperature=0.4,
+        max_tokens=200,
+        cancel=token,
+    )
+
+
+def test_cancelled_run_makes_no_calls_and_counts_skipped_work():
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    token = CancelToken()
+    token.cancel("client disconnected")
+    before = CANCELLATION_STATS.snapshot()
+
+    with pytest.raises(RunCancelled):
+        _run(client, token)
+
+    after = CANCELLATION_STATS.snapshot()
+    assert client.calls == 0
+    assert after["skipped_calls"] - before["skipped_calls"] == 3
+    assert after["tokens_saved"] > before["tokens_saved"]
+
+
+def test_cancel_mid_run_skips_the_remaining_assets():
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    token = CancelToken()
+    create = client.responses.create
+
+    def create_then_disconnect(**request):
+        response = create(**request)
+        token.cancel("client disconnected")
+        return response
+
+    client.responses.create = create_then_disconnect
+    before = CANCELLATION_STATS.snapshot()
+
+    with pytest.raises(RunCancelled):
+        _run(client, token)
+
+    assert client.calls == 1
+    assert CANCELLATION_STATS.snapshot()["skipped_calls"] - before["skipped_calls"] == 2
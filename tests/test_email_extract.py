@@ -0,0 +1,62 @@
+import pytest
+
+from email_helpers import EMAIL_PREP_STATS, extract_email_parts, prepare_email
+from fakes import FakeOpenAI
+
+BODY = (
+    "Hi there,\n\n"
+    "Exports now run in the background, so big workspaces finish in minutes instead of hours.\n\n"
+    "- Schedule exports\n- Get a Slack ping when they finish"
+)
+
+
+def test_inline_labels():
+    draft = f"**Subject line:** \"Exports, minus the wait\"\n**Preview text:** Background exports are here\n\n{BODY}"
+    parts = extract_email_parts(draft)
+    assert parts.subject == "Exports, minus the wait"
+    assert parts.preview == "Background exports are here"
+    assert parts.body == BODY
+    assert parts.source == "local"
+
+
+def test_subject_options_list_and_explicit_body_heading_with_trailing_notes():
+    draft = (
+        "## Subject line options\n1. Exports, minus the wait\n2. Your exports just got faster\n\n"
+        "## Preview text\nBackground exports are here\n\n"
+        f"## Email body\n{BODY}\n\n"
+        "## Design notes\nUse the blue hero image."
+    )
+    parts = extract_email_parts(draft)
+    assert parts.subject == "Exports, minus the wait"
+    assert parts.preview == "Background exports are here"
+    assert parts.body.endswith("Get a Slack ping when they finish")
+    assert "hero image" not in parts.body
+
+
+@pytest.mark.parametrize(
+    "draft",
+    [
+        BODY,  # no subject line at all
+        "Subject: Exports, minus the wait\n\nShort body.",
+        "Subject: " + "x" * 200 + "\n\n" + BODY,
+    ],
+)
+def test_drafts_off_spec_fall_back(draft):
+    assert extract_email_parts(draft) is None
+
+
+def test_prepare_email_only_calls_the_model_when_parsing_fails():
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    before = EMAIL_PREP_STATS.snapshot()
+
+    local = prepare_email(client=client, model="gpt-4o-mini", system_prompt="", newsletter_markdown=f"Subject: Hi\n\n{BODY}")
+    assert local.source == "local" and client.calls == 0
+
+    fallback = prepare_email(client=client, model="gpt-4o-mini", system_prompt="", newsletter_markdown=BODY)
+    assert fallback.source == "llm" and client.calls == 1
+
+    after = EMAIL_PREP_STATS.snapshot()
+    assert (after["local"] - before["local"], after["llm"] - before["llm"]) == (1, 1)
+
+    with pytest.raises(ValueError):
+        prepare_email(client=client, model="gpt-4o-mini", system_prompt="", newsletter_markdown=BODY, use_llm=False)
@@ -0,0 +1,132 @@
+from email import message_from_string
+
+from email_helpers import SMTPConnectionPool, send_batch
+from fakes import FakeSMTPServer
+
+
+def _pool(server, **kwargs):
+    return SMTPConnectionPool(
+        smtp_host=server.host,
+        smtp_port=server.port,
+        username="user",
+        password="secret",
+        use_tls=False,
+        plain=True,
+        **kwargs,
+    )
+
+
+def _send(pool, server, recipient="reader@example.com"):
+    with pool.connection() as conn:
+        conn.server.sendmail("marketing@example.com", [recipient], "Subject: hi\r\n\r\nhello")
+
+
+def _batch(server, recipients, **kwargs):
+    return send_batch(
+        smtp_host=server.host,
+        smtp_port=server.port,
+        username="user",
+        password="secret",
+        use_tls=False,
+        plain=True,
+        subject="Launch news",
+        body="<p>Hello</p>",
+        sender="marketing@example.com",
+        recipients=recipients,
+        retry_delay=0.0,
+        **kwargs,
+    )
+
+
+def test_pool_reuses_one_connection(smtp_server):
+    pool = _pool(smtp_server, size=1)
+    try:
+        for _ in range(3):
+            _send(pool, smtp_server)
+    finally:
+        pool.close()
+
+    assert pool.opened == 1
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+    assert len(smtp_server.messages) == 3
+
+
+def test_pool_retires_connection_at_message_cap(smtp_server):
+    pool = _pool(smtp_server, size=1, max_messages_per_connection=2)
+    try:
+        for _ in range(5):
+            _send(pool, smtp_server)
+    finally:
+        pool.close()
+
+    assert pool.opened == 3
+    assert smtp_server.connections == 3
+    assert len(smtp_server.messages) == 5
+
+
+def test_batch_reconnects_after_server_drops_connection():
+    # The relay answers 421 and hangs up after every second message.
+    with FakeSMTPServer(max_messages_per_connection=2) as server:
+        report = _batch(server, [f"reader{index}@example.com" for index in range(5)], pool_size=1)
+
+    assert report.sent == 5
+    assert report.failed == {}
+    assert report.connections == 3
+    assert sorted(message["to"][0] for message in server.messages) == [f"reader{index}@example.com" for index in range(5)]
+
+
+def test_batch_retries_transient_failure_for_that_recipient_only():
+    with FakeSMTPServer(fail_first=1) as server:
+        report = _batch(server, ["a@example.com", "b@example.com", "c@example.com"], pool_size=1)
+
+    attempts = {result.recipient: result.attempts for result in report.results}
+    assert report.sent == 3
+    assert attempts == {"a@example.com": 2, "b@example.com": 1, "c@example.com": 1}
+    assert len(server.messages) == 3
+
+
+def test_batch_gives_up_after_max_attempts_and_marks_retryable():
+    with FakeSMTPServer(fail_first=2) as server:
+        report = _batch(server, ["a@example.com"], pool_size=1, max_attempts=2)
+
+    assert report.sent == 0
+    assert report.retryable == ["a@example.com"]
+    assert "451" in report.failed["a@example.com"]
+    assert report.results[0].attempts == 2
+
+
+def test_batch_rejection_is_permanent_and_not_retried():
+    with FakeSMTPServer(reject=["gone@example.com"]) as server:
+        report = _batch(server, ["gone@example.com", "reader@example.com"], pool_size=1)
+
+    results = {result.recipient: result for result in report.results}
+    assert report.sent == 1
+    assert report.retryable == []
+    assert results["gone@example.com"].attempts == 1
+    assert "550" in results["gone@example.com"].error
+    # The rejection left the pooled session usable for the next recipient.
+    assert report.connections == 1
+
+
+def test_batch_bounds_concurrency_and_dedupes_recipients():
+    recipients = [f"reader{index}@example.com" for index in range(8)] + ["reader0@example.com", " "]
+    with FakeSMTPServer(latency=0.02) as server:
+        report = _batch(server, recipients, pool_size=3)
+
+    assert report.sent == 8
+    assert 1 <= report.connections <= 3
+    assert server.connections == report.connections
+
+
+def test_batch_personalises_each_message(smtp_server):
+    report = _batch(
+        smtp_server,
+        ["a@example.com", "b@example.com"],
+        pool_size=2,
+        personalise=lambda recipient: (f"Hi {recipient}", f"<p>For {recipient}</p>", f"For {recipient}"),
+    )
+
+    assert report.sent == 2
+    subjects = {message["to"][0]: message_from_string(message["data"])["Subject"] for message in smtp_server.messages}
+    assert subjects == {"a@example.com": "Hi a@example.com", "b@example.com": "Hi b@example.com"}
@@ -0,0 +1,66 @@
+import os
+
+from docx import Document
+
+from export import bulk_export, find_markdown, markdown_to_docx
+
+DRAFT = "# Launch\n\nIntro line.\n\n- Fast\n1. First\n> Quote\n\n```\ncode here\n```"
+
+
+def paragraphs(path):
+    return [(para.style.name, para.text) for para in Document(str(path)).paragraphs if para.text]
+
+
+def test_markdown_lines_map_to_docx_styles(tmp_path):
+    path = markdown_to_docx(DRAFT, tmp_path / "draft.docx", title="Blog")
+    assert paragraphs(path) == [
+        ("Heading 1", "Blog"),
+        ("Heading 1", "Launch"),
+        ("Normal", "Intro line."),
+        ("List Bullet", "Fast"),
+        ("List Number", "First"),
+        ("Intense Quote", "Quote"),
+        ("Intense Quote", "code here"),
+    ]
+
+
+def test_template_styles_are_reused_without_its_body(tmp_path):
+    template = Document()
+    template.styles["Normal"].font.name = "Georgia"
+    template.add_paragraph("Template boilerplate")
+    template.save(str(tmp_path / "template.docx"))
+
+    doc = Document(str(markdown_to_docx("Hello", tmp_path / "out.docx", template=tmp_path / "template.docx")))
+    assert [para.text for para in doc.paragraphs if para.text] == ["Hello"]
+    assert doc.styles["Normal"].font.name == "Georgia"
+
+
+def _write_sources(root):
+    (root / "assets").mkdir(parents=True)
+    (root / "launch_brief.md").write_text("# Brief\n\nText", encoding="utf-8")
+    (root / "assets" / "blog.md").write_text("# Blog\n\n- point", encoding="utf-8")
+    (root / "assets" / "broken.md").write_bytes(b"\xff\xfe not utf-8")
+    return find_markdown([root])
+
+
+def test_bulk_export_mirrors_layout_skips_current_and_reports_failures(tmp_path):
+    sources = _write_sources(tmp_path / "src")
+    out = tmp_path / "docx"
+
+    first = bulk_export(sources, out_dir=out, root=tmp_path / "src", workers=2)
+    assert sorted(path.name for path in first.converted) == ["blog.md", "launch_brief.md"]
+    assert [path.name for path in first.failed] == ["broken.md"]
+    assert (out / "assets" / "blog.docx").exists() and (out / "launch_brief.docx").exists()
+
+    second = bulk_export(sources, out_dir=out, root=tmp_path / "src", workers=1)
+    assert sorted(path.name for path in second.skipped) == ["blog.md", "launch_brief.md"]
+    assert [path.name for path in second.converted] == []
+
+    blog = tmp_path / "src" / "assets" / "blog.md"
+    later = (out / "assets" / "blog.docx").stat().st_mtime + 10
+    os.utime(blog, (later, later))
+    third = bulk_export(sources, out_dir=out, root=tmp_path / "src", workers=1)
+    assert [path.name for path in third.converted] == ["blog.md"]
+
+    forced = bulk_export(sources, out_dir=out, root=tmp_path / "src", workers=1, force=True)
+    assert len(forced.converted) == 2 and not forced.skipped
@@ -0,0 +1,79 @@
+import pytest
+from pydantic import BaseModel
+
+import ledger
+import pipeline
+import tracing
+from bench import generate_corpus, use_fake_llm
+from fakes import FakeAPIError, FakeOpenAI
+from rate_limit import is_retryable, retry_after_seconds
+
+REQUEST = {"model": "gpt-4o-mini", "instructions": "Write a post.", "input": [{"role": "user", "content": "Brief"}]}
+
+
+class Email(BaseModel):
+    subject: str
+    body: str
+
+
+def test_fake_output_is_deterministic_and_respects_max_output_tokens():
+    first = FakeOpenAI(latency=0.0, jitter=0.0).responses.create(**REQUEST)
+    second = FakeOpenAI(latency=0.0, jitter=0.0).responses.create(**REQUEST)
+    assert first.output_text == second.output_text
+
+    short = FakeOpenAI(latency=0.0, jitter=0.0).responses.create(**REQUEST, max_output_tokens=50)
+    assert short.usage.output_tokens == 50
+    assert len(short.output_text) < len(first.output_text)
+
+
+def test_fake_parse_fills_structured_fields():
+    parsed = FakeOpenAI(latency=0.0, jitter=0.0).responses.parse(text_format=Email, **REQUEST).output_parsed
+    assert parsed.subject == "Generated draft"
+    assert parsed.body.startswith("# Generated draft")
+
+
+def test_fake_errors_look_retryable_to_the_rate_limiter():
+    client = FakeOpenAI(latency=0.0, jitter=0.0, error_rate=1.0, retry_after=0.5)
+    with pytest.raises(FakeAPIError) as info:
+        client.responses.create(**REQUEST)
+    assert is_retryable(info.value)
+    assert retry_after_seconds(info.value) == 0.5
+    assert (client.calls, client.errors) == (1, 1)
+
+
+def test_corpus_is_reused_when_its_spec_matches(tmp_path):
+    corpus = generate_corpus(tmp_path, documents=2, pages=1)
+    files = sorted(path.name for path in corpus.iterdir() if path.suffix in {".docx", ".pdf"})
+    assert files == ["product-spec-00.docx", "research-notes-01.pdf"]
+    mtime = (corpus / files[0]).stat().st_mtime_ns
+    generate_corpus(tmp_path, documents=2, pages=1)
+    assert (corpus / files[0]).stat().st_mtime_ns == mtime
+
+
+def test_use_fake_llm_routes_create_client_to_the_fake(monkeypatch):
+    monkeypatch.setattr(pipeline, "_client_factory", None)
+    monkeypatch.setenv("FAKE_LLM_LATENCY", "0")
+    use_fake_llm()
+    assert isinstance(pipeline.create_client(None), FakeOpenAI)
+
+
+def test_offline_cli_run_against_the_fake(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger, "_ledger", None)
+    monkeypatch.setattr(tracing, "_exporter", None)
+    monkeypatch.setenv("LEDGER_DB", str(tmp_path / "ledger.db"))
+    monkeypatch.setenv("TRACE_FILE", "off")
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    monkeypatch.setattr(pipeline, "_client_factory", lambda api_key: client)
+
+    pipeline.main(
+        [
+            "--auto-approve",
+            "--spec-retries", "0",
+            "--assets-dir", str(tmp_path / "assets"),
+            "--approvals-db", str(tmp_path / "approvals.db"),
+        ]
+    )
+
+    assert client.calls > 0
+    written = {path.name for path in (tmp_path / "assets").glob("*.md")}
+    assert {"launch_brief.md", "blog.md", "linkedin.md", "newsletter.md"} <= written
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from cancellation import RunCancelled
+from hedging import HedgePolicy
+from ledger import CallLedger
+
+
+def _slow_primary(token, hedged):
+    """Every call outlives a zero hedge delay; both attempts return after a short sleep."""
+    token.wait(0.01)
+    return "hedge" if hedged else "primary"
+
+
+@pytest.mark.parametrize("budget, calls", [(0.1, 3), (0.1, 1), (0.25, 20), (0.5, 7), (1.0, 4)])
+def test_hedges_never_exceed_budget_times_calls(budget, calls):
+    # Keep the zero fallback delay in force so every call wants a hedge.
+    policy = HedgePolicy(budget=budget, fallback_delay=0.0, min_samples=1000)
+    for _ in range(calls):
+        policy.call(_slow_primary)
+        stats = policy.snapshot()
+        assert stats["hedges_issued"] <= budget * stats["primary_calls"]
+    assert policy.hedges_issued == int(budget * calls + 1e-9)
+
+
+def test_short_run_with_default_budget_does_not_hedge():
+    policy = HedgePolicy(budget=0.1, fallback_delay=0.0)
+    for _ in range(3):
+        policy.call(_slow_primary)
+    assert policy.snapshot()["hedges_issued"] == 0
+
+
+def test_zero_budget_disables_hedging():
+    policy = HedgePolicy(budget=0.0, fallback_delay=0.0)
+    for _ in range(5):
+        assert policy.call(_slow_primary) == "primary"
+    assert policy.hedges_issued == 0
+
+
+def test_no_hedge_without_latency_history_or_fallback_delay():
+    policy = HedgePolicy(budget=1.0)
+    assert policy.hedge_delay() is None
+    policy.call(_slow_primary)
+    assert policy.hedges_issued == 0
+
+
+def test_hedge_wins_and_losing_primary_is_cancelled():
+    policy = HedgePolicy(budget=1.0, fallback_delay=0.01)
+    primary_cancelled = threading.Event()
+
+    def attempt(token, hedged):
+        if hedged:
+            return "hedge"
+        if token.wait(5.0):
+            primary_cancelled.set()
+            raise RunCancelled("lost")
+        return "primary"
+
+    started = time.perf_counter()
+    assert policy.call(attempt) == "hedge"
+    assert time.perf_counter() - started < 2.0
+    assert primary_cancelled.wait(2.0)
+    assert policy.snapshot()["hedges_won"] == 1
+
+
+def test_primary_error_is_raised_when_both_attempts_fail():
+    policy = HedgePolicy(budget=1.0, fallback_delay=0.0)
+
+    def attempt(token, hedged):
+        token.wait(0.01)
+        raise ValueError("hedge" if hedged else "primary")
+
+    with pytest.raises(ValueError):
+        policy.call(attempt)
+
+
+def test_seeded_latencies_set_the_percentile_trigger():
+    policy = HedgePolicy(percentile=90, min_samples=10)
+    policy.seed([0.1 * step for step in range(1, 11)])
+    assert policy.hedge_delay() == pytest.approx(0.9)
+
+
+def test_ledger_recent_latencies_filter_and_order(tmp_path):
+    ledger = CallLedger(tmp_path / "ledger.db")
+    for latency, stage, model, status in [
+        (1000, "asset", "gpt-4o-mini", "ok"),
+        (2000, "asset", "gpt-4o", "ok"),
+        (3000, "asset", "gpt-4o-mini", "error"),
+        (4000, "summary", "gpt-4o-mini", "ok"),
+        (5000, "asset", "gpt-4o-mini", "ok"),
+    ]:
+        ledger.record(run_id="r", stage=stage, content_type=None, model=model, status=status, latency_ms=latency)
+
+    assert ledger.recent_latencies(stage="asset", model="gpt-4o-mini") == [1.0, 5.0]
+    assert ledger.recent_latencies(stage="asset") == [1.0, 2.0, 5.0]
+    assert ledger.recent_latencies(stage="asset", limit=1) == [5.0]
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+
+import ledger
+from ledger import CallLedger, configure_ledger, estimate_cost, format_report, record_call
+
+
+def test_estimate_cost_uses_snapshot_prefix_cache_and_batch_discount():
+    full = estimate_cost("gpt-4o-mini", input_tokens=1_000_000, output_tokens=1_000_000)
+    assert full == pytest.approx(0.15 + 0.60)
+    assert estimate_cost("gpt-4o-mini-2024-07-18", input_tokens=1_000_000, output_tokens=1_000_000) == full
+    cached = estimate_cost("gpt-4o-mini", input_tokens=1_000_000, output_tokens=0, cached_tokens=1_000_000)
+    assert cached == pytest.approx(0.075)
+    batch = estimate_cost("gpt-4o-mini", input_tokens=1_000_000, output_tokens=1_000_000, batch=True)
+    assert batch == pytest.approx(full / 2)
+    assert estimate_cost("unknown-model", input_tokens=10, output_tokens=10) == 0.0
+
+
+def test_report_groups_calls_and_counts_failures(tmp_path):
+    calls = CallLedger(tmp_path / "ledger.db")
+    for content_type, status in [("blog", "ok"), ("blog", "error"), ("linkedin", "ok")]:
+        calls.record(
+            run_id="run-1",
+            stage="asset",
+            content_type=content_type,
+            model="gpt-4o-mini",
+            status=status,
+            latency_ms=100.0,
+            input_tokens=1000,
+            output_tokens=500,
+        )
+    calls.record(run_id="run-2", stage="summary", content_type=None, model="gpt-4o", status="ok", latency_ms=50.0)
+
+    rows = calls.report(group_by=["content_type"], run_id="run-1")
+    assert [(row["content_type"], row["calls"], row["failed"]) for row in rows] == [("blog", 2, 1), ("linkedin", 1, 0)]
+    assert rows[0]["input_tokens"] == 2000
+
+    table = format_report(rows, ["content_type"])
+    assert table.splitlines()[-1].split()[:3] == ["TOTAL", "3", "1"]
+
+    with pytest.raises(ValueError, match="Unknown group column"):
+        calls.report(group_by=["colour"])
+
+
+def test_record_call_reads_usage_and_is_a_no_op_without_a_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger, "_ledger", None)
+    usage = SimpleNamespace(input_tokens=200, output_tokens=80, input_tokens_details=SimpleNamespace(cached_tokens=50))
+    response = SimpleNamespace(usage=usage)
+    record_call(run_id=None, stage="asset", content_type="blog", model="gpt-4o-mini", status="ok", latency_ms=1.0, response=response)
+
+    calls = configure_ledger(tmp_path / "ledger.db")
+    record_call(run_id=None, stage="asset", content_type="blog", model="gpt-4o-mini", status="ok", latency_ms=1.0, response=response)
+
+    (row,) = calls.report(group_by=[])
+    assert (row["calls"], row["input_tokens"], row["output_tokens"], row["cached_tokens"]) == (1, 200, 80, 50)
@@ -0,0 +1,57 @@
+from fakes import FakeSlackServer
+from loadtest import SIGNING_SECRET, _percentile, drive, format_report, slack_action_request, summarise
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert _percentile(values, 50) == 50.0
+    assert _percentile(values, 99) == 99.0
+    assert _percentile(values, 100) == 100.0
+    assert _percentile([], 95) == 0.0
+
+
+def test_summarise_counts_errors_per_endpoint_and_overall():
+    samples = [("summary", 200, 0.1), ("summary", 503, 0.3), ("slack", 200, 0.05), ("slack", 0, 1.0)]
+    summary = summarise(samples, elapsed=2.0)
+
+    assert summary["all"]["requests"] == 4 and summary["all"]["errors"] == 2
+    assert summary["summary"]["error_rate"] == 0.5
+    assert summary["summary"]["status_codes"] == {"200": 1, "503": 1}
+    assert summary["slack"]["latency_ms"]["max"] == 1000.0
+    assert summary["all"]["rps"] == 2.0
+
+
+def test_report_compares_throughput_with_a_baseline():
+    current = {"2": summarise([("summary", 200, 0.1)] * 30, elapsed=1.0)}
+    baseline = {"results": {"2": summarise([("summary", 200, 0.1)] * 20, elapsed=1.0)}}
+    report = format_report(current, baseline)
+    assert "rps +50.0%" in report.splitlines()[1]
+
+
+def test_slack_action_request_is_signed_for_the_api(api_module, monkeypatch):
+    monkeypatch.setattr(api_module, "SLACK_SIGNING_SECRET", SIGNING_SECRET)
+    _, path, body, headers = slack_action_request("run-1", "item-1")
+    assert path == "/slack/actions"
+    assert api_module._verify_slack_signature(
+        body=body,
+        timestamp=headers["X-Slack-Request-Timestamp"],
+        signature=headers["X-Slack-Signature"],
+    )
+
+
+def test_drive_records_every_response_including_throttled_ones():
+    with FakeSlackServer(rate_limit_every=2) as server:
+        factories = {"webhook": lambda: ("POST", "/webhook", b"{}", {"Content-Type": "application/json"})}
+        samples, elapsed = drive(
+            server.url,
+            endpoints=["webhook"],
+            factories=factories,
+            concurrency=2,
+            duration=0.3,
+            timeout=5.0,
+        )
+
+    statuses = {status for _, status, _ in samples}
+    assert len(samples) == sum(server.calls.values())
+    assert statuses == {200, 429}
+    assert summarise(samples, elapsed)["webhook"]["errors"] == server.throttled
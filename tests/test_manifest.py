@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from export import REPORT_NAME, build_combined_report
+from manifest import OutputManifest, atomic_path
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return OutputManifest(tmp_path / "manifest.json")
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path, manifest):
+    path = tmp_path / "blog.md"
+    assert manifest.write_text(path, "# Blog", kind="asset")
+    mtime = path.stat().st_mtime_ns
+
+    assert not manifest.write_text(path, "# Blog", kind="asset")
+    assert path.stat().st_mtime_ns == mtime
+    assert manifest.stats == {"written": 1, "unchanged": 1}
+
+    assert manifest.write_text(path, "# Blog v2")
+    assert path.read_text() == "# Blog v2"
+
+
+def test_a_file_edited_on_disk_is_rewritten(tmp_path, manifest):
+    path = tmp_path / "blog.md"
+    manifest.write_text(path, "# Blog")
+    path.write_text("# Edited by hand")
+    assert manifest.write_text(path, "# Blog")
+    assert path.read_text() == "# Blog"
+
+
+def test_entries_are_relative_and_survive_a_reload(tmp_path, manifest):
+    manifest.write_text(tmp_path / "assets" / "blog.md", "# Blog", content_type="blog", run_id=None)
+    reloaded = OutputManifest(tmp_path / "manifest.json")
+    entry = reloaded.entry(tmp_path / "assets" / "blog.md")
+    assert entry["content_type"] == "blog" and "run_id" not in entry
+    assert list(json.loads((tmp_path / "manifest.json").read_text())["files"]) == ["assets/blog.md"]
+
+
+def test_failed_atomic_write_leaves_the_old_file(tmp_path):
+    path = tmp_path / "blog.md"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_path(path) as tmp:
+            tmp.write_text("half")
+            raise RuntimeError("crash")
+    assert path.read_text() == "old"
+    assert [item.name for item in tmp_path.iterdir()] == ["blog.md"]
+
+
+def test_combined_report_is_skipped_while_its_sources_are_current(tmp_path, manifest):
+    for name in ("launch_brief", "linkedin", "newsletter", "blog"):
+        manifest.write_text(tmp_path / f"{name}.md", f"{name} text", kind="asset")
+
+    report = build_combined_report(tmp_path, manifest=manifest)
+    assert "blog text" in report.read_text()
+    built = report.stat().st_mtime_ns
+
+    assert build_combined_report(tmp_path, manifest=manifest) == report
+    assert report.stat().st_mtime_ns == built
+
+    manifest.write_text(tmp_path / "blog.md", "new blog text", kind="asset")
+    build_combined_report(tmp_path, manifest=manifest)
+    assert "new blog text" in (tmp_path / REPORT_NAME).read_text()
+
+
+def test_report_is_rebuilt_when_an_asset_is_edited_outside_the_manifest(tmp_path, manifest):
+    for name in ("launch_brief", "blog"):
+        manifest.write_text(tmp_path / f"{name}.md", f"{name} text")
+    report = build_combined_report(tmp_path, manifest=manifest)
+
+    blog = tmp_path / "blog.md"
+    blog.write_text("hand edit")
+    os.utime(blog, ns=(blog.stat().st_mtime_ns + 10**9,) * 2)
+    report = build_combined_report(tmp_path, manifest=manifest)
+    assert "hand edit" in report.read_text()
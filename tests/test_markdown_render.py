@@ -0,0 +1,55 @@
+import pytest
+
+from markdown_render import clear_cache, markdown_to_html, markdown_to_text, render
+from metrics import CACHE_REQUESTS
+
+
+@pytest.mark.parametrize(
+    "markdown, html, text",
+    [
+        (
+            "Some **bold _and italic_** text and [docs](https://x.io).",
+            '<p>Some <strong>bold <em>and italic</em></strong> text and <a href="https://x.io">docs</a>.</p>',
+            "Some bold and italic text and docs (https://x.io).",
+        ),
+        (
+            "Benefits:\n- Fast\n- Cheap",
+            "<p>Benefits:</p>\n<ul>\n<li>Fast</li>\n<li>Cheap</li>\n</ul>",
+            "Benefits:\n\n- Fast\n- Cheap",
+        ),
+        (
+            "- First point\n\n    More on first\n\n- Second",
+            "<ul>\n<li>\n<p>First point</p>\n<p>More on first</p>\n</li>\n<li>\n<p>Second</p>\n</li>\n</ul>",
+            "- First point\n\n  More on first\n- Second",
+        ),
+        (
+            "1. One\n2. Two\n    - nested",
+            "<ol>\n<li>One</li>\n<li>Two<ul>\n<li>nested</li>\n</ul>\n</li>\n</ol>",
+            "1. One\n2. Two\n   - nested",
+        ),
+        (
+            "```\n- not a list\n<b>x</b>\n```",
+            "<pre><code>- not a list\n&lt;b&gt;x&lt;/b&gt;\n</code></pre>",
+            "    - not a list\n    <b>x</b>",
+        ),
+    ],
+    ids=["nested-inline", "list-after-paragraph", "loose-list", "nested-list", "fenced-code"],
+)
+def test_html_and_text_come_from_one_parse(markdown, html, text):
+    rendered = render(markdown)
+    assert rendered.html == html
+    assert rendered.text == text
+
+
+def test_text_output_for_tables_quotes_rules_and_entities():
+    markdown = "| a | b |\n|---|---|\n| 1 | 2 |\n\n> quoted\n\n---\n\nTom &amp; Jerry\nsoft break"
+    assert markdown_to_text(markdown) == "a | b\n1 | 2\n\n> quoted\n\n--------------------\n\nTom & Jerry soft break"
+    assert "<table>" in markdown_to_html(markdown)
+
+
+def test_repeat_renders_hit_the_cache():
+    clear_cache()
+    before_hits = CACHE_REQUESTS.value(cache="markdown", result="hit")
+    first = render("# Launch\n\nHello")
+    assert render("# Launch\n\nHello") is first
+    assert CACHE_REQUESTS.value(cache="markdown", result="hit") == before_hits + 1
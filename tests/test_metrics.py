@@ -0,0 +1,58 @@
+import pytest
+
+from metrics import Counter, Gauge, Histogram, Registry, STAGE_IN_FLIGHT, STAGE_SECONDS, stage_timer
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1)))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, endpoint="/runs")
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{endpoint="/runs",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{endpoint="/runs",le="1"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="/runs",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{endpoint="/runs"} 5.55' in text
+    assert 'latency_seconds_count{endpoint="/runs"} 3' in text
+
+
+def test_counter_escapes_labels_and_rejects_wrong_label_names():
+    registry = Registry()
+    errors = registry.register(Counter("errors_total", "Errors.", ("status",)))
+    errors.inc(status='say "hi"\n')
+    assert 'errors_total{status="say \\"hi\\"\\n"} 1' in registry.render()
+    with pytest.raises(ValueError):
+        errors.inc(code="500")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(Counter("errors_total", "Again."))
+
+
+def test_callback_gauge_is_evaluated_at_scrape():
+    registry = Registry()
+    depth = {("email",): 3.0}
+    registry.register(Gauge("queue_depth", "Queued items.", ("queue",), callback=lambda: depth))
+    assert 'queue_depth{queue="email"} 3' in registry.render()
+    depth[("email",)] = 0.0
+    assert 'queue_depth{queue="email"} 0' in registry.render()
+
+
+def test_stage_timer_records_failures_and_clears_in_flight():
+    labels = ("ingest", "test-stage", "error")
+    before = STAGE_SECONDS.totals().get(labels, (0, 0.0))[0]
+    with pytest.raises(RuntimeError):
+        with stage_timer("ingest", "test-stage"):
+            raise RuntimeError("boom")
+    assert STAGE_SECONDS.totals()[labels][0] == before + 1
+    assert f'{STAGE_IN_FLIGHT.name}{{stage="ingest"}} 0' in "\n".join(STAGE_IN_FLIGHT.samples())
+
+
+def test_metrics_endpoint_reports_request_latency(api_client):
+    assert api_client.get("/health").status_code == 200
+
+    response = api_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",endpoint="/health",status="200"}' in response.text
+    assert "# TYPE approval_queue_depth gauge" in response.text
@@ -0,0 +1,137 @@
+import time
+
+from fakes import FakeSMTPServer
+from outbox import PERMANENT_KEY, EmailOutbox, OutboxWorker
+
+
+def _enqueue(outbox, port, *, recipients=("reader@example.com",), run_id="run-1", batch=False):
+    return outbox.enqueue(
+        run_id=run_id,
+        item_id="newsletter",
+        subject="Launch news",
+        body="<p>Hello {{email}}</p>",
+        text_body="Hello {{email}}",
+        sender="marketing@example.com",
+        recipients=list(recipients),
+        transport={"host": "127.0.0.1", "port": port, "plain": True, "batch": batch, "pool_size": 2},
+    )
+
+
+def test_drain_sends_due_message(tmp_path, smtp_server):
+    outbox = EmailOutbox(tmp_path / "outbox.db")
+    message_id = _enqueue(outbox, smtp_server.port)
+
+    worker = OutboxWorker(outbox)
+    assert worker.drain() == 1
+
+    record = outbox.get(message_id)
+    assert record["status"] == "sent"
+    assert record["attempts"] == 1
+    assert worker.stats == {"sent": 1, "retried": 0, "failed": 0}
+    assert [message["to"] for message in smtp_server.messages] == [["reader@example.com"]]
+
+
+def test_enqueue_is_idempotent_per_run_item(tmp_path):
+    outbox = EmailOutbox(tmp_path / "outbox.db")
+    assert _enqueue(outbox, 25) == _enqueue(outbox, 25)
+    assert outbox.count_by_status() == {"pending": 1}
+
+
+def test_server_down_reschedules_with_backoff(tmp_path, closed_port):
+    outbox = EmailOutbox(tmp_path / "outbox.db")
+    message_id = _enqueue(outbox, closed_port)
+
+    worker = OutboxWorker(outbox, base_delay=30.0)
+    worker.drain()
+
+    record = outbox.get(message_id)
+    assert record["status"] == "pending"
+    assert record["attempts"] == 1
+    assert "ConnectionRefusedError" in record["last_error"]
+    assert record["next_attempt_at"] >= time.time() + 15  # at least half the first backoff
+    assert worker.stats["retried"] == 1
+    # Not due yet, so another drain leaves it alone.
+    assert worker.drain() == 0
+
+
+def test_transient_failures_give_up_after_max_attempts(tmp_path, closed_port):
+    outbox = EmailOutbox(tmp_path / "outbox.db")
+    message_id = _enqueue(outbox, closed_port)
+
+    worker = OutboxWorker(outbox, max_attempts=2, base_delay=0.0, max_delay=0.0)
+    worker.drain()
+
+    record = outbox.get(message_id)
+    assert record["status"] == "failed"
+    assert record["attempts"] == 2
+    assert worker.stats == {"sent": 0, "retried": 1, "failed": 1}
+
+
+def test_rejected_recipient_fails_permanently(tmp_path):
+    with FakeSMTPServer(reject=["gone@example.com"]) as server:
+        outbox = EmailOutbox(tmp_path / "outbox.db")
+        message_id = _enqueue(outbox, server.port, recipients=["gone@example.com"])
+        worker = OutboxWorker(outbox)
+        worker.drain()
+
+    record = outbox.get(message_id)
+    assert record["status"] == "failed"
+    assert record["attempts"] == 1
+    assert "550" in record["last_error"]
+    assert server.messages == []
+
+
+def test_partially_refused_single_send_records_rejections(tmp_path):
+    with FakeSMTPServer(reject=["gone@example.com"]) as server:
+        outbox = EmailOutbox(tmp_path / "outbox.db")
+        message_id = _enqueue(outbox, server.port, recipients=["reader@example.com", "gone@example.com"])
+        OutboxWorker(outbox).drain()
+
+    record = outbox.get(message_id)
+    assert record["status"] == "sent"
+    assert record["last_error"].startswith("rejected gone@example.com (550")
+    assert [message["to"] for message in server.messages] == [["reader@example.com"]]
+
+
+def test_batch_retry_narrows_to_transient_recipients(tmp_path, monkeypatch):
+    monkeypatch.setattr("email_helpers.time.sleep", lambda seconds: None)
+    # Three 451s exhaust send_batch's in-call retries for one recipient only.
+    with FakeSMTPServer(reject=["gone@example.com"], fail_first=3) as server:
+        outbox = EmailOutbox(tmp_path / "outbox.db")
+        message_id = _enqueue(
+            outbox,
+            server.port,
+            recipients=["gone@example.com", "reader@example.com"],
+            batch=True,
+        )
+        worker = OutboxWorker(outbox)
+        worker.process(outbox.claim_due(message_id=message_id)[0])
+
+    record = outbox.get(message_id)
+    assert record["status"] == "pending"
+    assert record["recipients"] == ["reader@example.com"]
+    assert "rejected gone@example.com" in record["last_error"]
+    assert PERMANENT_KEY not in record["recipients"]
+
+
+def test_send_now_leaves_other_messages_queued(tmp_path, smtp_server):
+    outbox = EmailOutbox(tmp_path / "outbox.db")
+    other = _enqueue(outbox, smtp_server.port, run_id="earlier-run")
+    mine = _enqueue(outbox, smtp_server.port, run_id="this-run")
+
+    assert OutboxWorker(outbox).send_now(mine)
+
+    assert outbox.get(mine)["status"] == "sent"
+    assert outbox.get(other)["status"] == "pending"
+    assert len(smtp_server.messages) == 1
+
+
+def test_requeue_gives_failed_message_fresh_attempts(tmp_path, closed_port):
+    outbox = EmailOutbox(tmp_path / "outbox.db")
+    message_id = _enqueue(outbox, closed_port)
+    OutboxWorker(outbox, max_attempts=1).drain()
+    assert outbox.get(message_id)["status"] == "failed"
+
+    assert outbox.requeue(message_id)
+    record = outbox.get(message_id)
+    assert (record["status"], record["attempts"]) == ("pending", 0)
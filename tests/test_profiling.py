@@ -0,0 +1,47 @@
+import pstats
+
+import profiling
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+def summarise():
+    return busy(20_000)
+
+
+def ingest():
+    return busy(20_000)
+
+
+def test_nested_stage_time_stays_out_of_the_parent_profile(tmp_path):
+    with profiling.activate(tmp_path) as profiler:
+        with profiling.stage("summary"):
+            summarise()
+            with profiling.stage("ingest"):
+                ingest()
+
+    summary = {row["function"] for row in profiler.hot_functions("summary")}
+    nested = {row["function"] for row in profiler.hot_functions("ingest")}
+    assert any("(summarise)" in name for name in summary)
+    assert not any("(ingest)" in name for name in summary)
+    assert any("(ingest)" in name for name in nested)
+
+    paths = sorted(tmp_path.glob("*.prof"))
+    assert [path.name for path in paths] == ["01-summary.prof", "02-ingest.prof"]
+    assert pstats.Stats(str(paths[0])).total_calls > 0
+
+
+def test_only_one_profiled_run_at_a_time(tmp_path, capsys):
+    with profiling.activate(tmp_path / "first") as first:
+        with profiling.activate(tmp_path / "second") as second:
+            assert first is not None and second is None
+    assert "another profiled run is active" in capsys.readouterr().out
+    with profiling.activate(tmp_path / "third") as third:
+        assert third is not None
+
+
+def test_stage_is_a_no_op_without_an_active_profiler():
+    with profiling.stage("summary"):
+        assert busy(10) == 285
@@ -0,0 +1,111 @@
+import pytest
+
+from rate_limit import (
+    AdaptiveConcurrency,
+    RateLimiter,
+    RetriesExhausted,
+    TokenBucket,
+    is_retryable,
+    retry_after_seconds,
+)
+
+
+class Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = Response(headers or {})
+
+
+def flaky(failures):
+    """Return a callable that raises each of ``failures`` in turn, then succeeds."""
+    pending = list(failures)
+    attempts = []
+
+    def call():
+        attempts.append(len(attempts))
+        if pending:
+            raise pending.pop(0)
+        return "ok"
+
+    return call, attempts
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr("rate_limit.time.sleep", slept.append)
+    return slept
+
+
+def test_token_bucket_charges_overdraft_as_wait_and_refunds():
+    bucket = TokenBucket(60)  # one unit per second
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(2) == pytest.approx(2.0, abs=0.05)
+    bucket.refund(2)
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_adaptive_concurrency_halves_on_throttle_and_regrows():
+    limit = AdaptiveConcurrency(8)
+    limit.on_throttle()
+    limit.on_throttle()
+    assert limit.limit == 2
+    limit.on_success()
+    assert 2 < limit.limit < 3
+
+
+def test_retry_after_headers_are_honoured():
+    assert retry_after_seconds(APIError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(APIError(429, {"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(APIError(429)) is None
+
+
+def test_retryable_statuses():
+    assert is_retryable(APIError(429))
+    assert is_retryable(APIError(503))
+    assert is_retryable(ConnectionError())
+    assert not is_retryable(APIError(400))
+    assert not is_retryable(ValueError())
+
+
+def test_throttled_call_waits_at_least_retry_after_then_succeeds(sleeps):
+    limiter = RateLimiter(max_concurrency=4, base_delay=0.01)
+    call, attempts = flaky([APIError(429, {"retry-after": "2"})])
+
+    assert limiter.call(call) == "ok"
+    assert len(attempts) == 2
+    assert max(sleeps) >= 2.0
+    assert limiter.stats["retries"] == 1 and limiter.stats["throttled"] == 1
+    assert limiter.concurrency.limit < 4
+
+
+def test_non_retryable_error_is_raised_without_retry(sleeps):
+    limiter = RateLimiter(base_delay=0.01)
+    call, attempts = flaky([APIError(400)])
+
+    with pytest.raises(APIError):
+        limiter.call(call)
+    assert len(attempts) == 1
+    assert limiter.stats["errors"] == 1
+
+
+def test_retries_are_capped(sleeps):
+    limiter = RateLimiter(max_retries=2, base_delay=0.01)
+    call, attempts = flaky([APIError(503)] * 5)
+
+    with pytest.raises(RetriesExhausted) as info:
+        limiter.call(call)
+    assert len(attempts) == 3
+    assert info.value.status_code == 503
+
+
+def test_unused_token_estimate_is_refunded():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    limiter.call(lambda: 100, estimated_tokens=800, used_tokens=lambda used: used)
+    assert limiter.tokens.reserve(800) == 0.0
@@ -0,0 +1,119 @@
+import argparse
+
+import pytest
+
+import pipeline
+from artifacts import ArtifactStore
+from manifest import sha256_hex
+from pipeline import Decision, LaunchContext, review_assets
+from spec_checks import check_draft
+from variants import rank_variants
+
+BRIEF = "# Launch brief\n\nWorkflow exports ship to enterprise teams; onboarding gets faster."
+STRONG = "Workflow exports ship today for enterprise teams.\n\n- Faster onboarding\n- Fewer tickets\n\n#Launch #Workflow"
+WEAK = "Something new is coming soon."
+
+
+@pytest.fixture
+def review(tmp_path, monkeypatch):
+    """Run ``review_assets`` with scripted decisions; returns what reviewers saw and what was revised."""
+    seen, revisions = [], []
+
+    def fake_revise(client, **kwargs):
+        revisions.append(kwargs)
+        return f"Revised draft {len(revisions)}"
+
+    monkeypatch.setattr(pipeline, "revise_asset", fake_revise)
+
+    def run(assets, decisions, *, rankings=None):
+        scripted = iter(decisions)
+
+        def approve(title, item_id, body):
+            seen.append(body)
+            return next(scripted)
+
+        context = LaunchContext(
+            args=argparse.Namespace(
+                asset_model="gpt-4o-mini",
+                asset_temperature=0.4,
+                asset_max_tokens=800,
+                preview_chars=400,
+                max_revisions=2,
+                combined_report=False,
+            ),
+            client=None,
+            manifest=None,
+            artifacts=ArtifactStore(tmp_path / "artifacts"),
+            email_settings=None,
+            hedge=None,
+            approve=approve,
+            slack_preview=lambda *args, **kwargs: None,
+        )
+        outcome = review_assets(
+            context,
+            assets,
+            run_id="run-1",
+            assets_dir=tmp_path,
+            launch_brief=BRIEF,
+            rankings=rankings or {},
+            reports={content_type: check_draft(content_type, text) for content_type, text in assets.items()},
+        )
+        return outcome, context.artifacts
+
+    run.seen = seen
+    run.revisions = revisions
+    return run
+
+
+def test_rejected_ranked_set_revises_the_top_candidate(review, tmp_path):
+    ranked = rank_variants("linkedin", [WEAK, STRONG], launch_brief=BRIEF)
+    top = ranked[0].text
+
+    outcome, artifacts = review(
+        {"linkedin": top},
+        [Decision(False, reason="Mention the beta"), Decision(True)],
+        rankings={"linkedin": ranked},
+    )
+
+    # Reviewers saw the scored set first, then the revision on its own.
+    assert "Rank 1: linkedin variant" in review.seen[0]
+    assert review.seen[1] == "Revised draft 1"
+    [revision] = review.revisions
+    assert revision["previous_draft"] == top
+    assert "Rank 1" not in revision["previous_draft"] and "score" not in revision["previous_draft"]
+    assert revision["feedback"] == "Mention the beta"
+
+    assert outcome == {"saved": ["linkedin"], "rejected": []}
+    assert (tmp_path / "linkedin.md").read_text() == "Revised draft 1\n"
+    assert not (tmp_path / "linkedin_variants.md").exists()
+    approved = artifacts.latest("linkedin")
+    assert approved["inputs"]["revises_sha256"] == sha256_hex((top.strip() + "\n").encode("utf-8"))
+
+
+def test_rejected_single_draft_revises_that_draft(review, tmp_path):
+    outcome, _ = review(
+        {"linkedin": STRONG},
+        [Decision(False, reason="Shorter"), Decision(False, reason="Shorter still"), Decision(True)],
+    )
+
+    assert [revision["previous_draft"] for revision in review.revisions] == [STRONG, "Revised draft 1"]
+    assert outcome["saved"] == ["linkedin"]
+    assert (tmp_path / "linkedin.md").read_text() == "Revised draft 2\n"
+
+
+def test_rejection_without_feedback_skips_the_asset(review, tmp_path):
+    outcome, artifacts = review({"linkedin": STRONG}, [Decision(False)])
+
+    assert review.revisions == []
+    assert outcome == {"saved": [], "rejected": ["linkedin"]}
+    assert not (tmp_path / "linkedin.md").exists()
+    assert artifacts.latest("linkedin", status="rejected") is not None
+
+
+def test_approved_ranked_set_saves_top_candidate_and_variants(review, tmp_path):
+    ranked = rank_variants("linkedin", [WEAK, STRONG], launch_brief=BRIEF)
+
+    review({"linkedin": ranked[0].text}, [Decision(True)], rankings={"linkedin": ranked})
+
+    assert (tmp_path / "linkedin.md").read_text() == ranked[0].text + "\n"
+    assert "Rank 2: linkedin variant" in (tmp_path / "linkedin_variants.md").read_text()
@@ -0,0 +1,99 @@
+import hashlib
+import hmac
+import json
+import time
+import urllib.parse
+
+import pytest
+
+import pipeline
+from fakes import FakeOpenAI
+from slack_helpers import FEEDBACK_CALLBACK_ID
+
+SECRET = "test-signing-secret"
+
+
+@pytest.fixture
+def slack_post(api_module, api_client, monkeypatch):
+    monkeypatch.setattr(api_module, "SLACK_SIGNING_SECRET", SECRET)
+    monkeypatch.setattr(api_module, "SLACK_BOT_TOKEN", None)
+    api_module.approval_store.upsert_item(run_id="run-1", item_id="blog", title="Blog", body="Draft")
+
+    def post(payload):
+        body = urllib.parse.urlencode({"payload": json.dumps(payload)})
+        timestamp = str(int(time.time()))
+        digest = hmac.new(SECRET.encode(), f"v0:{timestamp}:{body}".encode(), hashlib.sha256).hexdigest()
+        return api_client.post(
+            "/slack/actions",
+            content=body,
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "X-Slack-Request-Timestamp": timestamp,
+                "X-Slack-Signature": f"v0={digest}",
+            },
+        )
+
+    return post
+
+
+def modal(kind, reason=None, callback_id=FEEDBACK_CALLBACK_ID):
+    view = {
+        "callback_id": callback_id,
+        "private_metadata": json.dumps({"run_id": "run-1", "item_id": "blog"}),
+        "state": {"values": {"reason": {"reason": {"value": reason}}}},
+    }
+    return {"type": kind, "user": {"id": "U1", "name": "reviewer"}, "view": view}
+
+
+def test_submitted_feedback_is_stored_as_the_rejection_reason(api_module, slack_post):
+    response = slack_post(modal("view_submission", " Lead with the pricing change. "))
+    assert response.json() == {"response_action": "clear"}
+    item = api_module.approval_store.get_item(run_id="run-1", item_id="blog")
+    assert (item["status"], item["reason"], item["approver_name"]) == ("rejected", "Lead with the pricing change.", "reviewer")
+
+
+def test_closed_modal_rejects_without_a_reason(api_module, slack_post):
+    response = slack_post(modal("view_closed", "ignored"))
+    assert response.status_code == 200 and response.json() == {}
+    item = api_module.approval_store.get_item(run_id="run-1", item_id="blog")
+    assert (item["status"], item["reason"]) == ("rejected", None)
+
+
+def test_other_modals_are_refused(slack_post):
+    assert slack_post(modal("view_submission", "x", callback_id="something_else")).status_code == 400
+
+
+def test_revision_prompt_carries_the_feedback_and_previous_draft():
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    sent = []
+    create = client.responses.create
+    client.responses.create = lambda **request: sent.append(request) or create(**request)
+
+    revised = pipeline.revise_asset(
+        client,
+        content_type="blog",
+        launch_brief="# Brief\n\nExports ship next week.",
+        previous_draft="OLD DRAFT TEXT",
+        feedback="Lead with the pricing change.",
+        model="gpt-4o-mini",
+        temperature=0.4,
+        max_tokens=200,
+    )
+
+    assert revised.startswith("# Generated draft")
+    prompt = json.dumps(sent[0]["input"])
+    assert "OLD DRAFT TEXT" in prompt and "Lead with the pricing change." in prompt
+
+
+@pytest.mark.parametrize("answer, expected", [(" Shorter intro ", "Shorter intro"), ("", None)])
+def test_terminal_feedback_prompt(monkeypatch, answer, expected):
+    monkeypatch.setattr("builtins.input", lambda prompt: answer)
+    assert pipeline.ask_feedback("blog") == expected
+
+
+def test_terminal_feedback_prompt_without_stdin(monkeypatch):
+    def closed(prompt):
+        raise EOFError
+
+    monkeypatch.setattr("builtins.input", closed)
+    assert pipeline.ask_feedback("blog") is None
@@ -0,0 +1,79 @@
+import pytest
+
+from fakes import FakeOpenAI
+from pipeline import SingleCallReport, run_assets_single_call
+
+BRIEF = "# Launch brief\n\n" + "Background exports ship next week for every workspace. " * 40
+TYPES = ["linkedin", "newsletter", "blog"]
+
+
+def words(count, word="draft"):
+    return " ".join([word] * count)
+
+
+def scripted(fields=None, error=None):
+    """A fake client whose structured response is ``fields`` (or raises ``error``)."""
+    client = FakeOpenAI(latency=0.0, jitter=0.0)
+    parse = client.responses.parse
+
+    def scripted_parse(*, text_format, **request):
+        response = parse(text_format=None, **request)
+        if error is not None:
+            raise error
+        response.output_parsed = text_format.model_construct(**fields)
+        return response
+
+    client.responses.parse = scripted_parse
+    return client
+
+
+def generate(client):
+    return run_assets_single_call(
+        client, content_types=TYPES, launch_brief=BRIEF, model="gpt-4o-mini", temperature=0.4, max_tokens=200
+    )
+
+
+def test_one_call_fills_every_type_and_saves_input_tokens():
+    fields = {"linkedin": words(100, "post"), "newsletter": words(130, "email"), "blog": words(750, "article")}
+    client = scripted(fields)
+
+    outputs, report = generate(client)
+
+    assert client.calls == 1
+    assert outputs == fields
+    assert report.fallbacks == {} and report.input_tokens < report.per_type_tokens
+    assert "saved" in report.format()
+
+
+def test_stub_and_missing_fields_fall_back_to_per_type_calls():
+    client = scripted({"linkedin": words(100, "post"), "newsletter": "See blog.", "blog": ""})
+
+    outputs, report = generate(client)
+
+    assert client.calls == 3
+    assert report.fallbacks == {"newsletter": "only 2 words", "blog": "missing"}
+    assert outputs["linkedin"] == words(100, "post")
+    assert outputs["blog"].startswith("# Generated draft") and outputs["newsletter"].startswith("# Generated draft")
+    assert list(outputs) == TYPES
+
+
+def test_unusable_structured_response_regenerates_everything(capsys):
+    client = scripted(error=ValueError("invalid JSON"))
+
+    outputs, report = generate(client)
+
+    assert client.calls == 4
+    assert set(report.fallbacks.values()) == {"no structured response"}
+    assert set(outputs) == set(TYPES)
+    assert "falling back to per-type calls" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "report, expected",
+    [
+        (SingleCallReport(TYPES, {}, 900, 600, skipped=True), "Single-call assets skipped"),
+        (SingleCallReport(TYPES, {"blog": "missing"}, 1200, 1000), "200 more after fallbacks"),
+    ],
+)
+def test_report_wording(report, expected):
+    assert expected in report.format()
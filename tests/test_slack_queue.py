@@ -0,0 +1,63 @@
+import json
+import time
+
+import pytest
+
+from fakes import FakeSlackServer
+from slack_queue import SlackQueue, format_preview
+
+
+@pytest.fixture
+def slack_server():
+    with FakeSlackServer(retry_after=0) as server:
+        yield server
+
+
+def webhook_texts(server):
+    return [json.loads(body)["text"] for path, body in server.requests if path == "/webhook"]
+
+
+def test_previews_in_one_window_go_out_as_one_message(slack_server):
+    with SlackQueue(slack_server.webhook_url, batch_window=0.2, min_interval=0) as slack:
+        for channel in ("linkedin", "newsletter", "blog"):
+            slack.enqueue_preview(channel, f"{channel} draft", preview_chars=100)
+        assert slack.flush(5)
+
+    (text,) = webhook_texts(slack_server)
+    assert all(f"*{channel}*" in text for channel in ("linkedin", "newsletter", "blog"))
+    assert slack.stats["previews"] == 3 and slack.stats["batches"] == 1
+
+
+def test_throttled_webhook_is_retried_after_retry_after(slack_server):
+    slack_server.rate_limit_every = 2
+    with SlackQueue(slack_server.webhook_url, batch_window=0, min_interval=0) as slack:
+        slack.enqueue_preview("first", "body", preview_chars=100)
+        slack.flush(5)
+        slack.enqueue_preview("second", "body", preview_chars=100)
+        assert slack.flush(5)
+
+    assert slack_server.throttled == 1
+    assert slack.stats["retries"] == 1 and slack.stats["batches"] == 2 and slack.stats["dropped"] == 0
+    assert len(webhook_texts(slack_server)) == 2
+
+
+def test_calls_on_one_channel_are_spaced_and_results_returned():
+    with SlackQueue(min_interval=0.1) as slack:
+        started = time.monotonic()
+        futures = [slack.submit(lambda value=value: value, pace_key="C1") for value in range(3)]
+        assert [future.result(5) for future in futures] == [0, 1, 2]
+        assert time.monotonic() - started >= 0.2
+
+        failing = slack.submit(lambda: 1 / 0, pace_key="C2")
+        with pytest.raises(ZeroDivisionError):
+            failing.result(5)
+
+    with pytest.raises(RuntimeError, match="closed"):
+        slack.submit(lambda: None).result(1)
+
+
+def test_format_preview_truncates_and_keeps_code_fences_closed():
+    text = format_preview("Blog", "intro ``` more text", 12)
+    assert text.startswith("*Blog*\n```")
+    assert text.endswith("…```")
+    assert text.count("```") == 2
@@ -0,0 +1,117 @@
+import pytest
+
+import pipeline
+from spec_checks import SpecStats, check_draft, count_words, violation_feedback
+
+
+def words(count):
+    return " ".join(["launch"] * count)
+
+
+LINKEDIN_OK = f"{words(120)}\n\nRead more: https://example.com/launch\n\n#ProductLaunch #Exports"
+
+
+def newsletter(subject="Exports, minus the wait", preview="Background exports are here", body_words=150):
+    return f"Subject line: {subject}\nPreview text: {preview}\n\n{words(body_words)}"
+
+
+def blog(title="Exports, minus the wait", meta="m" * 155, body_words=800):
+    return f"# {title}\n\nMeta description: {meta}\n\n{words(body_words)}"
+
+
+def checks(report):
+    return sorted(violation.check for violation in report.violations)
+
+
+def test_count_words_ignores_urls_hashtags_and_link_targets():
+    assert count_words("Read [the docs](https://x.io/a-b) at https://x.io #Launch now") == 5
+
+
+def test_linkedin_within_limits_passes():
+    report = check_draft("linkedin", LINKEDIN_OK)
+    assert report.ok and report.summary() == "meets spec"
+    assert report.words == 122
+
+
+def test_linkedin_limits():
+    draft = f"{words(40)} https://a.io https://b.io #One"
+    report = check_draft("linkedin", draft)
+    assert checks(report) == ["hashtags", "links", "words"]
+    assert "word count is 40 (spec 90-180)" in report.summary()
+
+
+def test_newsletter_subject_preview_and_body():
+    assert check_draft("newsletter", newsletter()).ok
+    report = check_draft("newsletter", newsletter(subject="x" * 60, body_words=100))
+    assert checks(report) == ["subject", "words"]
+    assert "subject line is 60 chars (spec ≤45)" in report.summary()
+
+
+def test_newsletter_without_a_subject_line_is_flagged():
+    report = check_draft("newsletter", words(150))
+    assert "no subject line found" in report.summary()
+
+
+def test_blog_title_and_meta_description():
+    assert check_draft("blog", blog()).ok
+    report = check_draft("blog", blog(title="t" * 70, meta="too short"))
+    assert checks(report) == ["meta_description", "title"]
+    assert "meta description is 9 chars (spec 150-160)" in report.summary()
+
+
+def test_feedback_lists_every_violation():
+    feedback = violation_feedback(check_draft("linkedin", words(10)))
+    assert feedback.splitlines()[1:] == ["- hashtag count is 0 (spec 2-4)", "- word count is 10 (spec 90-180)"]
+
+
+def test_stats_track_pass_rate_and_retries():
+    stats = SpecStats()
+    stats.record(check_draft("linkedin", words(10)))
+    stats.record(check_draft("linkedin", LINKEDIN_OK), retry=True)
+    assert stats.snapshot()["linkedin"]["pass_rate"] == 0.5
+    assert stats.format() == "Spec pass rate: linkedin 50% (1/2 drafts, 1 regenerated)."
+
+
+@pytest.fixture
+def revisions(monkeypatch):
+    """Script ``revise_asset``: each call returns the next queued draft."""
+    queued, calls = [], []
+
+    def revise(client, **kwargs):
+        calls.append(kwargs)
+        return queued.pop(0)
+
+    monkeypatch.setattr(pipeline, "revise_asset", revise)
+    return queued, calls
+
+
+def enforce(assets, retries=1):
+    return pipeline.enforce_specs(
+        None, assets, launch_brief="brief", model="gpt-4o-mini", temperature=0.4, max_tokens=200, retries=retries
+    )
+
+
+def test_only_failing_drafts_are_regenerated(revisions):
+    queued, calls = revisions
+    queued.append(LINKEDIN_OK)
+    assets = {"linkedin": words(10), "newsletter": newsletter()}
+
+    reports = enforce(assets)
+
+    assert [call["content_type"] for call in calls] == ["linkedin"]
+    assert calls[0]["stage"] == "spec_retry" and "word count is 10" in calls[0]["feedback"]
+    assert assets["linkedin"] == LINKEDIN_OK
+    assert reports["linkedin"].ok and reports["newsletter"].ok
+
+
+def test_a_worse_regeneration_does_not_replace_the_draft(revisions):
+    queued, calls = revisions
+    original = f"{words(120)} #One #Two https://a.io https://b.io"
+    queued.extend([f"{words(10)} https://a.io https://b.io", f"{words(10)}"])
+    assets = {"linkedin": original}
+
+    reports = enforce(assets, retries=2)
+
+    assert len(calls) == 2
+    assert assets["linkedin"] == original
+    assert checks(reports["linkedin"]) == ["links"]
@@ -0,0 +1,40 @@
+"""Cold-start regression test for the CLI and API entry points (see ``bench.py startup``)."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+import bench
+
+# Local modules only some runs need; importing pipeline must not pull them (or what they import) in.
+LAZY_MODULES = ("email_helpers", "outbox", "fakes", "variants", "smtplib", "http.server")
+
+
+@pytest.fixture(scope="module")
+def startup():
+    return bench.measure_startup(repeat=5)
+
+
+@pytest.mark.parametrize("name", list(bench.STARTUP_ENTRY_POINTS))
+def test_entry_point_within_budget(startup, name):
+    result = startup[name]
+    slowest = ", ".join(f"{item['module']} {item['cumulative_ms']:.0f}ms" for item in result["slowest_imports"])
+    assert result["best_ms"] <= result["budget_ms"], f"{name} took {result['best_ms']}ms; slowest imports: {slowest}"
+
+
+@pytest.mark.parametrize("name", list(bench.STARTUP_ENTRY_POINTS))
+def test_entry_point_defers_heavy_imports(startup, name):
+    assert startup[name]["unexpected_heavy_imports"] == []
+
+
+def test_pipeline_import_defers_run_only_modules():
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import json, sys, pipeline; print(json.dumps(sorted(sys.modules)))"],
+        cwd=bench.BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert sorted(set(LAZY_MODULES) & set(json.loads(loaded))) == []
@@ -0,0 +1,71 @@
+import contextvars
+import threading
+
+import pytest
+
+import tracing
+from tracing import Span, configure_tracing, critical_path, load_spans, span, start_run, to_otlp
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_exporter", None)
+    path = tmp_path / "traces.jsonl"
+    configure_tracing(path)
+    return path
+
+
+def record_summary():
+    with span("summary"):
+        pass
+
+
+def test_spans_nest_under_the_run_and_follow_copied_contexts(trace_file):
+    with start_run("run-1"):
+        with span("asset", content_type="blog"):
+            pass
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(record_summary,))
+        worker.start()
+        worker.join()
+        with pytest.raises(ValueError):
+            with span("email_prep"):
+                raise ValueError("bad template")
+
+    spans = {item.name: item for item in load_spans(trace_file, "run-1")}
+    root = spans["run"]
+    assert root.parent_id is None
+    assert spans["asset"].parent_id == root.span_id
+    assert spans["summary"].parent_id == root.span_id
+    assert spans["asset"].attributes == {"content_type": "blog"}
+    assert spans["email_prep"].status == "error"
+    assert spans["email_prep"].attributes["error"] == "ValueError: bad template"
+    assert all(item.run_id == "run-1" for item in spans.values())
+
+
+def test_spans_outside_a_run_are_not_recorded(trace_file):
+    with span("orphan") as current:
+        assert current is None
+    assert not trace_file.exists() or trace_file.read_text() == ""
+
+
+def _span(span_id, parent, start, end):
+    return Span(run_id="r", span_id=span_id, parent_id=parent, name=span_id, start=start, end=end)
+
+
+def test_critical_path_follows_the_chain_that_finished_last():
+    spans = [
+        _span("run", None, 0, 10),
+        _span("ingest", "run", 0, 2),
+        _span("summary", "run", 2, 4),
+        _span("blog", "run", 4, 10),
+        _span("linkedin", "run", 4, 6),
+    ]
+    assert [item.name for item in critical_path(spans)] == ["run", "ingest", "summary", "blog"]
+
+
+def test_otlp_export_uses_hex_ids_and_error_status():
+    item = Span(run_id="run-1", span_id="abc", parent_id="def", name="asset", start=1.0, end=2.0, status="error")
+    otlp = to_otlp(item)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert len(otlp["traceId"]) == 32 and len(otlp["spanId"]) == 16 and len(otlp["parentSpanId"]) == 16
+    assert otlp["status"] == {"code": 2}
+    assert otlp["startTimeUnixNano"] == "1000000000"
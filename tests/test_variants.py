@@ -0,0 +1,82 @@
+from argparse import Namespace
+
+from pipeline import rank_asset_variants
+from variants import (
+    DUPLICATE_SIMILARITY,
+    brief_keywords,
+    format_ranked,
+    format_scores,
+    rank_variants,
+    similarity,
+    split_variants,
+    structure_score,
+)
+
+BRIEF = "Background exports ship next week. Exports finish faster, exports notify Slack, pricing unchanged."
+
+
+def linkedin(lead, *, words=100, hashtags="#Exports #Launch"):
+    filler = " ".join(["teams"] * words)
+    return f"{lead} {filler}\n\n- Background exports\n- Slack alerts\n\n{hashtags}"
+
+
+def test_split_on_variant_headings_in_any_common_style():
+    text = "Here you go.\n\n## Variant 1\nFirst draft\n\n**Variant 2:**\nSecond draft\n\n=== VARIANT 3 ===\nThird"
+    assert split_variants(text) == ["First draft", "Second draft", "Third"]
+    assert split_variants("Just one draft") == ["Just one draft"]
+    assert split_variants("   ") == []
+
+
+def test_brief_keywords_skip_stopwords_and_rank_by_frequency():
+    keywords = brief_keywords(BRIEF)
+    assert keywords[0] == "exports"
+    assert "launch" not in keywords and "with" not in keywords
+
+
+def test_similarity_and_structure():
+    assert similarity("background exports ship next week", "background exports ship next week") == 1.0
+    assert similarity("background exports ship next week", "pricing stays exactly unchanged today") == 0.0
+    assert structure_score("linkedin", "- one\n- two") == 1.0
+    assert structure_score("blog", "- one\n## Heading") < 0.5
+
+
+def test_in_spec_candidates_rank_above_better_scoring_out_of_spec_ones():
+    out_of_spec = linkedin("Background exports ship next week, exports notify Slack", words=10)
+    in_spec = linkedin("A new release")
+    ranked = rank_variants("linkedin", [out_of_spec, in_spec], launch_brief=BRIEF)
+    assert [variant.index for variant in ranked] == [2, 1]
+    assert ranked[1].keywords[0] > ranked[0].keywords[0]
+
+
+def test_near_duplicates_sink_below_distinct_candidates():
+    first = linkedin("Background exports ship next week with Slack alerts")
+    copy = first.replace("#Launch", "#Release")
+    distinct = linkedin("A new release", words=95)
+    assert similarity(first, copy) >= DUPLICATE_SIMILARITY
+
+    ranked = rank_variants("linkedin", [first, copy, distinct], launch_brief=BRIEF)
+    assert [variant.index for variant in ranked] == [1, 3, 2]
+    assert ranked[2].score > ranked[1].score
+    assert ranked[-1].duplicate_of == 1
+    assert format_scores(ranked)["duplicates"] == {"2": 1}
+    assert "near duplicate of variant 1" in format_ranked("linkedin", ranked)
+
+
+def test_ties_keep_response_order():
+    same = linkedin("Background exports ship next week")
+    other = same.replace("teams", "people")
+    ranked = rank_variants("linkedin", [same, other], launch_brief="nothing shared here")
+    assert ranked[0].score == ranked[1].score
+    assert [variant.index for variant in ranked] == [1, 2]
+
+
+def test_pipeline_keeps_the_top_candidate_as_the_asset(capsys):
+    weak = linkedin("Short", words=5)
+    strong = linkedin("Background exports ship next week")
+    assets = {"linkedin": f"Variant 1\n{weak}\n\nVariant 2\n{strong}", "blog": "untouched"}
+
+    rankings = rank_asset_variants(Namespace(variants={"linkedin": 3}), assets, launch_brief=BRIEF)
+
+    assert assets["linkedin"] == strong and assets["blog"] == "untouched"
+    assert [variant.index for variant in rankings["linkedin"]] == [2, 1]
+    assert "asked for 3 linkedin variants, got 2" in capsys.readouterr().out
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+"""Span tracing for pipeline runs, exported to local JSON-lines files.
+
+Spans are correlated by ``run_id`` (the trace id) and nest via context variables,
+so worker threads started with ``contextvars.copy_context()`` keep their parent.
+Run ``python tracing.py`` to list recorded runs, or ``python tracing.py RUN_ID``
+to render a per-run waterfall with the critical path marked.
+"""
+
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from uuid import uuid4
+
+SERVICE_NAME = "feature-release-marketing"
+DEFAULT_TRACE_FILE = Path("outputs") / "traces.jsonl"
+
+
+@dataclass
+class Span:
+    run_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start: float
+    end: float = 0.0
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return max(self.end - self.start, 0.0)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class SpanExporter:
+    """Append finished spans to a JSON-lines file and, optionally, an OTLP/JSON file."""
+
+    def __init__(self, path: Path | str, *, otlp_path: Path | str | None = None):
+        self.path = Path(path)
+        self.otlp_path = Path(otlp_path) if otlp_path else None
+        self._lock = threading.Lock()
+        for target in filter(None, (self.path, self.otlp_path)):
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(asdict(span), default=str)
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+            if self.otlp_path:
+                with self.otlp_path.open("a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(to_otlp(span), default=str) + "\n")
+
+
+def _hex_id(value: str, length: int) -> str:
+    cleaned = value.replace("-", "")
+    if len(cleaned) == length and all(ch in "0123456789abcdef" for ch in cleaned.lower()):
+        return cleaned.lower()
+    return hashlib.sha256(value.encode()).hexdigest()[:length]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(span: Span) -> Dict[str, Any]:
+    """One OTLP/JSON ExportTraceServiceRequest holding ``span``."""
+    otlp_span: Dict[str, Any] = {
+        "traceId": _hex_id(span.run_id, 32),
+        "spanId": _hex_id(span.span_id, 16),
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(int(span.start * 1e9)),
+        "endTimeUnixNano": str(int(span.end * 1e9)),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in {"run_id": span.run_id, **span.attributes}.items()
+        ],
+        "status": {"code": 1 if span.status == "ok" else 2},
+    }
+    if span.parent_id:
+        otlp_span["parentSpanId"] = _hex_id(span.parent_id, 16)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+                },
+                "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [otlp_span]}],
+            }
+        ]
+    }
+
+
+_exporter: Optional[SpanExporter] = None
+_current_run: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_run_id", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+def configure_tracing(path: Path | str | None, *, otlp_path: Path | str | None = None) -> Optional[SpanExporter]:
+    """Enable span export to ``path`` (None disables tracing)."""
+    global _exporter
+    _exporter = SpanExporter(path, otlp_path=otlp_path) if path else None
+    return _exporter
+
+
+def tracing_from_env(default_dir: Path) -> Optional[SpanExporter]:
+    """Configure from TRACE_FILE / TRACE_OTLP_FILE; TRACE_FILE=off disables tracing."""
+    raw = os.getenv("TRACE_FILE")
+    if raw and raw.lower() in {"0", "off", "false", "none"}:
+        return configure_tracing(None)
+    return configure_tracing(raw or default_dir / "traces.jsonl", otlp_path=os.getenv("TRACE_OTLP_FILE"))
+
+
+@contextmanager
+def start_run(run_id: str) -> Iterator[Optional[Span]]:
+    """Make ``run_id`` the trace id for spans opened inside the block, under a root ``run`` span."""
+    token = _current_run.set(run_id)
+    try:
+        with span("run") as root:
+            yield root
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record ``name`` as a child of the current span; yields None when tracing is off."""
+    exporter = _exporter
+    run_id = _current_run.get()
+    if exporter is None or run_id is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(
+        run_id=run_id,
+        span_id=uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        name=name,
+        start=time.time(),
+        attributes=dict(attributes),
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.status = "error"
+        current.attributes.setdefault("error", f"{type(exc).__name__}: {exc}")
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end = time.time()
+        try:
+            exporter.export(current)
+        except OSError as exc:  # pragma: no cover - tracing must never break a run
+            print(f"Warning: failed to export span {name} ({exc}).")
+
+
+# --- Waterfall rendering -----------------------------------------------------
+
+
+def load_spans(path: Path, run_id: str | None = None) -> List[Span]:
+    spans: List[Span] = []
+    if not path.exists():
+        return spans
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            if run_id and not str(data.get("run_id", "")).startswith(run_id):
+                continue
+            spans.append(Span(**data))
+    return spans
+
+
+def critical_path(spans: Iterable[Span]) -> List[Span]:
+    """Spans that determined the run's length.
+
+    Starting from the root, take the child that finished last, then walk back through
+    the siblings that finished before it started, and recurse into each of them.
+    """
+    spans = list(spans)
+    children: Dict[Optional[str], List[Span]] = {}
+    for item in spans:
+        children.setdefault(item.parent_id, []).append(item)
+    known = {item.span_id for item in spans}
+    roots = [item for item in spans if item.parent_id is None or item.parent_id not in known]
+    if not roots:
+        return []
+
+    def walk(item: Span) -> List[Span]:
+        path = [item]
+        remaining = sorted(children.get(item.span_id, []), key=lambda entry: entry.end)
+        chain: List[Span] = []
+        while remaining:
+            last = remaining.pop()
+            chain.append(last)
+            remaining = [entry for entry in remaining if entry.end <= last.start + 1e-6]
+        for child in reversed(chain):
+            path.extend(walk(child))
+        return path
+
+    return walk(max(roots, key=lambda item: item.end))
+
+
+def render_waterfall(spans: List[Span], *, width: int = 40) -> str:
+    if not spans:
+        return "No spans recorded."
+    start = min(item.start for item in spans)
+    end = max(item.end for item in spans)
+    total = max(end - start, 1e-9)
+    on_path = {item.span_id for item in critical_path(spans)}
+    children: Dict[Optional[str], List[Span]] = {}
+    known = {item.span_id for item in spans}
+    for item in spans:
+        parent = item.parent_id if item.parent_id in known else None
+        children.setdefault(parent, []).append(item)
+
+    rows: List[str] = []
+    label_width = 40
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for item in sorted(children.get(parent, []), key=lambda entry: entry.start):
+            offset = item.start - start
+            left = int(offset / total * width)
+            bar_len = max(1, int(item.duration / total * width))
+            bar = " " * left + "█" * min(bar_len, width - left)
+            marker = "*" if item.span_id in on_path else " "
+            detail = item.attributes.get("content_type") or item.attributes.get("file") or item.attributes.get("item_id")
+            name = f"{item.name} [{detail}]" if detail else item.name
+            label = ("  " * depth + name)[:label_width]
+            status = "" if item.status == "ok" else f" [{item.status}]"
+            rows.append(
+                f"{marker} {offset:8.3f}s {item.duration:8.3f}s  {label.ljust(label_width)} |{bar.ljust(width)}|{status}"
+            )
+            walk(item.span_id, depth + 1)
+
+    walk(None, 0)
+    header = f"Run {spans[0].run_id}: {total:.3f}s, {len(spans)} spans (* = critical path)"
+    columns = f"  {'offset':>9} {'duration':>9}  {'span'.ljust(label_width)}"
+    return "\n".join([header, columns] + rows)
+
+
+def summarise_runs(spans: Iterable[Span]) -> List[Dict[str, Any]]:
+    runs: Dict[str, Dict[str, Any]] = {}
+    for item in spans:
+        entry = runs.setdefault(item.run_id, {"run_id": item.run_id, "start": item.start, "end": item.end, "spans": 0})
+        entry["start"] = min(entry["start"], item.start)
+        entry["end"] = max(entry["end"], item.end)
+        entry["spans"] += 1
+    return sorted(runs.values(), key=lambda entry: entry["start"])
+
+
+def main(argv: Iterable[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Render recorded pipeline traces.")
+    parser.add_argument("run_id", nargs="?", help="Run id (or prefix) to render; lists runs when omitted")
+    parser.add_argument(
+        "--file",
+        type=Path,
+        default=Path(os.getenv("TRACE_FILE") or DEFAULT_TRACE_FILE),
+        help="Span JSON-lines file (default outputs/traces.jsonl or TRACE_FILE)",
+    )
+    parser.add_argument("--width", type=int, default=40, help="Width of the waterfall bars")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    if not args.run_id:
+        for entry in summarise_runs(load_spans(args.file)):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["start"]))
+            print(f"{entry['run_id']}  {started}  {entry['end'] - entry['start']:8.3f}s  {entry['spans']} spans")
+        return
+    print(render_waterfall(load_spans(args.file, args.run_id), width=args.width))
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = [
+    "Span",
+    "SpanExporter",
+    "configure_tracing",
+    "critical_path",
+    "load_spans",
+    "render_waterfall",
+    "span",
+    "start_run",
+    "to_otlp",
+    "tracing_from_env",
+]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+"""Split multi-variant asset responses and rank the candidates locally.
+
+``pipeline.py --variants linkedin=3`` asks for several candidates of one asset in a
+single request (``generate.build_payload(..., variants=N)``). The response is split on
+the ``VARIANT_HEADING`` lines and each candidate is scored without another model call:
+
+- spec: the hard limits from ``spec_checks.check_draft`` (length, hashtags, subject,
+  title and meta lengths),
+- structure: the bullets and headings the channel's spec asks for,
+- keywords: how many of the launch brief's most frequent terms the draft covers,
+- duplicates: a candidate that is a near copy of a better-ranked one sinks to the end.
+
+The ranked set is what reviewers approve; the top candidate is saved as the asset.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from spec_checks import SpecReport, check_draft
+
+_VARIANT_SPLIT_RE = re.compile(
+    r"^[ \t]*(?:[=#*]+[ \t]*)?variant[ \t]+(\d+)[ \t]*[:=#*]*[ \t]*$", re.IGNORECASE | re.MULTILINE
+)
+_TERM_RE = re.compile(r"[a-z][a-z0-9'-]{3,}")
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+\S", re.MULTILINE)
+_H2_RE = re.compile(r"^\s*##\s+\S", re.MULTILINE)
+
+# What each channel's spec asks for beyond its hard limits: (minimum bullets, minimum H2s).
+STRUCTURE = {
+    "linkedin": (2, 0),
+    "newsletter": (3, 0),
+    "blog": (3, 4),
+}
+WEIGHTS = {"spec": 0.5, "structure": 0.2, "keywords": 0.3}
+KEYWORDS = 12
+DUPLICATE_SIMILARITY = 0.8
+
+_STOPWORDS = frozenset(
+    """
+    about above after again also among been before being below between both but cannot could does doing
+    down during each from further have having here into itself just more most much must only other
+    over same should some such than that their them then there these they this those through under
+    until very what when where which while will with within without would your yours launch brief
+    feature features section sections none note notes
+    """.split()
+)
+
+
+@dataclass
+class ScoredVariant:
+    index: int
+    text: str
+    report: SpecReport
+    structure: float
+    keywords: Tuple[int, int]
+    score: float
+    duplicate_of: Optional[int] = None
+
+    def summary(self) -> str:
+        hits, total = self.keywords
+        parts = [f"score {self.score:.2f}", self.report.summary(), f"keywords {hits}/{total}"]
+        if self.duplicate_of is not None:
+            parts.append(f"near duplicate of variant {self.duplicate_of}")
+        return "; ".join(parts)
+
+
+def split_variants(text: str) -> List[str]:
+    """Candidates in a multi-variant response; the whole text when it has no variant headings."""
+    matches = list(_VARIANT_SPLIT_RE.finditer(text))
+    if not matches:
+        return [text.strip()] if text.strip() else []
+    ends = [match.start() for match in matches[1:]] + [len(text)]
+    return [body for body in (text[m.end():end].strip() for m, end in zip(matches, ends)) if body]
+
+
+def brief_keywords(launch_brief: str, *, limit: int = KEYWORDS) -> List[str]:
+    """The brief's most frequent content words, the terms a good asset should echo."""
+    counts = Counter(term for term in _TERM_RE.findall(launch_brief.lower()) if term not in _STOPWORDS)
+    return [term for term, _ in counts.most_common(limit)]
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = _TERM_RE.findall(text.lower())
+    return {tuple(words[index : index + size]) for index in range(max(1, len(words) - size + 1))}
+
+
+def similarity(left: str, right: str) -> float:
+    """Jaccard similarity of word 3-grams; 1.0 means the same wording."""
+    a, b = _shingles(left), _shingles(right)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def structure_score(content_type: str, text: str) -> float:
+    bullets, headings = STRUCTURE.get(content_type, (0, 0))
+    checks = []
+    if bullets:
+        checks.append(min(1.0, len(_BULLET_RE.findall(text)) / bullets))
+    if headings:
+        checks.append(min(1.0, len(_H2_RE.findall(text)) / headings))
+    return sum(checks) / len(checks) if checks else 1.0
+
+
+def score_variant(content_type: str, index: int, text: str, keywords: Sequence[str]) -> ScoredVariant:
+    report = check_draft(content_type, text)
+    terms = set(_TERM_RE.findall(text.lower()))
+    hits = sum(keyword in terms for keyword in keywords)
+    structure = structure_score(content_type, text)
+    spec = 1.0 if report.ok else max(0.0, 1.0 - 0.25 * len(report.violations))
+    coverage = hits / len(keywords) if keywords else 1.0
+    score = WEIGHTS["spec"] * spec + WEIGHTS["structure"] * structure + WEIGHTS["keywords"] * coverage
+    return ScoredVariant(index, text, report, structure, (hits, len(keywords)), round(score, 4))
+
+
+def rank_variants(content_type: str, candidates: Sequence[str], *, launch_brief: str) -> List[ScoredVariant]:
+    """Score ``candidates`` (1-based ``index`` in response order), best first.
+
+    Candidates that meet the spec rank above any that do not, then by score; ties keep
+    response order. A candidate at least ``DUPLICATE_SIMILARITY`` similar to a
+    better-ranked one is marked and moved after every distinct candidate.
+    """
+    keywords = brief_keywords(launch_brief)
+    scored = [score_variant(content_type, index, text, keywords) for index, text in enumerate(candidates, 1)]
+    scored.sort(key=lambda variant: (not variant.report.ok, -variant.score, variant.index))
+    kept: List[ScoredVariant] = []
+    for variant in scored:
+        for better in kept:
+            if better.duplicate_of is None and similarity(better.text, variant.text) >= DUPLICATE_SIMILARITY:
+                variant.duplicate_of = better.index
+                break
+        kept.append(variant)
+    return [v for v in kept if v.duplicate_of is None] + [v for v in kept if v.duplicate_of is not None]
+
+
+def format_ranked(content_type: str, ranked: Sequence[ScoredVariant]) -> str:
+    """The ranked set as reviewers see it: best first, each with its score breakdown."""
+    sections = []
+    for rank, variant in enumerate(ranked, 1):
+        marker = " (recommended)" if rank == 1 else ""
+        sections.append(
+            f"### Rank {rank}: {content_type} variant {variant.index}{marker}\n"
+            f"_{variant.summary()}_\n\n{variant.text.strip()}"
+        )
+    return "\n\n---\n\n".join(sections)
+
+
+def format_scores(ranked: Sequence[ScoredVariant]) -> Dict[str, object]:
+    """Compact ranking for artifact inputs and logs."""
+    return {
+        "order": [variant.index for variant in ranked],
+        "scores": {str(variant.index): variant.score for variant in ranked},
+        "duplicates": {str(v.index): v.duplicate_of for v in ranked if v.duplicate_of is not None},
+    }
+
+
+__all__ = [
+    "ScoredVariant",
+    "brief_keywords",
+    "format_ranked",
+    "format_scores",
+    "rank_variants",
+    "similarity",
+    "split_variants",
+    "structure_score",
+]